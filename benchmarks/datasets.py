@@ -0,0 +1,173 @@
+import sqlite3
+from contextlib import closing
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+from pypika import SQLLiteQuery, Table, functions as fn
+
+import fireant as f
+from fireant import DataSet, DataType, Database, Field
+from fireant.queries.execution import fetch_data, fetch_result_sets
+from fireant.queries.finders import (
+    find_operations_for_widgets,
+    find_share_dimensions,
+)
+from fireant.utils import alias_selector
+
+# The numbers of rows of the synthetic table which the benchmarks are run for
+ROWS = (1_000, 10_000, 100_000)
+
+COUNTRIES = ["country-{}".format(i) for i in range(20)]
+DEVICES = ["desktop", "mobile", "tablet", "tv", "watch"]
+CHANNELS = ["channel-{}".format(i) for i in range(10)]
+
+events_table = Table("events")
+
+_connections = []
+
+_DATE_PART_MODIFIERS = {
+    "day": ("days", 1),
+    "week": ("days", 7),
+    "month": ("months", 1),
+    "quarter": ("months", 3),
+    "year": ("years", 1),
+}
+
+
+class SQLiteDatabase(Database):
+    """
+    A database for running the benchmarks in memory, with SQLite. Connections are opened to a shared in-memory
+    database named after `database`, which exists as long as one connection to it is open.
+    """
+
+    query_cls = SQLLiteQuery
+
+    def connect(self):
+        return closing(self._connect())
+
+    def _connect(self):
+        return sqlite3.connect("file:{}?mode=memory&cache=shared".format(self.database), uri=True)
+
+    def trunc_date(self, field, interval):
+        if interval == "day":
+            return fn.Function("DATE", field)
+        if interval == "week":
+            # Weeks start on Mondays
+            return fn.Function("DATE", field, "-6 days", "weekday 1")
+        if interval == "month":
+            return fn.Function("DATE", field, "start of month")
+        if interval == "year":
+            return fn.Function("DATE", field, "start of year")
+        raise ValueError("Invalid interval provided to trunc_date method: {}".format(interval))
+
+    def date_add(self, field, date_part, interval):
+        unit, multiplier = _DATE_PART_MODIFIERS[str(date_part)]
+        return fn.Function("DATE", field, "{:+d} {}".format(interval * multiplier, unit))
+
+
+@lru_cache(maxsize=None)
+def make_database(rows: int) -> SQLiteDatabase:
+    """
+    Creates an in-memory database with an events table of the given number of rows, spread over a year.
+    """
+    random = np.random.default_rng(rows)
+    events = pd.DataFrame(
+        {
+            "timestamp": pd.Timestamp("2020-01-01") + pd.to_timedelta(random.integers(0, 366, rows), unit="D"),
+            "country": random.choice(COUNTRIES, rows),
+            "device": random.choice(DEVICES, rows),
+            "channel": random.choice(CHANNELS, rows),
+            "clicks": random.integers(0, 1000, rows),
+            "cost": random.random(rows) * 100,
+            "revenue": random.random(rows) * 200,
+        }
+    )
+    events["timestamp"] = events["timestamp"].dt.strftime("%Y-%m-%d")
+
+    database = SQLiteDatabase(database="events_{}".format(rows), max_result_set_size=rows)
+    # The in-memory database is kept for as long as this connection is open
+    _connections.append(database._connect())
+    events.to_sql("events", _connections[-1], index=False)
+
+    return database
+
+
+@lru_cache(maxsize=None)
+def make_dataset(rows: int) -> DataSet:
+    return DataSet(
+        table=events_table,
+        database=make_database(rows),
+        fields=[
+            Field("timestamp", label="Timestamp", definition=events_table.timestamp, data_type=DataType.date),
+            Field("country", label="Country", definition=events_table.country, data_type=DataType.text),
+            Field("device", label="Device", definition=events_table.device, data_type=DataType.text),
+            Field("channel", label="Channel", definition=events_table.channel, data_type=DataType.text),
+            Field("clicks", label="Clicks", definition=fn.Sum(events_table.clicks), data_type=DataType.number),
+            Field("cost", label="Cost", definition=fn.Sum(events_table.cost), data_type=DataType.number, prefix="$"),
+            Field(
+                "revenue",
+                label="Revenue",
+                definition=fn.Sum(events_table.revenue),
+                data_type=DataType.number,
+                prefix="$",
+            ),
+            Field(
+                "roas",
+                label="ROAS",
+                definition=fn.Sum(events_table.revenue) / fn.Sum(events_table.cost),
+                data_type=DataType.number,
+                precision=2,
+            ),
+        ],
+    )
+
+
+def make_dimensions(dataset, count: int, rollups: int = 0):
+    """
+    Returns the first `count` dimensions of the dataset, starting with the daily timestamp, of which the last `rollups`
+    dimensions are rolled up.
+    """
+    fields = dataset.fields
+    dimensions = [f.day(fields.timestamp), fields.country, fields.device, fields.channel][:count]
+    return [f.Rollup(dimension) if i >= count - rollups else dimension for i, dimension in enumerate(dimensions)]
+
+
+def make_references(dataset, count: int):
+    return [f.DayOverDay(dataset.fields.timestamp), f.WeekOverWeek(dataset.fields.timestamp)][:count]
+
+
+def make_query(dataset, widget, dimensions=1, references=0, rollups=0):
+    return (
+        dataset.query.widget(widget)
+        .dimension(*make_dimensions(dataset, dimensions, rollups))
+        .reference(*make_references(dataset, references))
+    )
+
+
+def fetch_query_result_sets(query):
+    """
+    Executes the queries of a query builder and returns their result sets, e.g. for benchmarking reducing them.
+    """
+    return fetch_result_sets(query.dataset.database, query.sql, query.dimensions)[1]
+
+
+def fetch_query_data_frame(query):
+    """
+    Executes the queries of a query builder and returns the reduced data frame with the operations applied, which is
+    what widgets transform.
+    """
+    dimensions = query.dimensions
+    operations = find_operations_for_widgets(query._widgets)
+    _, data_frame = fetch_data(
+        query.dataset.database,
+        query.sql,
+        dimensions,
+        find_share_dimensions(dimensions, operations),
+        query.reference_groups,
+    )
+
+    for operation in operations:
+        data_frame[alias_selector(operation.alias)] = operation.apply(data_frame, None)
+
+    return data_frame
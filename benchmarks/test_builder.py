@@ -0,0 +1,40 @@
+import pytest
+
+import fireant as f
+from .datasets import make_dataset, make_dimensions, make_query, make_references
+
+dataset = make_dataset(1_000)
+
+
+@pytest.mark.benchmark(group="builder")
+def test_builder_chaining(benchmark):
+    fields = dataset.fields
+
+    def build():
+        return (
+            dataset.query.widget(f.ReactTable(fields.clicks, fields.cost, fields.roas))
+            .dimension(*make_dimensions(dataset, 3, rollups=1))
+            .filter(fields.country.isin(["country-1", "country-2"]))
+            .filter(fields.clicks > 10)
+            .reference(*make_references(dataset, 2))
+            .orderby(fields.clicks)
+            .limit_client(50)
+        )
+
+    benchmark(build)
+
+
+@pytest.mark.benchmark(group="sql")
+@pytest.mark.parametrize("dimensions", [1, 2, 4])
+@pytest.mark.parametrize("references", [0, 2])
+@pytest.mark.parametrize("rollups", [0, 2])
+def test_sql_compilation(benchmark, dimensions, references, rollups):
+    query = make_query(
+        dataset,
+        f.ReactTable(dataset.fields.clicks, dataset.fields.roas),
+        dimensions=dimensions,
+        references=references,
+        rollups=min(rollups, dimensions),
+    )
+
+    benchmark(lambda: [str(sql) for sql in query.sql])
@@ -0,0 +1,24 @@
+import pytest
+
+import fireant as f
+from fireant.queries.execution import reduce_result_set
+from .datasets import ROWS, fetch_query_result_sets, make_dataset, make_query
+
+
+@pytest.mark.benchmark(group="reduce_result_set")
+@pytest.mark.parametrize("rows", ROWS)
+@pytest.mark.parametrize("dimensions", [1, 3])
+@pytest.mark.parametrize("references", [0, 2])
+@pytest.mark.parametrize("rollups", [0, 2])
+def test_reduce_result_set(benchmark, rows, dimensions, references, rollups):
+    dataset = make_dataset(rows)
+    query = make_query(
+        dataset,
+        f.Widget(dataset.fields.clicks, dataset.fields.roas),
+        dimensions=dimensions,
+        references=references,
+        rollups=min(rollups, dimensions),
+    )
+    result_sets = fetch_query_result_sets(query)
+
+    benchmark(reduce_result_set, result_sets, query.reference_groups, query.dimensions, ())
@@ -0,0 +1,18 @@
+import pytest
+
+import fireant as f
+from .datasets import ROWS, make_dataset, make_query
+
+
+@pytest.mark.benchmark(group="fetch")
+@pytest.mark.parametrize("rows", ROWS)
+@pytest.mark.parametrize("dimensions", [1, 3])
+@pytest.mark.parametrize("references", [0, 2])
+@pytest.mark.parametrize("rollups", [0, 1])
+def test_fetch(benchmark, rows, dimensions, references, rollups):
+    dataset = make_dataset(rows)
+    fields = dataset.fields
+    widget = f.ReactTable(fields.clicks, fields.roas, f.CumSum(fields.clicks))
+    query = make_query(dataset, widget, dimensions=dimensions, references=references, rollups=rollups)
+
+    benchmark(query.fetch)
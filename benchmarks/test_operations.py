@@ -0,0 +1,24 @@
+import pytest
+
+import fireant as f
+from .datasets import ROWS, fetch_query_data_frame, make_dataset, make_query
+
+OPERATIONS = {
+    "cumsum": lambda fields: f.CumSum(fields.clicks),
+    "cummean": lambda fields: f.CumMean(fields.clicks),
+    "rolling_mean": lambda fields: f.RollingMean(fields.clicks, 7),
+    "share": lambda fields: f.Share(fields.clicks, over=fields.country),
+}
+
+
+@pytest.mark.benchmark(group="operations")
+@pytest.mark.parametrize("rows", ROWS)
+@pytest.mark.parametrize("operation", sorted(OPERATIONS))
+def test_operation(benchmark, rows, operation):
+    dataset = make_dataset(rows)
+    operation = OPERATIONS[operation](dataset.fields)
+    # Share operations need the totals of the dimension they are over
+    query = make_query(dataset, f.Widget(dataset.fields.clicks), dimensions=2, rollups=1)
+    data_frame = fetch_query_data_frame(query)
+
+    benchmark(operation.apply, data_frame, None)
@@ -0,0 +1,21 @@
+import pytest
+from pypika import Order
+
+import fireant as f
+from fireant.queries.pagination import paginate
+from .datasets import ROWS, fetch_query_data_frame, make_dataset, make_query
+
+
+@pytest.mark.benchmark(group="pagination")
+@pytest.mark.parametrize("rows", ROWS)
+@pytest.mark.parametrize("group_pagination", [False, True], ids=["rows", "groups"])
+def test_paginate(benchmark, rows, group_pagination):
+    dataset = make_dataset(rows)
+    fields = dataset.fields
+    widget = (
+        f.HighCharts().axis(f.HighCharts.LineSeries(fields.clicks)) if group_pagination else f.ReactTable(fields.clicks)
+    )
+    query = make_query(dataset, widget, dimensions=3)
+    data_frame = fetch_query_data_frame(query)
+
+    benchmark(paginate, data_frame, [widget], orders=[(fields.clicks, Order.desc)], limit=20, offset=20)
@@ -0,0 +1,55 @@
+import pytest
+
+import fireant as f
+from .datasets import ROWS, fetch_query_data_frame, make_dataset, make_query
+
+
+def _highcharts(fields):
+    return (
+        f.HighCharts(title="Benchmark")
+        .axis(f.HighCharts.LineSeries(fields.clicks), f.HighCharts.LineSeries(fields.cost))
+        .axis(f.HighCharts.ColumnSeries(fields.roas))
+    )
+
+
+def _matplotlib(fields):
+    pytest.importorskip("matplotlib")
+    return f.Matplotlib(title="Benchmark").axis(f.Matplotlib.LineSeries(fields.clicks))
+
+
+WIDGETS = {
+    "pandas": lambda fields: f.Pandas(fields.clicks, fields.cost, fields.roas),
+    "pandas_pivot": lambda fields: f.Pandas(fields.clicks, fields.cost, fields.roas, pivot=[fields.country]),
+    "reacttable": lambda fields: f.ReactTable(fields.clicks, fields.cost, fields.roas),
+    "reacttable_pivot": lambda fields: f.ReactTable(fields.clicks, fields.cost, fields.roas, pivot=[fields.country]),
+    "csv": lambda fields: f.CSV(fields.clicks, fields.cost, fields.roas),
+    "highcharts": _highcharts,
+    "matplotlib": _matplotlib,
+}
+
+
+def _widget_query(rows, widget, references, rollups):
+    dataset = make_dataset(rows)
+    widget = WIDGETS[widget](dataset.fields)
+    query = make_query(dataset, widget, dimensions=2, references=references, rollups=rollups)
+    return widget, query, fetch_query_data_frame(query)
+
+
+@pytest.mark.benchmark(group="widgets")
+@pytest.mark.parametrize("rows", ROWS)
+@pytest.mark.parametrize("widget", list(WIDGETS))
+@pytest.mark.parametrize("references", [0, 1])
+@pytest.mark.parametrize("rollups", [0, 1])
+def test_widget_transform(benchmark, rows, widget, references, rollups):
+    widget, query, data_frame = _widget_query(rows, widget, references, rollups)
+
+    benchmark(widget.transform, data_frame, query.dimensions, query._references)
+
+
+@pytest.mark.benchmark(group="widgets_json")
+@pytest.mark.parametrize("rows", ROWS)
+@pytest.mark.parametrize("widget", ["reacttable", "reacttable_pivot", "highcharts"])
+def test_widget_transform_to_json(benchmark, rows, widget):
+    widget, query, data_frame = _widget_query(rows, widget, references=1, rollups=1)
+
+    benchmark(widget.transform_to_json_bytes, data_frame, query.dimensions, query._references)
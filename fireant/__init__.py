@@ -44,6 +44,8 @@ from .dataset.references import (
     YearsOverYears,
 )
 from .exceptions import DataSetException
+from .queries.builder import fetch_latest
+from .queries.cache import ResultCache
 from .widgets import *
 
 from pypika.terms import Term
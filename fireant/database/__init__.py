@@ -1,4 +1,4 @@
-from .base import Database
+from .base import Database, QueryCost
 from .column import (
     Column,
     ColumnsTransformer,
@@ -1,37 +1,52 @@
 from datetime import datetime
 from functools import partial
 from typing import Collection, Dict, Union
-from typing import Iterable, List, Sequence, Type
+from typing import Iterable, List, Optional, Sequence, Type
 
 import pandas as pd
 from pypika import (
+    Order,
     Query,
+    Tuple,
     enums,
     terms,
 )
 from pypika import Table, functions as fn
 from pypika.queries import QueryBuilder
-from pypika.terms import Function
+from pypika.terms import Case, Criterion, Function
 
 from fireant.dataset.fields import Field
 from fireant.dataset.filters import Filter
 from fireant.dataset.joins import Join
+from fireant.dataset.modifiers import Rollup
 from fireant.exceptions import QueryCancelled
 from fireant.middleware.decorators import apply_middlewares, connection_middleware
+from fireant.queries.cache import ResultCache
 from fireant.queries.finders import (
     find_totals_dimensions,
     find_and_group_references_for_dimensions,
     find_required_tables_to_join,
     find_joins_for_tables,
 )
-from fireant.queries.references import make_reference_dimensions, make_reference_metrics, make_reference_filters
+from fireant.queries.references import (
+    make_reference_dimensions,
+    make_reference_filters,
+    make_reference_metrics,
+    make_reference_range_filters,
+)
 from fireant.queries.special_cases import adjust_daterange_filter_for_rolling_window
+from fireant.queries.tracing import query_span
 from fireant.queries.totals_helper import adapt_for_totals_query
 from fireant.utils import (
     alias_selector,
     flatten,
 )
 from fireant.dataset.intervals import DatetimeInterval
+from .query_cost import QueryCost
+
+
+class NullSafeEquality(enums.Comparator):
+    null_safe_eq = "<=>"
 
 
 class Database(object):
@@ -44,6 +59,9 @@ class Database(object):
 
     slow_query_log_min_seconds = 15
 
+    # Whether the platform supports comparing row values, such as (a, b) > (1, 2)
+    supports_row_value_comparison = False
+
     def __init__(
         self,
         host=None,
@@ -51,12 +69,16 @@ class Database(object):
         database=None,
         max_result_set_size=200000,
         middlewares=[],
+        column_definitions_cache_ttl=None,
     ):
         self.host = host
         self.port = port
         self.database = database
         self.max_result_set_size = max_result_set_size
         self.middlewares = middlewares + [connection_middleware]
+        self.column_definitions_cache = (
+            ResultCache(ttl=column_definitions_cache_ttl) if column_definitions_cache_ttl is not None else None
+        )
 
     def connect(self):
         """
@@ -86,6 +108,21 @@ class Database(object):
         """
         raise NotImplementedError
 
+    def get_cached_column_definitions(self, schema, table):
+        """
+        Returns the column definitions of a table like `get_column_definitions` does. If the database was created with
+        a `column_definitions_cache_ttl`, the column definitions are cached for that many seconds, so they are not
+        fetched from the database every time they are needed.
+
+        :param schema: The name of the table schema.
+        :param table: The name of the table to get columns from.
+        :return: A list of columns.
+        """
+        if self.column_definitions_cache is None:
+            return self.get_column_definitions(schema, table)
+
+        return self.column_definitions_cache.get((schema, table), partial(self.get_column_definitions, schema, table))
+
     def trunc_date(self, field, interval):
         """
         This function must create a Pypika function which truncates a Date or DateTime object to a specific interval.
@@ -116,9 +153,10 @@ class Database(object):
         # Parameters can either be passed as a list when using formatting placeholders like %s (varies per platform)
         # or a dict when using named placeholders.
         for query in queries:
-            cursor = connection.cursor()
-            cursor.execute(str(query), parameters)
-            results.append(cursor.fetchall())
+            with query_span("execute", str(query)):
+                cursor = connection.cursor()
+                cursor.execute(str(query), parameters)
+                results.append(cursor.fetchall())
 
         return results
 
@@ -138,15 +176,55 @@ class Database(object):
         connection = kwargs.get("connection")
         dataframes = []
         for query in queries:
-            dataframes.append(pd.read_sql(query, connection, coerce_float=True, parse_dates=parse_dates))
+            with query_span("execute", str(query)):
+                dataframes.append(pd.read_sql(query, connection, coerce_float=True, parse_dates=parse_dates))
         return dataframes
 
     def fetch_dataframe(self, query, **kwargs):
         return self.fetch_dataframes(query, **kwargs)[0]
 
+    def make_explain_query(self, query: str) -> Optional[str]:
+        """
+        Override to return the query explaining the plan of a query, such as `EXPLAIN <query>`, whose result is parsed
+        by `parse_query_plan`. Returns None if the platform's plans are not supported, in which case the costs of
+        queries are not estimated.
+
+        :param query: The SQL of the query to explain.
+        """
+        return None
+
+    def parse_query_plan(self, rows) -> QueryCost:
+        """
+        Override to parse the estimates of a query plan from the rows returned by the query made with
+        `make_explain_query`.
+        """
+        raise NotImplementedError
+
+    def estimate_query_cost(self, query: str, connection=None) -> Optional[QueryCost]:
+        """
+        Estimates the number of rows and the cost of a query from its plan, without executing it.
+
+        :param query: The SQL of the query.
+        :param connection: (Optional) The connection to explain the query with.
+        :return: The estimates, or None if the platform's plans are not supported.
+        """
+        explain_query = self.make_explain_query(query)
+        if explain_query is None:
+            return None
+
+        return self.parse_query_plan(self.fetch(explain_query, connection=connection))
+
     def __str__(self):
         return f'Database|{self.__class__.__name__}|{self.host}'
 
+    @property
+    def cache_key(self):
+        """
+        Identifies the database in the keys of cached results. Databases are copied with the query builders on every
+        call, so they are identified by their connection details rather than by identity.
+        """
+        return type(self), self.host, self.port, self.database
+
     def make_slicer_query_with_totals_and_references(
         self,
         table,
@@ -158,6 +236,8 @@ class Database(object):
         references,
         orders,
         share_dimensions=(),
+        series_query=None,
+        shift_references_locally=False,
     ) -> List[Type[QueryBuilder]]:
         """
         The following two loops will run over the spread of the two sets including a NULL value in each set:
@@ -173,6 +253,14 @@ class Database(object):
         fireant.tests.queries.test_build_dimensions.QueryBuilderDimensionTotalsTests
             #test_build_query_with_totals_cat_dimension_with_references
         ```
+
+        If a series query is given (see `make_series_query`), every query is joined with it, so only the rows of the
+        series selected by the series query are returned.
+
+        If `shift_references_locally` is true, no queries are made for the reference groups. Instead, the filters on
+        the reference dimensions of each query are widened to also match the ranges of the references, and the
+        references are computed from its result set with `make_local_reference_result_sets`, using the filters before
+        they were widened which are added to the query as `_reference_filters`.
         """
 
         filters = adjust_daterange_filter_for_rolling_window(dimensions, operations, filters)
@@ -184,7 +272,9 @@ class Database(object):
         totals_dimensions_and_none = [None] + totals_dimensions[::-1]
 
         reference_groups = find_and_group_references_for_dimensions(dimensions, references)
-        reference_groups_and_none = [(None, None)] + list(reference_groups.items())
+        reference_groups_and_none = [(None, None)]
+        if not shift_references_locally:
+            reference_groups_and_none += list(reference_groups.items())
 
         queries = []
         for totals_dimension in totals_dimensions_and_none:
@@ -206,6 +296,9 @@ class Database(object):
                     filters_with_totals,
                     references,
                 )
+                if shift_references_locally:
+                    filters_with_ref = make_reference_range_filters(filters_with_ref, reference_groups, self.date_add)
+
                 query = self.make_slicer_query(
                     table,
                     joins,
@@ -215,10 +308,14 @@ class Database(object):
                     orders,
                 )
 
+                if series_query is not None:
+                    query = self.join_series_query(query, series_query, dimensions_with_ref)
+
                 # Add these to the query instance so when the data frames are joined together, the correct references and
                 # totals can be applied when combining the separate result set from each query.
                 query._totals = totals_dimension
                 query._references = references
+                query._reference_filters = filters_with_totals
                 queries.append(query)
 
         return queries
@@ -277,13 +374,7 @@ class Database(object):
         :return:
         """
         query = self.query_cls.from_(base_table, immutable=False)
-        elements = flatten([metrics, dimensions, filters])
-
-        # Add joins
-        join_tables_needed_for_query = find_required_tables_to_join(elements, base_table)
-
-        for join in find_joins_for_tables(joins, base_table, join_tables_needed_for_query):
-            query = query.join(join.table, how=join.join_type).on(join.criterion)
+        query = self._add_joins(query, base_table, joins, flatten([metrics, dimensions, filters]))
 
         # Add dimensions
         for dimension in dimensions:
@@ -314,6 +405,213 @@ class Database(object):
 
         return query
 
+    @staticmethod
+    def _add_joins(query, base_table, joins, elements):
+        join_tables_needed_for_query = find_required_tables_to_join(elements, base_table)
+
+        for join in find_joins_for_tables(joins, base_table, join_tables_needed_for_query):
+            query = query.join(join.table, how=join.join_type).on(join.criterion)
+
+        return query
+
+    def make_series_query(
+        self,
+        base_table: Table,
+        joins: Sequence[Join] = (),
+        dimensions: Sequence[Field] = (),
+        filters: Sequence[Filter] = (),
+        orders: Sequence = (),
+        limit: int = None,
+        offset: int = None,
+    ) -> Type[QueryBuilder]:
+        """
+        Creates a pypika/SQL query selecting the distinct value combinations of the given dimensions, which identify
+        the series of a chart, ordered and paginated. Joining this query with a slicer query (see `join_series_query`)
+        restricts the slicer query to the series on the requested page, so the series are paginated in the database
+        instead of after fetching all of them.
+
+        :param base_table:
+            pypika.Table - The base table of the query, the one in the FROM clause
+        :param joins:
+            A collection of joins available in the slicer.
+        :param dimensions:
+            The dimensions identifying a series.
+        :param filters:
+            A collection of filters to apply to the query.
+        :param orders:
+            A collection of orders as tuples of the metric/dimension to order the series by and the direction to order
+            in. Metrics are aggregated over all rows of each series.
+        :param limit:
+            The number of series to select.
+        :param offset:
+            The number of series to skip.
+        :return:
+        """
+        query = self.make_slicer_query(base_table, joins, dimensions, filters=filters, orders=orders)
+        return query.limit(limit).offset(offset)
+
+    def join_series_query(self, query, series_query, dimensions: Sequence[Field]):
+        """
+        Joins a slicer query with a series query, so that only the rows of the series selected by the series query
+        are returned. Rolled up dimensions are not joined on, so totals are not restricted to the selected series.
+        Series are compared with `null_safe_equal`, so series with NULL dimension values are not dropped.
+
+        :param query:
+            The slicer query to join with the series query.
+        :param series_query:
+            A query created with `make_series_query`.
+        :param dimensions:
+            The dimensions of the slicer query.
+        :return:
+            The joined query.
+        """
+        series_aliases = {select.alias for select in series_query._selects}
+        series_dimensions = [dimension for dimension in dimensions if alias_selector(dimension.alias) in series_aliases]
+        joined_dimensions = [dimension for dimension in series_dimensions if not isinstance(dimension, Rollup)]
+
+        if not joined_dimensions:
+            return query
+
+        joined_aliases = [alias_selector(dimension.alias) for dimension in joined_dimensions]
+        if len(joined_dimensions) < len(series_dimensions):
+            # The series query also selects the rolled up dimensions, so every row of a totals query would match
+            # several series and be counted once for each of them. Join on the distinct joined values instead. The
+            # series query is aliased "sq0" within the DISTINCT query, so the DISTINCT query gets an alias of its own.
+            series_query = (
+                self.query_cls.from_(series_query)
+                .select(*[series_query.field(alias).as_(alias) for alias in joined_aliases])
+                .distinct()
+                .as_("sq0_distinct")
+            )
+
+        criteria = [
+            self.null_safe_equal(self.transform_field_to_query(dimension, self.trunc_date), series_query.field(alias))
+            for dimension, alias in zip(joined_dimensions, joined_aliases)
+        ]
+
+        return query.join(series_query).on(Criterion.all(criteria))
+
+    def null_safe_equal(self, left: terms.Term, right: terms.Term) -> Criterion:
+        """
+        Override to provide a comparison of two terms which is also true when both are NULL, such as `<=>`.
+        """
+        return (left == right) | (left.isnull() & right.isnull())
+
+    def make_total_count_query(
+        self,
+        base_table: Table,
+        joins: Sequence[Join] = (),
+        dimensions: Sequence[Field] = (),
+        filters: Sequence[Filter] = (),
+        approximate: bool = False,
+    ) -> Type[QueryBuilder]:
+        """
+        Creates a pypika/SQL query counting the rows of a slicer query with the given dimensions and filters, which is
+        the number of distinct combinations of dimension values.
+
+        :param base_table:
+            pypika.Table - The base table of the query, the one in the FROM clause
+        :param joins:
+            A collection of joins available in the slicer.
+        :param dimensions:
+            The dimensions of the slicer query.
+        :param filters:
+            The filters of the slicer query.
+        :param approximate:
+            Whether the count may be approximated. If the platform supports it (see `approximate_count_distinct`) and
+            there are no filters on metrics, the combinations of dimension values are counted with an approximate
+            distinct count instead of counting the rows of the grouped slicer query.
+        :return:
+            A query selecting a single row with the count.
+        """
+        count_alias = alias_selector("count")
+        dimension_terms = [self.transform_field_to_query(dimension, self.trunc_date) for dimension in dimensions]
+        approximate_count = (
+            self.approximate_count_distinct(dimension_terms)
+            if approximate and dimension_terms and not any(fltr.is_aggregate for fltr in filters)
+            else None
+        )
+
+        if approximate_count is None:
+            slicer_query = self.make_slicer_query(base_table, joins, dimensions, filters=filters)
+            return self.query_cls.from_(slicer_query).select(fn.Count("*").as_(count_alias))
+
+        query = self.query_cls.from_(base_table, immutable=False)
+        query = self._add_joins(query, base_table, joins, flatten([dimensions, filters]))
+        for fltr in filters:
+            query = query.where(fltr.definition)
+
+        return query.select(approximate_count.as_(count_alias))
+
+    def approximate_count_distinct(self, dimension_terms: Sequence[terms.Term]):
+        """
+        Override to provide a function approximating the number of distinct combinations of the given terms, such as
+        APPROX_COUNT_DISTINCT. Returns None if the platform has no such function, in which case exact counts are used.
+
+        :param dimension_terms: The terms to count distinct combinations of.
+        """
+        return None
+
+    def make_seek_criterion(self, orders, values) -> Criterion:
+        """
+        Creates a criterion selecting the rows that come after a row with the given values for the order fields. This
+        is used for keyset pagination, where a page starts right after the last row of the previous page instead of
+        skipping a number of rows.
+
+        If all fields are ordered in the same direction and the platform supports it, the criterion compares row
+        values, e.g. `(a, b) > (1, 2)`, which lets the platform seek to the start of the page using an index.
+        Otherwise it is expanded to `a > 1 OR (a = 1 AND b > 2)`.
+
+        NULLs must be ordered first, whatever the direction (see `order_nulls_first`). The rows after a NULL value
+        are the ones with any other value, so a NULL value is compared with `IS NOT NULL` instead of `>` and `<`,
+        which are never true for NULL, e.g. `a IS NOT NULL OR (a IS NULL AND b > 2)`.
+
+        :param orders:
+            A list of (<Dimension/Metric>, pypika.Order) tuples. The order must be total, i.e. no two rows may have the
+            same values for all order fields.
+        :param values:
+            A list with a value for each order.
+        :return:
+            A criterion to add to the WHERE clause of the query, or to the HAVING clause if any order field is
+            an aggregate.
+        """
+        order_terms = [self.transform_field_to_query(field, self.trunc_date) for field, _ in orders]
+        values = [self.convert_date(value) if isinstance(value, datetime) else value for value in values]
+        descending = [orientation == Order.desc for _, orientation in orders]
+
+        if self.supports_row_value_comparison and len(set(descending)) == 1 and None not in values:
+            if descending[0]:
+                return Tuple(*order_terms) < Tuple(*values)
+            return Tuple(*order_terms) > Tuple(*values)
+
+        criteria = []
+        for i, (term, value) in enumerate(zip(order_terms, values)):
+            preceding_terms_equal = [
+                preceding_term.isnull() if preceding_value is None else preceding_term == preceding_value
+                for preceding_term, preceding_value in zip(order_terms[:i], values[:i])
+            ]
+            if value is None:
+                term_after = term.isnotnull()
+            else:
+                term_after = term < value if descending[i] else term > value
+            criteria.append(Criterion.all(preceding_terms_equal + [term_after]))
+
+        return Criterion.any(criteria)
+
+    def order_nulls_first(self, query):
+        """
+        Orders the NULLs of every order of a query first, whatever the direction, which keyset pagination relies on
+        (see `make_seek_criterion`). Platforms order NULLs first or last by default, sometimes depending on the
+        direction, so each order is preceded by an order on whether its term is NULL.
+
+        Override to use `NULLS FIRST` on platforms supporting it.
+        """
+        orderbys = []
+        for term, orientation in query._orderbys:
+            orderbys += [(Case().when(term.isnull(), 0).else_(1), None), (term, orientation)]
+        query._orderbys = orderbys
+        return query
+
     def make_latest_query(
         self,
         base_table: Table,
@@ -1,3 +1,5 @@
+import json
+
 from pypika import (
     Dialects,
     MySQLQuery,
@@ -6,10 +8,10 @@ from pypika import (
     functions as fn,
     terms,
 )
-from pypika.terms import CustomFunction, Interval, Parameter
+from pypika.terms import BasicCriterion, CustomFunction, Interval, Parameter
 
 from . import sql_types
-from .base import Database
+from .base import Database, NullSafeEquality, QueryCost
 from .type_engine import TypeEngine
 from ..exceptions import QueryCancelled
 
@@ -22,6 +24,15 @@ _Quarter = CustomFunction('QUARTER', ['arg'])
 _Timestamp = CustomFunction('TIMESTAMP', ['arg'])
 
 
+def _find_values(plan, key):
+    if isinstance(plan, dict):
+        values = [plan[key]] if key in plan else []
+        return values + [value for child in plan.values() for value in _find_values(child, key)]
+    if isinstance(plan, list):
+        return [value for child in plan for value in _find_values(child, key)]
+    return []
+
+
 class DateAdd(terms.Function):
     """
     Override for the MySQL specific DateAdd function which expects an interval instead of the date part and interval
@@ -56,6 +67,7 @@ class MySQLDatabase(Database):
 
     # The pypika query class to use for constructing queries
     query_cls = MySQLQuery
+    supports_row_value_comparison = True
 
     def __init__(
         self,
@@ -134,6 +146,23 @@ class MySQLDatabase(Database):
         interval_term = terms.Interval(**{'{}s'.format(str(date_part)): interval, 'dialect': Dialects.MYSQL})
         return DateAdd(field, interval_term)
 
+    def null_safe_equal(self, left, right):
+        return BasicCriterion(NullSafeEquality.null_safe_eq, left, right)
+
+    def make_explain_query(self, query):
+        return "EXPLAIN FORMAT=JSON {}".format(query)
+
+    def parse_query_plan(self, rows):
+        query_block = json.loads(rows[0][0]).get("query_block", {})
+        query_cost = query_block.get("cost_info", {}).get("query_cost")
+        # The number of rows of the largest intermediate result, as the plan only estimates rows per table
+        produced_rows = _find_values(query_block, "rows_produced_per_join")
+
+        return QueryCost(
+            rows=max(int(rows) for rows in produced_rows) if produced_rows else None,
+            cost=float(query_cost) if query_cost is not None else None,
+        )
+
     def get_column_definitions(self, schema, table, connection=None):
         columns = Table('columns', schema='INFORMATION_SCHEMA')
 
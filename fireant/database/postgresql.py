@@ -1,3 +1,5 @@
+import re
+
 from pypika import (
     Parameter,
     PostgreSQLQuery,
@@ -8,7 +10,10 @@ from pypika import (
 from pypika.terms import Node
 from pypika.utils import format_quotes
 
-from .base import Database
+from .base import Database, QueryCost
+
+# The estimates of a node of a plan, e.g. "Sort  (cost=10.00..12.50 rows=1000 width=4)". The first node is the root.
+PLAN_ESTIMATES_PATTERN = re.compile(r"cost=[\d.]+\.\.([\d.]+) rows=(\d+)")
 
 
 class DateTrunc(terms.Function):
@@ -50,6 +55,7 @@ class PostgreSQLDatabase(Database):
 
     # The pypika query class to use for constructing queries
     query_cls = PostgreSQLQuery
+    supports_row_value_comparison = True
 
     def __init__(self, host="localhost", port=5432, database=None, user=None, password=None, **kwargs):
         super().__init__(host, port, database, **kwargs)
@@ -73,6 +79,18 @@ class PostgreSQLDatabase(Database):
     def date_add(self, field, date_part, interval):
         return PostgresDateAdd(field, date_part, interval)
 
+    def make_explain_query(self, query):
+        return "EXPLAIN {}".format(query)
+
+    def parse_query_plan(self, rows):
+        for (line,) in rows:
+            match = PLAN_ESTIMATES_PATTERN.search(line)
+            if match is not None:
+                total_cost, plan_rows = match.groups()
+                return QueryCost(rows=int(plan_rows), cost=float(total_cost))
+
+        return QueryCost(rows=None, cost=None)
+
     def get_column_definitions(self, schema, table, connection=None):
         columns = Table("columns", schema="information_schema")
 
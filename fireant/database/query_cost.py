@@ -0,0 +1,5 @@
+from collections import namedtuple
+
+# The estimates of executing a query from its plan. `cost` is in the platform's own unit. Either is None when the
+# platform doesn't estimate it.
+QueryCost = namedtuple("QueryCost", ("rows", "cost"))
@@ -1,8 +1,21 @@
-from pypika import RedshiftQuery
+from pypika import RedshiftQuery, terms
 
 from .postgresql import PostgreSQLDatabase
 
 
+class ApproximateCountDistinct(terms.AggregateFunction):
+    """
+    Wrapper for the Redshift APPROXIMATE COUNT(DISTINCT ...) function, which estimates the number of distinct values
+    using HyperLogLog.
+    """
+
+    def __init__(self, term, alias=None):
+        super(ApproximateCountDistinct, self).__init__('COUNT', term, alias=alias)
+
+    def get_function_sql(self, **kwargs):
+        return 'APPROXIMATE COUNT(DISTINCT {})'.format(self.get_arg_sql(self.args[0], **kwargs))
+
+
 class RedshiftDatabase(PostgreSQLDatabase):
     """
     Redshift client that uses the psycopg module.
@@ -10,6 +23,14 @@ class RedshiftDatabase(PostgreSQLDatabase):
 
     # The pypika query class to use for constructing queries
     query_cls = RedshiftQuery
+    # Redshift is based on an old version of PostgreSQL, so row value comparisons are not relied upon
+    supports_row_value_comparison = False
 
     def __init__(self, host='localhost', port=5439, database=None, user=None, password=None, **kwargs):
         super(RedshiftDatabase, self).__init__(host, port, database, user, password, **kwargs)
+
+    def approximate_count_distinct(self, dimension_terms):
+        # Redshift can only approximate the number of distinct values of a single expression
+        if len(dimension_terms) == 1:
+            return ApproximateCountDistinct(dimension_terms[0])
+        return None
@@ -1,3 +1,5 @@
+import json
+
 from pypika import (
     Parameter,
     Table,
@@ -6,7 +8,7 @@ from pypika import (
 )
 from pypika.dialects import SnowflakeQuery
 
-from .base import Database
+from .base import Database, QueryCost
 
 IGNORED_SCHEMAS = {'INFORMATION_SCHEMA'}
 
@@ -20,6 +22,16 @@ class Trunc(terms.Function):
         super(Trunc, self).__init__('TRUNC', field, date_format, alias=alias)
 
 
+class ApproxCountDistinct(terms.AggregateFunction):
+    """
+    Wrapper for the APPROX_COUNT_DISTINCT function, which estimates the number of distinct combinations of its arguments
+    using HyperLogLog.
+    """
+
+    def __init__(self, *terms, alias=None):
+        super(ApproxCountDistinct, self).__init__('APPROX_COUNT_DISTINCT', *terms, alias=alias)
+
+
 class SnowflakeDatabase(Database):
     """
     Snowflake client.
@@ -52,6 +64,10 @@ class SnowflakeDatabase(Database):
         self.region = region
         self.warehouse = warehouse
 
+    @property
+    def cache_key(self):
+        return type(self), self.account, self.region, self.database
+
     def connect(self):
         import snowflake
 
@@ -72,6 +88,9 @@ class SnowflakeDatabase(Database):
     def date_add(self, field, date_part, interval):
         return fn.TimestampAdd(str(date_part), interval, field)
 
+    def approximate_count_distinct(self, dimension_terms):
+        return ApproxCountDistinct(*dimension_terms)
+
     def _get_private_key(self):
         if self._private_key is None:
             self._private_key = self._load_private_key_data()
@@ -97,6 +116,14 @@ class SnowflakeDatabase(Database):
             encryption_algorithm=serialization.NoEncryption(),
         )
 
+    def make_explain_query(self, query):
+        return "EXPLAIN USING JSON {}".format(query)
+
+    def parse_query_plan(self, rows):
+        # Snowflake doesn't estimate rows, the cost is the number of bytes of the micro-partitions to scan
+        global_stats = json.loads(rows[0][0]).get("GlobalStats", {})
+        return QueryCost(rows=None, cost=global_stats.get("bytesAssigned"))
+
     def get_column_definitions(self, schema, table, connection=None):
         columns = Table('COLUMNS', schema='INFORMATION_SCHEMA')
 
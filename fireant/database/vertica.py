@@ -1,3 +1,5 @@
+import re
+
 from pypika import (
     Parameter,
     Tables,
@@ -5,8 +7,9 @@ from pypika import (
     functions as fn,
     terms,
 )
+from pypika.terms import BasicCriterion
 
-from .base import Database
+from .base import Database, NullSafeEquality, QueryCost
 from .sql_types import (
     BigInt,
     Boolean,
@@ -28,6 +31,12 @@ from .sql_types import (
 from .type_engine import TypeEngine
 
 
+# The estimates of a path of a plan, e.g. "+-GROUPBY HASH [Cost: 1K, Rows: 10M (NO STATISTICS)] (PATH ID: 1)". The first
+# path is the root.
+PLAN_ESTIMATES_PATTERN = re.compile(r"\[Cost: ([\d.]+)([KMBT]?), Rows: ([\d.]+)([KMBT]?)")
+PLAN_ESTIMATE_MULTIPLIERS = {"": 1, "K": 10**3, "M": 10**6, "B": 10**9, "T": 10**12}
+
+
 class Trunc(terms.Function):
     """
     Wrapper for Vertica TRUNC function for truncating dates.
@@ -37,6 +46,16 @@ class Trunc(terms.Function):
         super(Trunc, self).__init__('TRUNC', field, date_format, alias=alias)
 
 
+class ApproximateCountDistinct(terms.AggregateFunction):
+    """
+    Wrapper for the Vertica APPROXIMATE_COUNT_DISTINCT function, which estimates the number of distinct values using
+    HyperLogLog.
+    """
+
+    def __init__(self, term, alias=None):
+        super(ApproximateCountDistinct, self).__init__('APPROXIMATE_COUNT_DISTINCT', term, alias=alias)
+
+
 class VerticaDatabase(Database):
     """
     Vertica client that uses the vertica_python driver.
@@ -100,6 +119,30 @@ class VerticaDatabase(Database):
     def date_add(self, field, date_part, interval):
         return fn.TimestampAdd(str(date_part), interval, field)
 
+    def approximate_count_distinct(self, dimension_terms):
+        if len(dimension_terms) == 1:
+            return ApproximateCountDistinct(dimension_terms[0])
+        # Combinations of values are counted by their hash. Collisions are negligible compared to the estimation error.
+        return ApproximateCountDistinct(fn.Function('HASH', *dimension_terms))
+
+    def null_safe_equal(self, left, right):
+        return BasicCriterion(NullSafeEquality.null_safe_eq, left, right)
+
+    def make_explain_query(self, query):
+        return "EXPLAIN {}".format(query)
+
+    def parse_query_plan(self, rows):
+        for (line,) in rows:
+            match = PLAN_ESTIMATES_PATTERN.search(line)
+            if match is not None:
+                cost, cost_unit, plan_rows, rows_unit = match.groups()
+                return QueryCost(
+                    rows=int(float(plan_rows) * PLAN_ESTIMATE_MULTIPLIERS[rows_unit]),
+                    cost=float(cost) * PLAN_ESTIMATE_MULTIPLIERS[cost_unit],
+                )
+
+        return QueryCost(rows=None, cost=None)
+
     def get_column_definitions(self, schema, table, connection=None):
         view_columns, table_columns = Tables('view_columns', 'columns')
 
@@ -1,5 +1,17 @@
+from typing import Optional
+
+from fireant.queries.cache import ResultCache
+
+
 class Annotation(object):
-    def __init__(self, table, field, alignment_field, dataset_alignment_field_alias):
+    def __init__(
+        self,
+        table,
+        field,
+        alignment_field,
+        dataset_alignment_field_alias,
+        cache: Optional[ResultCache] = None,
+    ):
         """
         :param table:
             A Pypika instance of the annotation table.
@@ -9,8 +21,12 @@ class Annotation(object):
             An additional field in the annotation table for aligning the annotation data with the dataset.
         :param dataset_alignment_field_alias:
             An alias of the alignment dimension in the associated dataset.
+        :param cache: (Optional)
+            A `ResultCache` for the annotation data. Annotations rarely change, so they can be cached for much longer
+            than the data of the dataset.
         """
         self.table = table
         self.field = field
         self.alignment_field = alignment_field
         self.dataset_alignment_field_alias = dataset_alignment_field_alias
+        self.cache = cache
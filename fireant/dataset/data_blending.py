@@ -4,6 +4,10 @@ from fireant.queries.builder import (
     DataSetBlenderQueryBuilder,
     DimensionChoicesQueryBuilder,
 )
+from fireant.queries.builder.dataset_blender_query_builder import (
+    find_dataset_fields_needed_to_be_mapped,
+    make_datasets_and_field_maps,
+)
 from fireant.utils import (
     deepcopy,
     immutable,
@@ -79,6 +83,7 @@ class DataSetBlender:
                 [*_wrap_dataset_fields(primary_dataset), *_wrap_dataset_fields(secondary_dataset)],
             )
         )
+        self._cache_field_maps()
 
         # add query builder entry points
         self.query = DataSetBlenderQueryBuilder(self)
@@ -109,8 +114,20 @@ class DataSetBlender:
     def __deepcopy__(self, memodict={}):
         for field in self.dimension_map.values():
             memodict[id(field)] = field
+        # The cached field maps only reference fields, which are shared between copies as well
+        memodict[id(self._fields_to_map)] = self._fields_to_map
+        memodict[id(self._field_maps)] = self._field_maps
         return deepcopy(self, memodict)
 
+    def _cache_field_maps(self):
+        """
+        Computes the field maps of the blended datasets, which map the fields of this blender to the fields of each
+        dataset. They only depend on the fields, so they are computed once instead of for every query. Only the set
+        dimensions of queries with set filters are mapped per query.
+        """
+        self._fields_to_map = find_dataset_fields_needed_to_be_mapped(self)
+        _, self._field_maps = make_datasets_and_field_maps(self)
+
     @property
     def table(self):
         return None
@@ -124,6 +141,8 @@ class DataSetBlender:
         for field in fields:
             self.fields.add(field)
 
+        self._cache_field_maps()
+
     def blend(self, other):
         """
         Returns a Data Set blender which enables to execute queries on multiple data sets and combine them.
@@ -1,10 +1,13 @@
 import itertools
+from typing import Optional
 
 from fireant.queries.builder import (
     DataSetQueryBuilder,
     DimensionChoicesQueryBuilder,
     DimensionLatestQueryBuilder,
 )
+from fireant.queries.builder.dimension_choices_query_builder import fetch_choices
+from fireant.queries.cache import ResultCache
 from fireant.utils import (
     deepcopy,
     immutable,
@@ -115,6 +118,9 @@ class DataSet:
         fields=(),
         always_query_all_metrics: bool = False,
         return_additional_metadata: bool = False,
+        choices_cache: Optional[ResultCache] = None,
+        latest_cache: Optional[ResultCache] = None,
+        latest_table=None,
     ):
         """
         Constructor for a dataset.  Contains all the fields to initialize the dataset.
@@ -136,6 +142,15 @@ class DataSet:
         :param return_additional_metadata: (Default: False)
             When true, widget data will be enveloped so extra metadata can be added to the response
             as follows: {'data': <widget data>, 'metadata': {...}}
+        :param choices_cache: (Optional)
+            A `ResultCache` for the choices of the dimensions of this dataset. Choices are cached per query, so per
+            dimension and set of filters.
+        :param latest_cache: (Optional)
+            A `ResultCache` for the latest values of the dimensions of this dataset, as fetched with `latest`.
+        :param latest_table: (Optional)
+            A pypika Table reference to a small table, e.g. a table of loaded partitions, with the same columns as the
+            primary table for the date dimensions. When set, the latest values of dimensions that don't require a join
+            are read from this table instead of scanning the primary table.
         """
         self.table = table
         self.database = database
@@ -149,6 +164,9 @@ class DataSet:
         self.latest = DimensionLatestQueryBuilder(self)
         self.always_query_all_metrics = always_query_all_metrics
         self.return_additional_metadata = return_additional_metadata
+        self.choices_cache = choices_cache
+        self.latest_cache = latest_cache
+        self.latest_table = latest_table
 
         for field in fields:
             if not field.definition.is_aggregate:
@@ -171,6 +189,26 @@ class DataSet:
             )
         )
 
+    def fetch_choices(self, *dimensions, filters=(), hint=None) -> dict:
+        """
+        Fetches the choices for several dimensions at once, e.g. for all filters of a filter panel. This is equivalent
+        to calling `dimension.choices.filter(*filters).fetch()` for each dimension, but all queries are executed in
+        a single call to the database. One query is still executed per dimension (see `fetch_choices`).
+
+        :param dimensions:
+            The dimensions to fetch choices for.
+        :param filters:
+            Filters to apply to the choices of every dimension.
+        :param hint:
+            For database vendors that support it, add a query hint to collect analytics on the queries triggered by
+            fireant.
+        :return:
+            A dict with the choices of each dimension, keyed by the dimension alias.
+        """
+        builders = [dimension.choices.filter(*filters) for dimension in dimensions]
+        results = fetch_choices(builders, hint=hint)
+        return {dimension.alias: result for dimension, result in zip(dimensions, results)}
+
     @immutable
     def extra_fields(self, *fields):
         for field in fields:
@@ -4,3 +4,7 @@ class DataSetException(Exception):
 
 class QueryCancelled(Exception):
     pass
+
+
+class QueryTooExpensive(Exception):
+    pass
@@ -1,2 +1,5 @@
 from .concurrency import ThreadPoolConcurrencyMiddleware
+from .cost_guard import QueryCostGuard
 from .decorators import log_middleware
+from .profiling import DirectoryProfileSink, LoggingProfileSink, ProfileResult, Profiler
+from .statistics import QueryStatistic, QueryStatistics
@@ -1,6 +1,8 @@
 from functools import wraps
 from multiprocessing.pool import ThreadPool
 
+from fireant.queries.tracing import run_in_context
+
 
 class ThreadPoolConcurrencyMiddleware:
     def __init__(self, max_processes=1):
@@ -10,7 +12,8 @@ class ThreadPoolConcurrencyMiddleware:
         @wraps(func)
         def wrapper(database, *queries, **kwargs):
             with ThreadPool(processes=self.max_processes) as pool:
-                results = pool.map(lambda query: func(database, query, **kwargs)[0], queries)
+                # The queries run in a copy of the context, so they are traced with the current trace
+                results = pool.map(run_in_context(lambda query: func(database, query, **kwargs)[0]), queries)
                 pool.close()
 
             return results
@@ -0,0 +1,170 @@
+import contextvars
+import logging
+import threading
+from functools import wraps
+from typing import Callable, Optional
+
+from fireant.database.query_cost import QueryCost
+from fireant.exceptions import QueryTooExpensive
+from fireant.queries.cache import ResultCache
+from fireant.queries.tracing import trace_span
+
+logger = logging.getLogger(__name__)
+
+# Set while explaining a query, so the explain query itself passes through the guard
+_explaining = contextvars.ContextVar("fireant_explaining", default=False)
+
+UNKNOWN_COST = QueryCost(rows=None, cost=None)
+
+
+class QueryCostGuard:
+    """
+    A database middleware estimating the cost of every query from its plan before executing it, and rejecting, queuing
+    or downgrading the queries whose estimated rows or cost exceed the thresholds.
+
+    Plans are fetched with the database's `estimate_query_cost`, which runs an EXPLAIN query on platforms supporting
+    it, over the connection the query is executed with if one is given. Queries on other platforms, or whose plan
+    could not be fetched, are always executed. The estimates are cached per database and SQL for `plan_cache_ttl`.
+    Queries only differing in the values they filter on are explained separately, as e.g. a wider date range can make
+    a query much more expensive.
+
+    Like `log_middleware`, the middleware executes queries one by one, so it must come after any concurrency middleware
+    in the middlewares of the database.
+    """
+
+    REJECT = "reject"
+    QUEUE = "queue"
+    DOWNGRADE = "downgrade"
+
+    def __init__(
+        self,
+        max_rows: Optional[int] = None,
+        max_cost: Optional[float] = None,
+        action: str = REJECT,
+        max_concurrent_expensive_queries: int = 1,
+        queue_timeout: Optional[float] = None,
+        downgrade: Optional[Callable[[str], str]] = None,
+        plan_cache_ttl: float = 3600,
+        plan_cache_size: int = 1024,
+    ):
+        """
+        :param max_rows: (Optional)
+            The maximum estimated number of rows of a query.
+        :param max_cost: (Optional)
+            The maximum estimated cost of a query, in the unit of the platform (see `parse_query_plan`).
+        :param action: (Default: "reject")
+            What to do with queries exceeding a threshold:
+             - "reject" raises `QueryTooExpensive`.
+             - "queue" waits until fewer than `max_concurrent_expensive_queries` expensive queries are executing.
+             - "downgrade" executes the SQL returned by `downgrade`, e.g. using a low priority resource pool.
+        :param max_concurrent_expensive_queries: (Default: 1)
+            The number of expensive queries executed at the same time when queuing them.
+        :param queue_timeout: (Optional)
+            The number of seconds a queued query waits for before it is rejected. Queries wait indefinitely if None.
+        :param downgrade: (Optional)
+            A function returning the SQL to execute instead of the SQL of an expensive query. Required when
+            downgrading.
+        :param plan_cache_ttl: (Default: 3600)
+            The number of seconds the estimates of a query are cached for. Estimates become outdated as the tables
+            grow.
+        :param plan_cache_size: (Default: 1024)
+            The maximum number of cached estimates.
+        """
+        if action not in (self.REJECT, self.QUEUE, self.DOWNGRADE):
+            raise ValueError("Invalid action provided to QueryCostGuard: {}".format(action))
+        if action == self.DOWNGRADE and downgrade is None:
+            raise ValueError("A downgrade function must be provided to QueryCostGuard for downgrading queries")
+
+        self.max_rows = max_rows
+        self.max_cost = max_cost
+        self.action = action
+        self.queue_timeout = queue_timeout
+        self.downgrade = downgrade
+        self.max_concurrent_expensive_queries = max_concurrent_expensive_queries
+        self.plan_cache = ResultCache(ttl=plan_cache_ttl, max_size=plan_cache_size)
+        self._queue = threading.BoundedSemaphore(max_concurrent_expensive_queries)
+
+    def __call__(self, func):
+        @wraps(func)
+        def wrapper(database, *queries, **kwargs):
+            if _explaining.get():
+                return func(database, *queries, **kwargs)
+
+            return [self._execute(func, database, query, kwargs) for query in queries]
+
+        return wrapper
+
+    def is_expensive(self, cost: QueryCost) -> bool:
+        return (self.max_rows is not None and cost.rows is not None and cost.rows > self.max_rows) or (
+            self.max_cost is not None and cost.cost is not None and cost.cost > self.max_cost
+        )
+
+    def estimate_query_cost(self, database, query: str, connection=None) -> QueryCost:
+        """
+        Returns the cached estimates of a query, explaining the query if it has no cached estimates.
+        """
+        return self.plan_cache.get((database.cache_key, str(query)), lambda: self._explain(database, query, connection))
+
+    def _explain(self, database, query, connection):
+        token = _explaining.set(True)
+        try:
+            with trace_span("explain"):
+                cost = database.estimate_query_cost(query, connection=connection)
+        except Exception:
+            # Queries are executed when their cost can't be estimated, rather than failing because of the guard
+            logger.exception("query_cost_estimation_failed", extra={'database': str(database)})
+            cost = None
+        finally:
+            _explaining.reset(token)
+
+        # Unknown estimates are cached as well, so failing plans are not fetched for every query
+        return cost if cost is not None else UNKNOWN_COST
+
+    def _execute(self, func, database, query, kwargs):
+        cost = self.estimate_query_cost(database, query, kwargs.get("connection"))
+        if not self.is_expensive(cost):
+            return func(database, query, **kwargs)[0]
+
+        logger.warning(
+            'query_too_expensive',
+            extra={'database': str(database), 'rows': cost.rows, 'cost': cost.cost, 'action': self.action},
+        )
+
+        if self.action == self.REJECT:
+            raise QueryTooExpensive(
+                "The query is estimated to return {} rows at a cost of {}".format(cost.rows, cost.cost)
+            )
+
+        if self.action == self.DOWNGRADE:
+            return func(database, self.downgrade(query), **kwargs)[0]
+
+        with trace_span("queue"):
+            if self.queue_timeout is None:
+                acquired = self._queue.acquire()
+            else:
+                acquired = self._queue.acquire(timeout=self.queue_timeout)
+        if not acquired:
+            raise QueryTooExpensive(
+                "The query is estimated to return {} rows at a cost of {} and timed out waiting to be executed".format(
+                    cost.rows, cost.cost
+                )
+            )
+
+        try:
+            return func(database, query, **kwargs)[0]
+        finally:
+            self._queue.release()
+
+    def __deepcopy__(self, memo=None):
+        # Shared by the copies of the database made when copying query builders, so queued queries share the slots
+        return self
+
+    def __getstate__(self):
+        # Semaphores can't be pickled
+        state = dict(self.__dict__)
+        del state['_queue']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._queue = threading.BoundedSemaphore(self.max_concurrent_expensive_queries)
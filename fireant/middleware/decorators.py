@@ -7,6 +7,8 @@ from fireant.middleware.slow_query_logger import (
     query_logger,
     slow_query_logger,
 )
+from fireant.queries.fingerprint import get_query_fingerprint, get_query_table
+from fireant.queries.tracing import trace_span
 
 
 def log_middleware(func):
@@ -25,7 +27,12 @@ def log_middleware(func):
             query_logger.info(query_log_msg)
 
             if database.slow_query_log_min_seconds is not None and duration >= database.slow_query_log_min_seconds:
-                slow_query_logger.warning(query_log_msg)
+                # The fingerprint is the same for queries which only differ in the values they filter on, so slow
+                # queries can be aggregated by it
+                fingerprint, _ = get_query_fingerprint(query)
+                slow_query_logger.warning(
+                    query_log_msg, extra=dict(fingerprint=fingerprint, table=get_query_table(query))
+                )
 
         return results
 
@@ -51,8 +58,9 @@ class CancelableConnection:
         self._handle_interrupt_signal gets set as signal handler for SIGINT right after opening the db connection.
         """
         self.previous_signal_handler = signal.getsignal(signal.SIGINT)
-        self.connection_context_manager = self.database.connect()
-        self.connection = self.connection_context_manager.__enter__()
+        with trace_span("connect", database=str(self.database)):
+            self.connection_context_manager = self.database.connect()
+            self.connection = self.connection_context_manager.__enter__()
         signal.signal(signal.SIGINT, self._handle_interrupt_signal)
         return self.connection
 
@@ -0,0 +1,209 @@
+import cProfile
+import io
+import itertools
+import json
+import logging
+import os
+import pstats
+import random
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from functools import wraps
+from typing import Callable, Dict, Optional
+
+profile_logger = logging.getLogger('fireant.profile_log')
+
+# Only one CPU profiler can be active at a time and memory allocations are traced for the whole process, so requests
+# are profiled one at a time. Requests sampled while another one is being profiled are not profiled.
+_profiling_lock = threading.Lock()
+
+
+class ProfileResult:
+    """
+    The CPU profile and the peak of memory allocated while running a profiled request.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        tags: Dict,
+        duration: float,
+        stats: Optional[pstats.Stats] = None,
+        memory_peak: Optional[int] = None,
+    ):
+        self.name = name
+        self.tags = tags
+        self.duration = duration
+        self.stats = stats
+        self.memory_peak = memory_peak
+
+    def summary(self, limit: int = 20) -> str:
+        """
+        :param limit:
+            The number of functions to list, sorted by cumulative time.
+        :return:
+            A text summary of the profile, with the functions which took the most time.
+        """
+        lines = [
+            '{name} {tags} [{duration} seconds, memory peak {memory_peak} bytes]'.format(
+                name=self.name, tags=self.tags, duration=round(self.duration, 4), memory_peak=self.memory_peak
+            )
+        ]
+        if self.stats is not None:
+            stream = io.StringIO()
+            self.stats.stream = stream
+            self.stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(limit)
+            lines.append(stream.getvalue())
+
+        return '\n'.join(lines)
+
+
+class LoggingProfileSink:
+    """
+    Logs a summary of every profile to the `fireant.profile_log` logger.
+    """
+
+    def __init__(self, logger: logging.Logger = profile_logger, limit: int = 20):
+        self.logger = logger
+        self.limit = limit
+
+    def __call__(self, result: ProfileResult):
+        self.logger.info(result.summary(self.limit))
+
+
+class DirectoryProfileSink:
+    """
+    Writes every profile to a directory, as a `.prof` file readable by `pstats` and tools such as snakeviz, and a
+    `.json` file with the duration, the memory peak and the tags of the request.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._counter = itertools.count()
+
+    def __call__(self, result: ProfileResult):
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(
+            self.directory,
+            '{name}-{time}-{pid}-{n}'.format(
+                name=result.name, time=int(time.time() * 1000), pid=os.getpid(), n=next(self._counter)
+            ),
+        )
+
+        if result.stats is not None:
+            result.stats.dump_stats(path + '.prof')
+
+        with open(path + '.json', 'w') as file:
+            json.dump(
+                dict(name=result.name, tags=result.tags, duration=result.duration, memory_peak=result.memory_peak),
+                file,
+                default=str,
+            )
+
+
+class Profiler:
+    """
+    Profiles a sampled fraction of requests and passes the profiles to a sink.
+
+    A profiler can be enabled for the whole `fetch` of a query, including post-processing and widget transforms,
+    with `DataSetQueryBuilder.profile`, or used as a database middleware to only profile executing the queries. The
+    same profiler is meant to be shared by all requests, so changing its `sample_rate` changes the fraction of profiled
+    requests without a redeploy. Only the thread running the request is profiled, so widgets transformed with an
+    executor are not included in the CPU profile.
+    """
+
+    def __init__(
+        self,
+        sink: Callable[[ProfileResult], None] = LoggingProfileSink(),
+        sample_rate: float = 1.0,
+        cpu: bool = True,
+        memory: bool = True,
+    ):
+        """
+        :param sink: (Default: `LoggingProfileSink`)
+            A function called with the `ProfileResult` of every profiled request.
+        :param sample_rate: (Default: 1.0)
+            The fraction of requests to profile, between 0 and 1.
+        :param cpu: (Default: True)
+            Whether to capture a CPU profile with cProfile.
+        :param memory: (Default: True)
+            Whether to capture the peak of allocated memory with tracemalloc. Tracing memory allocations slows the
+            profiled request down considerably.
+        """
+        self.sink = sink
+        self.sample_rate = sample_rate
+        self.cpu = cpu
+        self.memory = memory
+
+    def is_sampled(self) -> bool:
+        return random.random() < self.sample_rate
+
+    @contextmanager
+    def profile(self, name: str, **tags):
+        """
+        Profiles the code run in the context, if it is sampled and no other request is being profiled.
+
+        :param name:
+            The name of the profiled request, e.g. "fetch".
+        :param tags:
+            Tags describing the request, passed to the sink.
+        """
+        if not self.is_sampled() or not _profiling_lock.acquire(blocking=False):
+            yield
+            return
+
+        try:
+            with self._profile(name, tags):
+                yield
+        finally:
+            _profiling_lock.release()
+
+    @contextmanager
+    def _profile(self, name, tags):
+        start_tracing_memory = self.memory and not tracemalloc.is_tracing()
+        if start_tracing_memory:
+            tracemalloc.start()
+        if self.memory:
+            tracemalloc.reset_peak()
+
+        cpu_profile = cProfile.Profile() if self.cpu else None
+        start_time = time.perf_counter()
+        if cpu_profile is not None:
+            cpu_profile.enable()
+
+        try:
+            yield
+        finally:
+            if cpu_profile is not None:
+                cpu_profile.disable()
+            duration = time.perf_counter() - start_time
+            memory_peak = tracemalloc.get_traced_memory()[1] if self.memory else None
+            if start_tracing_memory:
+                tracemalloc.stop()
+
+            result = ProfileResult(
+                name,
+                tags,
+                duration,
+                stats=pstats.Stats(cpu_profile) if cpu_profile is not None else None,
+                memory_peak=memory_peak,
+            )
+            try:
+                self.sink(result)
+            except Exception:
+                # A failing sink must not fail the request
+                profile_logger.exception('Failed to write the profile of %s', name)
+
+    def __deepcopy__(self, memo=None):
+        # Shared by the copies of the database made when copying query builders, so the sample rate can be changed
+        return self
+
+    def __call__(self, func):
+        @wraps(func)
+        def wrapper(database, *queries, **kwargs):
+            with self.profile('execute', database=str(database), queries=len(queries)):
+                return func(database, *queries, **kwargs)
+
+        return wrapper
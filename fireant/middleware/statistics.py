@@ -0,0 +1,183 @@
+import threading
+import time
+from collections import deque
+from functools import wraps
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from fireant.queries.fingerprint import get_query_fingerprint, get_query_table
+
+# The key of the statistics of the queries whose fingerprint or dataset is over the maximum number of keys
+OTHER = "other"
+
+
+class QueryStatistic:
+    """
+    Statistics of executing a group of queries, e.g. all queries with the same fingerprint. Percentiles of the
+    duration are computed from the durations of the most recent queries only.
+    """
+
+    def __init__(self, max_samples: int = 1000):
+        self.count = 0
+        self.errors = 0
+        self.total_duration = 0.0
+        self.rows = 0
+        self.bytes = 0
+        self.durations = deque(maxlen=max_samples)
+
+    def record(self, duration: float, rows: Optional[int] = None, size: Optional[int] = None):
+        self.count += 1
+        self.total_duration += duration
+        self.durations.append(duration)
+        self.rows += rows or 0
+        self.bytes += size or 0
+
+    def record_error(self):
+        self.errors += 1
+
+    def to_dict(self) -> Dict:
+        p50, p95, p99 = (
+            [float(duration) for duration in np.percentile(self.durations, [50, 95, 99])]
+            if self.durations
+            else (None, None, None)
+        )
+        return dict(
+            count=self.count,
+            errors=self.errors,
+            total_duration=self.total_duration,
+            p50=p50,
+            p95=p95,
+            p99=p99,
+            rows=self.rows,
+            bytes=self.bytes,
+        )
+
+
+def _get_result_size(result) -> Optional[int]:
+    if isinstance(result, pd.DataFrame):
+        # Without the contents of strings, which are expensive to measure
+        return int(result.memory_usage(index=True).sum())
+    return None
+
+
+class QueryStatistics:
+    """
+    A database middleware aggregating the count, the duration percentiles, the rows and the bytes of the executed
+    queries per query fingerprint and per dataset. Queries have the same fingerprint when they only differ in the
+    values they filter on (see `fireant.queries.fingerprint`), so the statistics show which combinations of dimensions
+    and filters of a dataset are expensive. Datasets are identified by their table.
+
+    Like `log_middleware`, the middleware executes queries one by one, so it must come after any concurrency middleware
+    in the middlewares of the database. The same instance can be shared by several databases. The statistics can be
+    queried or exported periodically with `snapshot`.
+    """
+
+    def __init__(self, max_samples: int = 1000, max_keys: int = 1000):
+        """
+        :param max_samples: (Default: 1000)
+            The number of most recent durations kept for computing the percentiles of each fingerprint and dataset.
+        :param max_keys: (Default: 1000)
+            The maximum number of fingerprints, and of datasets, statistics are kept for. The statistics of the
+            queries of any other fingerprint or dataset are aggregated under "other", so the memory used is bounded.
+        """
+        self.max_samples = max_samples
+        self.max_keys = max_keys
+        self._init_state()
+
+    def _init_state(self):
+        self._lock = threading.Lock()
+        self._fingerprints: Dict[str, QueryStatistic] = {}
+        self._sql: Dict[str, str] = {}
+        self._tables: Dict[str, QueryStatistic] = {}
+
+    def __call__(self, func):
+        @wraps(func)
+        def wrapper(database, *queries, **kwargs):
+            results = []
+            for query in queries:
+                start_time = time.perf_counter()
+                try:
+                    result = func(database, query, **kwargs)[0]
+                except Exception:
+                    self.record_error(query)
+                    raise
+
+                self.record(query, time.perf_counter() - start_time, len(result), _get_result_size(result))
+                results.append(result)
+
+            return results
+
+        return wrapper
+
+    def _get_statistic(self, statistics: Dict[str, QueryStatistic], key: str) -> QueryStatistic:
+        if key not in statistics and len(statistics) - (OTHER in statistics) >= self.max_keys:
+            key = OTHER
+        if key not in statistics:
+            statistics[key] = QueryStatistic(self.max_samples)
+        return statistics[key]
+
+    def _record(self, sql: str, record: Callable[[QueryStatistic], None]):
+        # Fingerprinting the query is the expensive part, so it's done before acquiring the lock
+        fingerprint, normalized_sql = get_query_fingerprint(sql)
+        table = get_query_table(sql)
+
+        with self._lock:
+            statistic = self._get_statistic(self._fingerprints, fingerprint)
+            if fingerprint in self._fingerprints:
+                self._sql.setdefault(fingerprint, normalized_sql)
+            record(statistic)
+
+            if table is not None:
+                record(self._get_statistic(self._tables, table))
+
+    def record(self, sql: str, duration: float, rows: Optional[int] = None, size: Optional[int] = None):
+        """
+        Records an executed query.
+
+        :param sql: The SQL of the query, as passed to the database.
+        :param duration: The number of seconds it took to execute the query.
+        :param rows: The number of rows returned by the query.
+        :param size: The number of bytes of the result set of the query.
+        """
+        self._record(sql, lambda statistic: statistic.record(duration, rows, size))
+
+    def record_error(self, sql: str):
+        self._record(sql, QueryStatistic.record_error)
+
+    def snapshot(self, reset: bool = False) -> Dict[str, List[Dict]]:
+        """
+        :param reset: (Default: False)
+            Whether to clear the statistics, e.g. when exporting them periodically.
+        :return:
+            The statistics of every fingerprint, with its normalised SQL, and of every dataset, as lists of
+            dictionaries sorted by the total duration of the queries, most expensive first. The statistics of the
+            fingerprints and datasets over `max_keys` are under "other", without SQL.
+        """
+        with self._lock:
+            fingerprints = [
+                dict(fingerprint=fingerprint, sql=self._sql.get(fingerprint), **statistic.to_dict())
+                for fingerprint, statistic in self._fingerprints.items()
+            ]
+            tables = [dict(table=table, **statistic.to_dict()) for table, statistic in self._tables.items()]
+
+            if reset:
+                self._fingerprints, self._sql, self._tables = {}, {}, {}
+
+        return dict(
+            fingerprints=sorted(fingerprints, key=lambda statistic: -statistic["total_duration"]),
+            datasets=sorted(tables, key=lambda statistic: -statistic["total_duration"]),
+        )
+
+    def __deepcopy__(self, memo=None):
+        # Shared by the copies of the database made when copying query builders
+        return self
+
+    def __getstate__(self):
+        # Locks can't be pickled, the statistics are specific to the process
+        return dict(max_samples=self.max_samples, max_keys=self.max_keys)
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._init_state()
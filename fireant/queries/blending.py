@@ -0,0 +1,276 @@
+import operator
+from typing import Callable, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from pypika import functions as fn
+from pypika.enums import Arithmetic, Boolean, Equality
+from pypika.terms import (
+    ArithmeticExpression,
+    BasicCriterion,
+    BetweenCriterion,
+    Case,
+    ComplexCriterion,
+    ContainsCriterion,
+    Mod,
+    Negative,
+    Not,
+    NullCriterion,
+    NullValue,
+    Pow,
+    ValueWrapper,
+)
+
+from fireant.dataset.fields import Field, is_metric_field
+from fireant.dataset.modifiers import DimensionModifier, RollupValue
+from fireant.exceptions import DataSetException
+from fireant.queries.finders import find_field_in_modified_field
+from fireant.reference_helpers import reference_type_alias
+from fireant.utils import alias_selector
+
+ARITHMETIC_OPERATORS = {
+    Arithmetic.add: operator.add,
+    Arithmetic.sub: operator.sub,
+    Arithmetic.mul: operator.mul,
+    Arithmetic.div: operator.truediv,
+}
+
+COMPARISON_OPERATORS = {
+    Equality.eq: operator.eq,
+    Equality.ne: operator.ne,
+    Equality.gt: operator.gt,
+    Equality.gte: operator.ge,
+    Equality.lt: operator.lt,
+    Equality.lte: operator.le,
+}
+
+BOOLEAN_OPERATORS = {
+    Boolean.and_: operator.and_,
+    Boolean.or_: operator.or_,
+}
+
+
+class BlendingEvaluationException(DataSetException):
+    pass
+
+
+def _as_series(value, index):
+    if isinstance(value, pd.Series):
+        return value
+    return pd.Series([np.nan if value is None else value] * len(index), index=index)
+
+
+def _as_boolean(value, index):
+    # Nullable booleans follow the three-valued logic of SQL, e.g. NULL AND FALSE is FALSE and NOT NULL is NULL
+    return _as_series(value, index).astype("boolean")
+
+
+def _as_condition(value, index):
+    # NULL conditions are false, the same way they are in a WHERE clause or a CASE expression
+    return _as_boolean(value, index).fillna(False).astype(bool)
+
+
+def _apply_to_values(function, *operands, index, null_mask=None):
+    # Applies a function to the rows where no operand is NULL, the other rows are NULL
+    operands = [_as_series(operand, index) for operand in operands]
+    for operand in operands:
+        null_mask = operand.isnull() if null_mask is None else null_mask | operand.isnull()
+
+    return function(*[operand[~null_mask] for operand in operands]).reindex(index)
+
+
+def _divide(function, dividend, divisor, index):
+    # Dividing by zero is NULL rather than infinite, like with NULLIF(divisor, 0) in SQL
+    return _apply_to_values(function, dividend, divisor, index=index, null_mask=_as_series(divisor, index) == 0)
+
+
+def _arithmetic(operator_, left, right, index):
+    if operator_ is Arithmetic.div:
+        return _divide(operator.truediv, left, right, index)
+    return _apply_to_values(ARITHMETIC_OPERATORS[operator_], left, right, index=index)
+
+
+def _compare(operator_, left, right, index):
+    # Comparisons with NULL are NULL, not false
+    return _as_boolean(_apply_to_values(COMPARISON_OPERATORS[operator_], left, right, index=index), index)
+
+
+def evaluate_term(term, resolve_field: Callable[[Field], Optional[pd.Series]], index: pd.Index):
+    """
+    Evaluates a pypika expression over the columns of a data frame, vectorised, as a replacement for the database
+    evaluating it in a query. This supports the expressions used in the definitions of blended fields: arithmetic,
+    comparisons, boolean logic, CASE and COALESCE.
+
+    NULLs are evaluated like a database would: arithmetic and comparisons with NULL are NULL, dividing by zero is NULL,
+    boolean operators follow three-valued logic and conditions of CASE expressions are false when NULL. Boolean
+    results are nullable boolean series.
+
+    :param term:
+        The pypika term to evaluate.
+    :param resolve_field:
+        A function returning the column for a field, or None if the field has to be evaluated from its definition.
+    :param index:
+        The index of the data frame, used for expanding constants to series.
+    :return:
+        A series, or a scalar for constant terms.
+    """
+    evaluate = lambda sub_term: evaluate_term(sub_term, resolve_field, index)
+
+    if isinstance(term, (Field, DimensionModifier)):
+        column = resolve_field(term)
+        return column if column is not None else evaluate(term.definition)
+
+    if isinstance(term, RollupValue):
+        return RollupValue.CONSTANT
+
+    if isinstance(term, NullValue):
+        return None
+
+    if isinstance(term, ValueWrapper):
+        return term.value
+
+    if isinstance(term, (int, float, str)):
+        return term
+
+    if isinstance(term, ArithmeticExpression):
+        return _arithmetic(term.operator, evaluate(term.left), evaluate(term.right), index)
+
+    if isinstance(term, Mod):
+        return _divide(operator.mod, evaluate(term.args[0]), evaluate(term.args[1]), index)
+
+    if isinstance(term, Pow):
+        return _apply_to_values(operator.pow, evaluate(term.args[0]), evaluate(term.args[1]), index=index)
+
+    if isinstance(term, Negative):
+        return -evaluate(term.term)
+
+    if isinstance(term, BasicCriterion) and term.comparator in COMPARISON_OPERATORS:
+        return _compare(term.comparator, evaluate(term.left), evaluate(term.right), index)
+
+    if isinstance(term, ComplexCriterion) and term.comparator in BOOLEAN_OPERATORS:
+        return BOOLEAN_OPERATORS[term.comparator](
+            _as_boolean(evaluate(term.left), index), _as_boolean(evaluate(term.right), index)
+        )
+
+    if isinstance(term, Not):
+        return ~_as_boolean(evaluate(term.term), index)
+
+    if isinstance(term, NullCriterion):
+        return _as_series(evaluate(term.term), index).isnull()
+
+    if isinstance(term, ContainsCriterion):
+        values = [evaluate(value) for value in term.container.values]
+        contains = _as_boolean(
+            _apply_to_values(lambda value: value.isin(values), evaluate(term.term), index=index), index
+        )
+        return ~contains if term._is_negated else contains
+
+    if isinstance(term, BetweenCriterion):
+        between = _apply_to_values(
+            lambda value, start, end: (value >= start) & (value <= end),
+            evaluate(term.term),
+            evaluate(term.start),
+            evaluate(term.end),
+            index=index,
+        )
+        return _as_boolean(between, index)
+
+    if isinstance(term, Case):
+        result = _as_series(evaluate(term._else), index)
+        for criterion, value in reversed(term._cases):
+            result = _as_series(evaluate(value), index).where(_as_condition(evaluate(criterion), index), result)
+        return result.infer_objects()
+
+    if isinstance(term, fn.Coalesce):
+        result = _as_series(evaluate(term.args[0]), index)
+        for arg in term.args[1:]:
+            result = result.fillna(evaluate(arg))
+        return result
+
+    raise BlendingEvaluationException(
+        "The expression {} can't be evaluated when blending datasets locally.".format(term)
+    )
+
+
+def _prefix_columns(data_frame, i):
+    return data_frame.rename(columns=lambda column: "{}#{}".format(i, column))
+
+
+def _joined_column(i, alias):
+    return "{}#{}".format(i, alias_selector(alias))
+
+
+def blend_result_sets(
+    result_sets: Sequence[pd.DataFrame],
+    field_maps: Sequence[dict],
+    dimensions,
+    metrics,
+    reference=None,
+) -> pd.DataFrame:
+    """
+    Blends the result sets of the dataset queries of a blended query in memory, instead of joining the dataset queries
+    in a single query. This produces the same result set as the blended query, so the datasets don't need to be in
+    the same database.
+
+    The result set of every secondary dataset is left joined with the result set of the primary dataset on the mapped
+    dimensions, using a hash join, or cross joined if there are no mapped dimensions. The blended fields are then
+    selected from the joined result set. Complex blended fields are evaluated over it with `evaluate_term`.
+
+    :param result_sets:
+        The result sets of the dataset queries, starting with the primary dataset.
+    :param field_maps:
+        The field map of each dataset, mapping blender fields to the fields of the dataset.
+    :param dimensions:
+        The blender dimensions to select.
+    :param metrics:
+        The blender metrics to select.
+    :param reference:
+        The reference of the dataset queries, if they are reference queries.
+    :return:
+        A data frame with a column for each dimension and metric, keyed by their alias.
+    """
+    base_field_map, *join_field_maps = field_maps
+    joined = _prefix_columns(result_sets[0], 0)
+
+    for i, (result_set, join_field_map) in enumerate(zip(result_sets[1:], join_field_maps), start=1):
+        mapped_dimensions = [
+            dimension
+            for dimension in map(find_field_in_modified_field, dimensions)
+            if dimension in base_field_map and dimension in join_field_map
+        ]
+        left_on = [_joined_column(0, base_field_map[dimension].alias) for dimension in mapped_dimensions]
+        right_on = [_joined_column(i, join_field_map[dimension].alias) for dimension in mapped_dimensions]
+        join_df = _prefix_columns(result_set, i)
+
+        if not mapped_dimensions:
+            joined = joined.merge(join_df, how="cross")
+            continue
+
+        # NULL never equals NULL in a join criterion
+        join_df = join_df.dropna(subset=right_on)
+        joined = joined.merge(join_df, how="left", left_on=left_on, right_on=right_on)
+
+    def resolve_field(field):
+        unmodified_field = find_field_in_modified_field(field)
+
+        for i, field_map in enumerate(field_maps):
+            if unmodified_field in field_map:
+                # Only metrics are selected with the reference in the dataset queries
+                mapped_field = field_map[unmodified_field]
+                mapped_alias = reference_type_alias(mapped_field, reference if is_metric_field(mapped_field) else None)
+                return joined[_joined_column(i, mapped_alias)]
+
+        return None
+
+    blended = {}
+    for dimension in dimensions:
+        blended[alias_selector(dimension.alias)] = evaluate_term(dimension, resolve_field, joined.index)
+
+    for metric in metrics:
+        blended[alias_selector(reference_type_alias(metric, reference))] = evaluate_term(
+            metric, resolve_field, joined.index
+        )
+
+    return pd.DataFrame(
+        {alias: _as_series(values, joined.index) for alias, values in blended.items()}, index=joined.index
+    )
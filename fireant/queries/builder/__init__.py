@@ -1,7 +1,7 @@
 from .dataset_blender_query_builder import DataSetBlenderQueryBuilder
 from .dataset_query_builder import DataSetQueryBuilder
 from .dimension_choices_query_builder import DimensionChoicesQueryBuilder
-from .dimension_latest_query_builder import DimensionLatestQueryBuilder
+from .dimension_latest_query_builder import DimensionLatestQueryBuilder, fetch_latest
 from .query_builder import (
     QueryBuilder,
     QueryException,
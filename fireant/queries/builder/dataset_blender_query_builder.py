@@ -1,10 +1,16 @@
-import copy
+from concurrent.futures import ThreadPoolExecutor
 
 from typing import List
-from pypika import JoinType, terms
+from pypika import JoinType, Order, terms
 
 from fireant.dataset.fields import Field, is_metric_field
+from fireant.dataset.modifiers import ResultSet
 from fireant.queries.builder.dataset_query_builder import DataSetQueryBuilder
+from fireant.queries.blending import blend_result_sets
+from fireant.queries.builder.query_builder import QueryException, add_hints
+from fireant.queries.execution import fetch_result_sets, reduce_result_set
+from fireant.queries.rewrite import rewrite_term
+from fireant.queries.tracing import run_in_context, trace_span
 from fireant.queries.finders import (
     find_dataset_fields,
     find_field_in_modified_field,
@@ -13,13 +19,13 @@ from fireant.queries.finders import (
     find_share_dimensions,
 )
 from fireant.reference_helpers import reference_type_alias
-from fireant.utils import alias_selector, filter_nones, listify, ordered_distinct_list_by_attr
+from fireant.utils import alias_selector, filter_nones, immutable, listify, ordered_distinct_list_by_attr
 from fireant.widgets.base import Widget
 from fireant.queries.sets import apply_set_dimensions, omit_set_filters
 
 
 @listify
-def _find_dataset_fields_needed_to_be_mapped(dataset):
+def find_dataset_fields_needed_to_be_mapped(dataset):
     """
     This produces a list of fields from a DatasetBlender that need to be mapped up to the Datasets. This is any simple
     fields, or fields that are just pointers to fields in a Dataset, and breaks up complex fields, fields that are
@@ -83,25 +89,23 @@ def _map_field(dataset_fields, blender_dataset_fields, dimension_map=None):
             yield field, field
 
 
-def _datasets_and_field_maps(blender_dataset, filters):
+def make_datasets_and_field_maps(blender_dataset, filters=()):
     """
-    Returns a list of tuples shaped as dataset and its fields mapped per the blender dataset ones. The field maps
-    are later used for knowing which columns to query on the respective primary and secondary datasets, given the
-    columns selected for the blender dataset.
+    Returns a tuple of the datasets of a blender dataset and their fields mapped per the blender dataset ones. The
+    field maps are later used for knowing which columns to query on the respective primary and secondary datasets,
+    given the columns selected for the blender dataset.
 
     :param blender_dataset: A DataSetBlender instance.
     :param filters: A list of Filter instances, present on the blender query. This is used for creating dimensions
                     derived from filters, such as the set dimension.
-    :return: A list of tuples shaped as dataset and its fields mapped per the blender dataset ones.
+    :return: A tuple of a tuple of datasets and a tuple of the field map of each dataset.
     """
     from fireant.dataset.data_blending import DataSetBlender
 
     def _flatten_blend_datasets(dataset) -> List:
         primary_dataset = dataset.primary_dataset
         secondary_dataset = dataset.secondary_dataset
-        blender_dataset_fields = apply_set_dimensions(
-            _find_dataset_fields_needed_to_be_mapped(dataset), filters, dataset
-        )
+        blender_dataset_fields = apply_set_dimensions(dataset._fields_to_map, filters, dataset)
 
         primary_dataset_fields = set(apply_set_dimensions(primary_dataset.fields, filters, primary_dataset))
         secondary_dataset_fields = set(apply_set_dimensions(secondary_dataset.fields, filters, secondary_dataset))
@@ -148,7 +152,37 @@ def _datasets_and_field_maps(blender_dataset, filters):
             (secondary_dataset, blender_field_to_secondary_field_map),
         ]
 
-    return zip(*_flatten_blend_datasets(blender_dataset))
+    return tuple(zip(*_flatten_blend_datasets(blender_dataset)))
+
+
+def _find_blended_datasets(blender_dataset) -> List:
+    """
+    Returns the datasets blended by a blender dataset, in the same order as `make_datasets_and_field_maps`.
+    """
+    from fireant.dataset.data_blending import DataSetBlender
+
+    primary_dataset = blender_dataset.primary_dataset
+    primary_datasets = (
+        _find_blended_datasets(primary_dataset) if isinstance(primary_dataset, DataSetBlender) else [primary_dataset]
+    )
+    return [*primary_datasets, blender_dataset.secondary_dataset]
+
+
+def _datasets_and_field_maps(blender_dataset, filters):
+    """
+    Returns the datasets of a blender dataset and their field maps for a blender query. See
+    `make_datasets_and_field_maps`.
+
+    The field maps only depend on the fields of the blended datasets and on the set filters of the query. The field
+    maps without set dimensions are computed once, when creating the blender dataset, so they are only computed per
+    query when the query has set filters.
+    """
+    set_filters = [fltr for fltr in filters if isinstance(fltr, ResultSet)]
+
+    if not set_filters:
+        return _find_blended_datasets(blender_dataset), blender_dataset._field_maps
+
+    return make_datasets_and_field_maps(blender_dataset, set_filters)
 
 
 class EmptyWidget(Widget):
@@ -222,54 +256,42 @@ def _blender_join_criteria(base_query, join_query, dimensions, base_field_map, j
     return join_criteria
 
 
-def _deepcopy_recursive(node):
-    if isinstance(node, terms.ValueWrapper):
-        return node
-
-    cloned_node = copy.deepcopy(node)
-
-    if hasattr(node, 'definition'):
-        cloned_node.definition = _deepcopy_recursive(cloned_node.definition)
-    if hasattr(node, 'term'):
-        cloned_node.term = _deepcopy_recursive(cloned_node.term)
-    if hasattr(node, 'left'):
-        cloned_node.left = _deepcopy_recursive(cloned_node.left)
-    if hasattr(node, 'right'):
-        cloned_node.right = _deepcopy_recursive(cloned_node.right)
-    if hasattr(node, 'value'):
-        cloned_node.value = _deepcopy_recursive(cloned_node.value)
-
-    # Case expressions
-    if hasattr(node, '_cases'):
-        cloned_cases = []
+class _SubqueryField(Field):
+    """
+    A copy of a dataset field, which is rendered as the field selected from a dataset subquery of a blended query.
+    This replaces the dataset field in copies of the definitions of complex blender fields. Apart from rendering, it
+    behaves like the dataset field, e.g. when building filters or set dimensions from it.
+    """
 
-        for criterion, value in cloned_node._cases:
-            cloned_cases.append((_deepcopy_recursive(criterion), _deepcopy_recursive(value)))
+    def __init__(self, field, subquery_field):
+        self.__dict__.update(field.__dict__)
+        self.subquery_field = subquery_field
 
-        cloned_node._cases = cloned_cases
-    if hasattr(node, '_else'):
-        cloned_node._else = _deepcopy_recursive(cloned_node._else)
+    def nodes_(self):
+        yield self
+        yield from self.subquery_field.nodes_()
 
-    # Function expressions
-    if hasattr(node, 'params'):
-        cloned_node.params = [_deepcopy_recursive(param) for param in cloned_node.params]
-    if hasattr(node, 'args'):
-        cloned_node.args = [_deepcopy_recursive(arg) for arg in cloned_node.args]
+    def get_sql(self, **kwargs):
+        return self.subquery_field.get_sql(**kwargs)
 
-    # Modifiers
-    if hasattr(cloned_node, 'metric'):
-        cloned_node.metric = _deepcopy_recursive(cloned_node.metric)
-    if hasattr(cloned_node, 'dimension'):
-        cloned_node.dimension = _deepcopy_recursive(cloned_node.dimension)
-    if hasattr(cloned_node, 'filter'):
-        cloned_node.filter = _deepcopy_recursive(cloned_node.filter)
-    if hasattr(cloned_node, 'field'):
-        cloned_node.field = _deepcopy_recursive(cloned_node.field)
 
-    return cloned_node
+def _rewrite_definition(definition, substitutions):
+    """
+    Returns a copy of a definition in which fields are replaced by other terms, e.g. by the fields selected from the
+    dataset subqueries of a blended query. The definition itself is left untouched, so definitions shared between
+    queries, and threads, can be rewritten concurrently.
+
+    :param definition:
+        The definition to copy. This can also be a filter or a field, e.g. the field of a set filter.
+    :param substitutions:
+        A dict mapping the ids of the fields to replace to the terms replacing them.
+    :return:
+        A copy of the definition with the fields replaced.
+    """
+    return rewrite_term(definition, lambda node: substitutions.get(id(node)))
 
 
-def _get_sq_field_for_blender_field(field, queries, field_maps, reference=None):
+def _get_sq_field_for_blender_field(field, queries, field_maps, reference=None, substitutions=None):
     unmodified_field = find_field_in_modified_field(field)
     field_alias = alias_selector(reference_type_alias(field, reference))
 
@@ -285,16 +307,13 @@ def _get_sq_field_for_blender_field(field, queries, field_maps, reference=None):
         # case #1 modified fields, ex. day(timestamp) or rollup(dimension)
         return field.for_(subquery_field).as_(field_alias)
 
-    # Need to copy the metrics if there are references so that the `get_sql` monkey patch does not conflict.
-    # Given some of them might have nested metrics themselves, the clone process is performed recursively.
-
     definition = field.definition
 
     while isinstance(definition, Field):
         definition = definition.definition
 
-    # case #2: complex blender fields
-    return _deepcopy_recursive(definition).as_(field_alias)
+    # case #2: complex blender fields, which select an expression of the fields selected from the subqueries
+    return _rewrite_definition(definition, substitutions or {}).as_(field_alias)
 
 
 def _perform_join_operations(dimensions, base_query, base_field_map, join_queries, join_field_maps):
@@ -316,33 +335,93 @@ def _perform_join_operations(dimensions, base_query, base_field_map, join_querie
     return blender_query
 
 
+def _skip_join_key_only_queries(dimensions, queries, field_maps):
+    """
+    Removes the joined dataset queries which only select the dimensions they are joined on, e.g. the queries of
+    datasets which are only included for a metric filter. These are grouped by and left joined on their dimensions,
+    so they match at most one row and nothing is selected from them, hence skipping them does not change the result.
+    Queries without a GROUP BY, e.g. totals queries, can match several rows and are kept.
+
+    :return:
+        A tuple of the remaining queries and their field maps.
+    """
+    base_query, *join_queries = queries
+    base_field_map, *join_field_maps = field_maps
+
+    remaining_queries, remaining_field_maps = [base_query], [base_field_map]
+    for query, field_map in zip(join_queries, join_field_maps):
+        if query is not None:
+            join_keys = {
+                alias_selector(field_map[dimension].alias)
+                for dimension in map(find_field_in_modified_field, dimensions)
+                if dimension in base_field_map and dimension in field_map
+            }
+            selected_aliases = {select.alias for select in query._selects if not select.is_aggregate}
+            selects_metrics = any(select.is_aggregate for select in query._selects)
+
+            if join_keys and query._groupbys and not selects_metrics and selected_aliases <= join_keys:
+                continue
+
+        remaining_queries.append(query)
+        remaining_field_maps.append(field_map)
+
+    return remaining_queries, remaining_field_maps
+
+
+def _prune_unreferenced_metrics(queries, selected_terms):
+    """
+    Removes the metric columns of the dataset queries which are not referenced by the terms selected in the blended
+    query, e.g. metrics which are in several datasets but only selected from the first one, so the database doesn't
+    compute them.
+    """
+    referenced_columns = {
+        (id(node.table), node.name)
+        for term in selected_terms
+        for node in term.nodes_()
+        if isinstance(node, terms.Field) and node.table is not None
+    }
+
+    for query in filter_nones(queries):
+        selects = [
+            select
+            for select in query._selects
+            if not select.is_aggregate or (id(query), select.alias) in referenced_columns
+        ]
+        # A query needs to select something, even if nothing is referenced
+        if selects:
+            query._selects = selects
+
+
 def _blend_query(dimensions, metrics, orders, field_maps, queries, query_builder):
+    queries, field_maps = _skip_join_key_only_queries(dimensions, queries, field_maps)
     base_query, *join_queries = queries
     base_field_map, *join_field_maps = field_maps
 
     reference = base_query._references[0] if base_query._references else None
     blender_query = _perform_join_operations(dimensions, base_query, base_field_map, join_queries, join_field_maps)
 
-    mocked_metrics = set()
-
-    # WARNING: In order to make complex fields work, the get_sql for each field is monkey patched in. This must
-    # happen here because a complex metric by definition references values selected from the dataset subqueries.
+    # Complex fields are expressions of dataset fields, which are selected from the dataset subqueries here. Those
+    # fields are replaced in copies of the definitions, as the fields themselves are shared with other queries.
+    substitutions = {}
     for metric in find_dataset_fields(metrics):
-        subquery_field = _get_sq_field_for_blender_field(metric, queries, field_maps, reference)
-        metric._origin_get_sql = metric.get_sql
-        metric.get_sql = subquery_field.get_sql
-        mocked_metrics.add(metric)
+        subquery_field = _get_sq_field_for_blender_field(metric, queries, field_maps, reference, substitutions)
+        substitutions[id(metric)] = _SubqueryField(metric, subquery_field)
 
-    # WARNING: Artificial dimensions (i.e. dimensions created dynamically), which depend on a metric,
-    # can only be properly mapped once the metrics' get_sql methods are monkey patched. That's the case
-    # for set dimensions. Therefore, dimensions needs to be re-read from the query builder.
-    dimensions = query_builder.dimensions
+    # Artificial dimensions (i.e. dimensions created dynamically), which depend on a metric, need to be created from
+    # the filters with the fields replaced as well. That's the case for set dimensions.
+    set_filters = [
+        _rewrite_definition(fltr, substitutions) if is_metric_field(fltr.field) else fltr
+        for fltr in query_builder._filters
+        if isinstance(fltr, ResultSet)
+    ]
+    dimensions = apply_set_dimensions(query_builder._dimensions, set_filters, query_builder.dataset)
 
-    sq_dimensions = [_get_sq_field_for_blender_field(d, queries, field_maps) for d in dimensions]
-    sq_metrics = [_get_sq_field_for_blender_field(m, queries, field_maps, reference) for m in metrics]
+    sq_dimensions = [_get_sq_field_for_blender_field(d, queries, field_maps, None, substitutions) for d in dimensions]
+    sq_metrics = [_get_sq_field_for_blender_field(m, queries, field_maps, reference, substitutions) for m in metrics]
 
     blender_query = blender_query.select(*sq_dimensions).select(*sq_metrics)
 
+    sq_orderby_fields = []
     for field, orientation in orders:
         # Comparing fields using the is operator (i.e. object id) doesn't work for set
         # dimensions, which are dynamically generated. The dunder hash of Field class
@@ -350,26 +429,60 @@ def _blend_query(dimensions, metrics, orders, field_maps, queries, query_builder
         # in particular while object id is used for anything else.
         if not is_metric_field(field):
             # Don't add the reference type to dimensions.
-            orderby_field = _get_sq_field_for_blender_field(field, queries, field_maps)
+            orderby_field = _get_sq_field_for_blender_field(field, queries, field_maps, None, substitutions)
         else:
-            orderby_field = _get_sq_field_for_blender_field(field, queries, field_maps, reference)
+            orderby_field = _get_sq_field_for_blender_field(field, queries, field_maps, reference, substitutions)
 
         blender_query = blender_query.orderby(orderby_field, order=orientation)
+        sq_orderby_fields.append(orderby_field)
 
-    # Undo the get_sql's mocks above, otherwise reused datasets might produce different results. This issue can
-    # affect tests, for instance.
-    for metric in mocked_metrics:
-        metric.get_sql = metric._origin_get_sql
+    _prune_unreferenced_metrics(queries, [*sq_dimensions, *sq_metrics, *sq_orderby_fields])
 
     return blender_query
 
 
+class _LocallyBlendedQueries(list):
+    """
+    The queries of the blended datasets when blending locally, in the order of the datasets, along with what is needed
+    for blending their result sets. This is built once per fetch, so the queries aren't built again for blending.
+    """
+
+    def __init__(self, datasets_queries, datasets, field_maps, metrics):
+        super().__init__(query for dataset_queries in datasets_queries for query in dataset_queries)
+        self.datasets_queries = datasets_queries
+        self.datasets = datasets
+        self.field_maps = field_maps
+        self.metrics = metrics
+
+
 class DataSetBlenderQueryBuilder(DataSetQueryBuilder):
     """
     Blended dataset queries consist of widgets, dimensions, filters, orders by and references. At least one or
     more widgets is required. All others are optional.
     """
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._blend_locally = False
+
+    @immutable
+    def blend_locally(self, enabled: bool = True):
+        """
+        Sets whether the datasets are blended in memory instead of in the database.
+
+        By default, a single query is built, which left joins the queries of the blended datasets, so the datasets have
+        to be in the same database. With this enabled, the query of each dataset is executed on the database of that
+        dataset, concurrently, and the result sets are joined in memory with a hash join on the mapped dimensions.
+        Complex blended metrics are then evaluated over the joined result set, which supports arithmetic, comparisons,
+        CASE and COALESCE expressions.
+
+        :param enabled:
+            Whether to blend the datasets locally.
+        :return:
+            A copy of the query with local blending enabled or disabled.
+        """
+        self._blend_locally = enabled
+
     @property
     def sql(self):
         """
@@ -380,11 +493,155 @@ class DataSetBlenderQueryBuilder(DataSetQueryBuilder):
         to fetch the data.  When references are used, the base query normally produced is wrapped in an outer query and
         a query for each reference is joined based on the referenced dimension shifted.
 
+        When blending locally, the queries of the blended datasets are returned instead, grouped per dataset.
+
         :return: a list of Pypika's Query subclass instances.
         """
+        (
+            selected_blender_dimensions,
+            selected_blender_metrics,
+            datasets,
+            datasets_queries,
+            filtered_field_maps,
+        ) = self._make_datasets_queries()
+
+        if self._blend_locally:
+            return _LocallyBlendedQueries(datasets_queries, datasets, filtered_field_maps, selected_blender_metrics)
+
+        """
+        A dataset query can yield one or more sql queries, depending on how many types of references or dimensions
+        with totals are selected. A blended dataset query must yield the same number and types of sql queries, but each
+        blended together. The individual dataset queries built above will always yield the same number of sql queries,
+        so here those lists of sql queries are zipped.
+
+               base   ref  totals ref+totals
+        ds1 | ds1_a  ds1_b  ds1_c   ds1_d
+        ds2 | ds2_a  ds2_b  ds2_c   ds2_d
+
+        More concretely, using the diagram above as a reference, a dataset query with 1 reference and 1 totals dimension
+        would yield 4 sql queries. With data blending with 1 reference and 1 totals dimension, 4 sql queries must also
+        be produced.  The following lines convert the list of rows of the table in the diagram to a list of columns.
+        Each set of queries in a column are then reduced to a single data blending sql query.
+        """
+
+        per_dataset_queries_count = max([len(dataset_queries) for dataset_queries in datasets_queries])
+        # There will be the same amount of query sets as the longest length of queries for a single dataset
+        query_sets = [[] for _ in range(per_dataset_queries_count)]
+
+        # Add the queries returned for each dataset to the correct queryset
+        for dataset_index, dataset_queries in enumerate(datasets_queries):
+            for i, query in enumerate(dataset_queries):
+                query_sets[i].append(query)
+
+        blended_queries = []
+        for queryset in query_sets:
+            blended_query = _blend_query(
+                selected_blender_dimensions,
+                selected_blender_metrics,
+                self.orders,
+                filtered_field_maps,
+                queryset,
+                self,
+            )
+            blended_query = self._apply_pagination(blended_query)
+
+            if blended_query:
+                blended_queries.append(blended_query)
+
+        return blended_queries
+
+    def _compile(self, hint):
+        if not self._blend_locally:
+            return super()._compile(hint)
+
+        queries = self.sql
+        return _LocallyBlendedQueries(
+            [add_hints(dataset_queries, hint) for dataset_queries in queries.datasets_queries],
+            queries.datasets,
+            queries.field_maps,
+            queries.metrics,
+        )
+
+    def _fetch_data(self, queries, dimensions, share_dimensions, metadata):
+        if not self._blend_locally:
+            return super()._fetch_data(queries, dimensions, share_dimensions, metadata)
+
+        datasets, datasets_queries = queries.datasets, queries.datasets_queries
+        field_maps, blender_metrics = queries.field_maps, queries.metrics
+
+        # The queries of every dataset are executed on the database of that dataset, concurrently
+        fetch = run_in_context(fetch_result_sets)
+        with ThreadPoolExecutor(max_workers=len(datasets)) as executor:
+            futures = [
+                executor.submit(fetch, dataset.database, dataset_queries, dataset_dimensions)
+                for (dataset, dataset_dimensions), dataset_queries in zip(datasets, datasets_queries)
+            ]
+            datasets_results = [future.result() for future in futures]
+
+        max_rows_returned = max(dataset_max_rows_returned for dataset_max_rows_returned, _ in datasets_results)
+
+        # The result sets are blended per set of queries, like the queries are in `sql`
+        result_sets = []
+        for i in range(max(len(dataset_queries) for dataset_queries in datasets_queries)):
+            query_set = [
+                (dataset_queries[i], dataset_result_sets[i], field_map)
+                for dataset_queries, (_, dataset_result_sets), field_map in zip(
+                    datasets_queries, datasets_results, field_maps
+                )
+                if i < len(dataset_queries)
+            ]
+            base_query = query_set[0][0]
+            reference = base_query._references[0] if base_query._references else None
+
+            with trace_span("blend_result_sets"):
+                blended_result_set = blend_result_sets(
+                    [result_set for _, result_set, _ in query_set],
+                    [field_map for _, _, field_map in query_set],
+                    dimensions,
+                    blender_metrics,
+                    reference,
+                )
+            result_sets.append(self._paginate_blended_result_set(blended_result_set, reference))
+
+        with trace_span("reduce_result_set"):
+            return max_rows_returned, reduce_result_set(
+                result_sets, self.reference_groups, dimensions, share_dimensions
+            )
+
+    def _paginate_blended_result_set(self, data_frame, reference):
+        # The same ordering and pagination as `_apply_pagination` adds to blended queries
+        if self.orders:
+            columns = [
+                alias_selector(reference_type_alias(field, reference if is_metric_field(field) else None))
+                for field, _ in self.orders
+            ]
+            ascending = [orientation != Order.desc for _, orientation in self.orders]
+            data_frame = data_frame.sort_values(columns, ascending=ascending, kind="stable")
+
+        max_result_set_size = self.dataset.database.max_result_set_size
+        limit = min(self._query_limit or max_result_set_size, max_result_set_size)
+        offset = self._query_offset or 0
+        return data_frame.iloc[offset : offset + limit]
+
+    def _make_datasets_queries(self):
+        """
+        Determines the datasets needed for this query and builds the queries for each of them.
+
+        :return:
+            A tuple of the selected blender dimensions, the selected blender metrics (including the ones ordered by),
+            a list of (dataset, dataset dimensions) tuples for the included datasets, a list with the queries of each
+            included dataset, and a list with the field map of each included dataset.
+        """
         # First run validation for the query on all widgets
         self._validate()
 
+        if self._seek:
+            raise QueryException("Keyset pagination is not supported for blended datasets.")
+        if self._count_total:
+            raise QueryException("Counting the total number of rows is not supported for blended datasets.")
+        if self._shift_references_locally:
+            raise QueryException("Shifting references locally is not supported for blended datasets.")
+
         datasets, field_maps = _datasets_and_field_maps(self.dataset, self._filters)
 
         selected_blender_dimensions = self.dimensions
@@ -499,10 +756,12 @@ class DataSetBlenderQueryBuilder(DataSetQueryBuilder):
                 if is_selected_dimension:
                     dataset_dimensions[dataset_index].append(mapped_dimension)
 
+        included_datasets = []
         datasets_queries = []
         filtered_field_maps = []
         for dataset_index, dataset in enumerate(datasets):
             if dataset_included_in_final_query[dataset_index]:
+                included_datasets.append((dataset, dataset_dimensions[dataset_index]))
                 datasets_queries.append(
                     _build_dataset_query(
                         dataset,
@@ -518,44 +777,10 @@ class DataSetBlenderQueryBuilder(DataSetQueryBuilder):
                 # Filter the field maps of which the dataset is not going to be in the final query.
                 filtered_field_maps.append(field_maps[dataset_index])
 
-        """
-        A dataset query can yield one or more sql queries, depending on how many types of references or dimensions
-        with totals are selected. A blended dataset query must yield the same number and types of sql queries, but each
-        blended together. The individual dataset queries built above will always yield the same number of sql queries,
-        so here those lists of sql queries are zipped.
-
-               base   ref  totals ref+totals
-        ds1 | ds1_a  ds1_b  ds1_c   ds1_d
-        ds2 | ds2_a  ds2_b  ds2_c   ds2_d
-
-        More concretely, using the diagram above as a reference, a dataset query with 1 reference and 1 totals dimension
-        would yield 4 sql queries. With data blending with 1 reference and 1 totals dimension, 4 sql queries must also
-        be produced.  The following lines convert the list of rows of the table in the diagram to a list of columns.
-        Each set of queries in a column are then reduced to a single data blending sql query.
-        """
-
-        per_dataset_queries_count = max([len(dataset_queries) for dataset_queries in datasets_queries])
-        # There will be the same amount of query sets as the longest length of queries for a single dataset
-        query_sets = [[] for _ in range(per_dataset_queries_count)]
-
-        # Add the queries returned for each dataset to the correct queryset
-        for dataset_index, dataset_queries in enumerate(datasets_queries):
-            for i, query in enumerate(dataset_queries):
-                query_sets[i].append(query)
-
-        blended_queries = []
-        for queryset in query_sets:
-            blended_query = _blend_query(
-                selected_blender_dimensions,
-                selected_blender_metrics,
-                self.orders,
-                filtered_field_maps,
-                queryset,
-                self,
-            )
-            blended_query = self._apply_pagination(blended_query)
-
-            if blended_query:
-                blended_queries.append(blended_query)
-
-        return blended_queries
+        return (
+            selected_blender_dimensions,
+            selected_blender_metrics,
+            included_datasets,
+            datasets_queries,
+            filtered_field_maps,
+        )
@@ -1,8 +1,15 @@
-from typing import Dict, Iterable, List, TYPE_CHECKING, Type, Union
+import inspect
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import nullcontext
+from typing import Callable, Dict, Iterable, List, Optional, TYPE_CHECKING, Type, Union
+
+from pypika.terms import Term
 
 from fireant.dataset.fields import DataType
 from fireant.dataset.intervals import DatetimeInterval
+from fireant.dataset.modifiers import Rollup
 from fireant.dataset.totals import scrub_totals_from_share_results
+from fireant.middleware.profiling import Profiler
 from fireant.reference_helpers import (
     apply_reference_filters,
     reference_alias,
@@ -11,6 +18,7 @@ from fireant.utils import (
     alias_selector,
     immutable,
 )
+from fireant.widgets.base import TransformContext
 from .query_builder import (
     QueryBuilder,
     QueryException,
@@ -19,20 +27,70 @@ from .query_builder import (
     add_hints,
 )
 from .. import special_cases
-from ..execution import fetch_data
+from ..execution import fetch_data, fetch_result_sets, reduce_result_set
+from ..fingerprint import RenderedQuery
 from ..finders import (
     find_and_group_references_for_dimensions,
     find_field_in_modified_field,
     find_metrics_for_widgets,
     find_operations_for_widgets,
     find_share_dimensions,
+    find_totals_dimensions,
 )
 from ..pagination import paginate
+from ..references import make_local_reference_result_sets
+from ..seek import decode_continuation_token, encode_continuation_token, seek_orders
+from ..tracing import Trace, run_in_context, trace_span
 
 if TYPE_CHECKING:
     from pypika import PyPikaQueryBuilder
 
 
+def _transform_widget(widget, data_frame, dimensions, references, annotation_frame, transform_context):
+    """
+    Calls the widget's transform function, passing the transform context only to widgets which accept it.
+    """
+    with trace_span("transform_widget", widget=type(widget).__name__):
+        return _call_transform(widget, data_frame, dimensions, references, annotation_frame, transform_context)
+
+
+def _call_transform(widget, data_frame, dimensions, references, annotation_frame, transform_context):
+    try:
+        accepts_transform_context = "transform_context" in inspect.signature(widget.transform).parameters
+    except (TypeError, ValueError):
+        accepts_transform_context = False
+
+    if transform_context is not None and accepts_transform_context:
+        return widget.transform(
+            data_frame, dimensions, references, annotation_frame, transform_context=transform_context
+        )
+
+    return widget.transform(data_frame, dimensions, references, annotation_frame)
+
+
+def _transform_widgets(widgets, data_frame, dimensions, references, annotation_frame, executor=None):
+    """
+    Transforms the data frame into each of the widgets, either one after another or concurrently using an executor.
+    """
+    # Widgets share a transform context, so intermediate results are only computed once. That does not work across
+    # processes, where each widget has to compute everything on its own.
+    transform_context = None if isinstance(executor, ProcessPoolExecutor) else TransformContext()
+
+    if executor is None:
+        return [
+            _transform_widget(widget, data_frame, dimensions, references, annotation_frame, transform_context)
+            for widget in widgets
+        ]
+
+    # Widgets transformed in threads are traced with the current trace, which can't be sent to other processes
+    transform = _transform_widget if isinstance(executor, ProcessPoolExecutor) else run_in_context(_transform_widget)
+    futures = [
+        executor.submit(transform, widget, data_frame, dimensions, references, annotation_frame, transform_context)
+        for widget in widgets
+    ]
+    return [future.result() for future in futures]
+
+
 class DataSetQueryBuilder(ReferenceQueryBuilderMixin, WidgetQueryBuilderMixin, QueryBuilder):
     """
     Data Set queries consist of widgets, dimensions, filters, orders by and references. At least one or more widgets
@@ -43,10 +101,26 @@ class DataSetQueryBuilder(ReferenceQueryBuilderMixin, WidgetQueryBuilderMixin, Q
         super().__init__(dataset)
         self._totals_dimensions = set()
         self._apply_filter_to_totals = []
+        self._paginate_groups_in_query = False
+        self._seek = False
+        self._seek_token = None
+        self._count_total = False
+        self._count_total_approximate = False
+        self._trace = False
+        self._trace_hook = None
+        self._profiler = None
+        self._shift_references_locally = False
 
     def __call__(self, *args, **kwargs):
         return self
 
+    # noinspection PyDefaultArgument
+    def __deepcopy__(self, memodict={}):
+        # The trace hook and the profiler are not copied, as they are usually shared by all queries
+        memodict[id(self._trace_hook)] = self._trace_hook
+        memodict[id(self._profiler)] = self._profiler
+        return super().__deepcopy__(memodict)
+
     @immutable
     def filter(self, *filters, apply_to_totals=True):
         """
@@ -62,6 +136,232 @@ class DataSetQueryBuilder(ReferenceQueryBuilderMixin, WidgetQueryBuilderMixin, Q
         self._filters += [f for f in filters]
         self._apply_filter_to_totals += [apply_to_totals] * len(filters)
 
+    @immutable
+    def paginate_groups_in_query(self, enabled: bool = True):
+        """
+        Sets whether group pagination is applied in the database query instead of after fetching the data.
+
+        Widgets with group pagination, such as charts, paginate the series (combinations of the values of every
+        dimension after the first one) instead of the rows. By default all series are fetched and the client limit and
+        offset are applied to them afterwards. With this enabled, the series on the requested page are selected by a
+        subquery that is joined with the query, so only their rows are fetched. Series are then ordered by their
+        metrics aggregated in the database over all their rows, rather than by the sum of their rows.
+
+        :param enabled:
+            Whether to paginate groups in the query.
+        :return:
+            A copy of the query with group pagination in the query enabled or disabled.
+        """
+        self._paginate_groups_in_query = enabled
+
+    @immutable
+    def shift_references_locally(self, enabled: bool = True):
+        """
+        Sets whether references are computed from the result set of the query instead of with a separate query for
+        each reference group.
+
+        By default, every reference group (e.g. WoW, YoY) is fetched with a separate query, which scans the table again
+        with the reference dimension and its filters shifted. With this enabled, a single query fetches the rows of the
+        filtered range and of every shifted range, and each reference is computed by shifting the reference dimension
+        of those rows forward, aligned with the interval of the dimension.
+
+        The results are the same when the filters on the reference dimensions cover whole intervals of the dimensions,
+        e.g. whole weeks for a weekly dimension. The reference dimensions must be selected as dimensions and can only
+        be filtered by ranges of dates. This can't be combined with metric filters, totals for the reference
+        dimensions or pagination in the query, since those apply to the rows of all ranges at once.
+
+        :param enabled:
+            Whether to shift references locally.
+        :return:
+            A copy of the query with shifting references locally enabled or disabled.
+        """
+        self._shift_references_locally = enabled
+
+    @immutable
+    def seek(self, token: Optional[str] = None):
+        """
+        Enables keyset pagination. Instead of skipping the rows of the previous pages using an offset, each page starts
+        right after the last row of the previous page, which is found by comparing the values of the order fields.
+        This way the database does not need to sort and skip the rows of the previous pages, so every page costs the
+        same to fetch.
+
+        The page size is set with `limit_query`. The dimensions which are not ordered by are added to the orders, so
+        that the order is total. The result is returned with a `next_page_token` in the metadata (see
+        `DataSet.return_additional_metadata`), which is None on the last page. NULLs are ordered first for every
+        order field, whatever the direction. Keyset pagination can't be combined with totals or references.
+
+        :param token:
+            The continuation token from the metadata of the previous page, or None to fetch the first page.
+        :return:
+            A copy of the query with keyset pagination enabled.
+        """
+        self._seek = True
+        self._seek_token = token
+
+    @immutable
+    def count_total(self, approximate: bool = False):
+        """
+        Enables counting the total number of rows of the query before pagination, which is the number of distinct
+        combinations of dimension values. The count is fetched with a separate query, concurrently with the data, and
+        returned as `total_count` in the metadata (see `DataSet.return_additional_metadata`).
+
+        :param approximate:
+            Whether to use an approximate distinct count, on platforms which support it (see
+            `Database.approximate_count_distinct`). This is much cheaper on large tables, but is off by a few percent.
+        :return:
+            A copy of the query with counting the total number of rows enabled.
+        """
+        self._count_total = True
+        self._count_total_approximate = approximate
+
+    @immutable
+    def trace(self, hook: Optional[Callable[[Trace], None]] = None):
+        """
+        Enables tracing how long each phase of fetching the query takes. Spans are recorded for compiling the SQL,
+        acquiring connections, executing each query on the database (including fetching and converting the result
+        set), reducing the result sets, applying operations, paginating and transforming each widget. The spans of
+        queries are tagged with their SQL, the rolled up dimension of totals queries and the reference group of
+        reference queries.
+
+        The spans are returned as `trace` in the metadata (see `DataSet.return_additional_metadata`), as a list of
+        dicts with the id of the span and of its parent span, its name, tags, start time and duration in seconds.
+
+        :param hook: (Optional)
+            A function called with the `Trace` after fetching the query, also when fetching fails, e.g. for exporting
+            the spans to a tracing system such as OpenTelemetry.
+        :return:
+            A copy of the query with tracing enabled.
+        """
+        self._trace = True
+        self._trace_hook = hook
+
+    @immutable
+    def profile(self, profiler: Optional[Profiler] = None):
+        """
+        Enables profiling the whole fetch of the query, including post-processing and widget transforms, for the
+        fraction of requests sampled by the profiler. The profiles are written to the sink of the profiler.
+
+        :param profiler: (Optional)
+            The `Profiler` to profile with, which is usually shared by all queries. Defaults to a profiler of every
+            request which logs the profiles.
+        :return:
+            A copy of the query with profiling enabled.
+        """
+        self._profiler = profiler if profiler is not None else Profiler()
+
+    def _fetch_total_count(self, dimensions, hint=None):
+        if not dimensions:
+            # Without dimensions, all rows are aggregated into one
+            return 1
+
+        count_query = self.dataset.database.make_total_count_query(
+            base_table=self.table,
+            joins=self.dataset.joins,
+            dimensions=dimensions,
+            filters=self.filters,
+            approximate=self._count_total_approximate,
+        )
+        (count_query,) = add_hints([count_query], hint)
+
+        return int(self.dataset.database.fetch(RenderedQuery(count_query))[0][0])
+
+    @property
+    def _seek_orders(self):
+        return seek_orders(self.orders, self.dimensions)
+
+    @property
+    def _page_size(self):
+        return min(self._query_limit or float('inf'), self.dataset.database.max_result_set_size)
+
+    def _apply_seek(self, queries, dimensions, share_dimensions):
+        if find_totals_dimensions(dimensions, share_dimensions) or self._references:
+            raise QueryException("Keyset pagination can't be combined with totals or references.")
+
+        queries = [self.dataset.database.order_nulls_first(query) for query in queries]
+        if self._seek_token is None:
+            return queries
+
+        orders = self._seek_orders
+        values = decode_continuation_token(self._seek_token, orders)
+        criterion = self.dataset.database.make_seek_criterion(orders, values)
+
+        if any(field.is_aggregate for field, _ in orders):
+            return [query.having(criterion) for query in queries]
+        return [query.where(criterion) for query in queries]
+
+    @property
+    def _shifts_references_locally(self) -> bool:
+        return self._shift_references_locally and bool(self._references)
+
+    def _validate_local_references(self, dimensions, share_dimensions):
+        if self._query_limit is not None or self._query_offset is not None or self._groups_paginated_in_query:
+            raise QueryException("References can't be shifted locally when paginating in the query.")
+        if any(filter_.is_aggregate for filter_ in self.filters):
+            raise QueryException("References can't be shifted locally when filtering by metrics.")
+
+        raw_dimensions = [find_field_in_modified_field(dimension) for dimension in dimensions]
+        totals_dimensions = find_totals_dimensions(dimensions, share_dimensions)
+        first_totals_index = min(
+            (i for i, dimension in enumerate(dimensions) if any(dimension is totals for totals in totals_dimensions)),
+            default=len(dimensions),
+        )
+
+        for ref_dimension, _, _ in find_and_group_references_for_dimensions(dimensions, self._references):
+            indices = [i for i, dimension in enumerate(raw_dimensions) if dimension is ref_dimension]
+            if not indices:
+                raise QueryException(
+                    "References can only be shifted locally for selected dimensions. Select the {} dimension.".format(
+                        ref_dimension.alias
+                    )
+                )
+            if indices[0] >= first_totals_index:
+                raise QueryException(
+                    "References can't be shifted locally for the {} dimension as it is rolled up in a totals "
+                    "query.".format(ref_dimension.alias)
+                )
+
+            for filter_ in self.filters:
+                if filter_.field is not ref_dimension:
+                    continue
+                if not hasattr(filter_, "start") or any(
+                    isinstance(value, Term) for value in (filter_.start, filter_.stop)
+                ):
+                    raise QueryException(
+                        "References can only be shifted locally for dimensions filtered by ranges of dates."
+                    )
+
+    @property
+    def _groups_paginated_in_query(self) -> bool:
+        return (
+            self._paginate_groups_in_query
+            and (self._client_limit is not None or self._client_offset is not None)
+            and len(self.dimensions) > 1
+            and any(getattr(widget, "group_pagination", False) for widget in self._widgets)
+        )
+
+    def _make_series_query(self, dimensions):
+        x_axis_alias = alias_selector(dimensions[0].alias)
+        series_dimensions = [
+            dimension.dimension if isinstance(dimension, Rollup) else dimension for dimension in dimensions[1:]
+        ]
+
+        # Do not order series by the x-axis dimension, the same way it is done when paginating the data frame
+        orders = [
+            (field, orientation) for field, orientation in self.orders if alias_selector(field.alias) != x_axis_alias
+        ]
+        if not orders:
+            orders = [(dimension, None) for dimension in series_dimensions]
+
+        return self.dataset.database.make_series_query(
+            base_table=self.table,
+            joins=self.dataset.joins,
+            dimensions=series_dimensions,
+            filters=self.filters,
+            orders=orders,
+            limit=self._client_limit,
+            offset=self._client_offset,
+        )
+
     @property
     def reference_groups(self):
         return list(find_and_group_references_for_dimensions(self.dimensions, self._references).values())
@@ -87,6 +387,9 @@ class DataSetQueryBuilder(ReferenceQueryBuilderMixin, WidgetQueryBuilderMixin, Q
         operations = find_operations_for_widgets(self._widgets)
         share_dimensions = find_share_dimensions(dimensions, operations)
 
+        if self._shifts_references_locally:
+            self._validate_local_references(dimensions, share_dimensions)
+
         queries = self.dataset.database.make_slicer_query_with_totals_and_references(
             table=self.table,
             joins=self.dataset.joins,
@@ -95,85 +398,180 @@ class DataSetQueryBuilder(ReferenceQueryBuilderMixin, WidgetQueryBuilderMixin, Q
             operations=operations,
             filters=self.filters,
             references=self._references,
-            orders=self.orders,
+            orders=self._seek_orders if self._seek else self.orders,
             share_dimensions=share_dimensions,
+            series_query=self._make_series_query(dimensions) if self._groups_paginated_in_query else None,
+            shift_references_locally=self._shifts_references_locally,
         )
 
+        if self._seek:
+            queries = self._apply_seek(queries, dimensions, share_dimensions)
+
         return [self._apply_pagination(query) for query in queries]
 
-    def fetch(self, hint=None) -> Union[Iterable[Dict], Dict]:
+    def fetch(self, hint=None, executor: Optional[Executor] = None) -> Union[Iterable[Dict], Dict]:
         """
         Fetch the data for this query and transform it into the widgets.
 
         :param hint:
             A query hint label used with database vendors which support it. Adds a label comment to the query.
+        :param executor: (Optional)
+            A `concurrent.futures.Executor` used for transforming the widgets concurrently. With a thread pool,
+            widgets still share intermediate transformation results. With a process pool, the data frame and widgets
+            are pickled and sent to the worker processes, so they can't share them and widget results must be
+            picklable.
         :return:
             A list of dict (JSON) objects containing the widget configurations.
         """
-        queries = add_hints(self.sql, hint)
+        profiler = self._profiler
+        with profiler.profile("fetch", table=str(self.table)) if profiler is not None else nullcontext():
+            return self._fetch(hint, executor)
+
+    def _fetch(self, hint, executor):
+        if not self._trace:
+            widget_data, metadata = self._fetch_widget_data(hint, executor)
+            return self._transform_for_return(widget_data, **metadata)
+
+        trace = Trace()
+        try:
+            with trace.activate():
+                widget_data, metadata = self._fetch_widget_data(hint, executor)
+        finally:
+            if self._trace_hook is not None:
+                self._trace_hook(trace)
+
+        return self._transform_for_return(widget_data, trace=trace.to_dict(), **metadata)
+
+    def _fetch_widget_data(self, hint, executor):
+        with trace_span("compile"):
+            queries = self._compile(hint)
+
         operations = find_operations_for_widgets(self._widgets)
         dimensions = self.dimensions
 
         share_dimensions = find_share_dimensions(dimensions, operations)
 
-        annotation_frame = None
+        fetch_annotation = False
         if dimensions and self.dataset.annotation:
             alignment_dimension_alias = self.dataset.annotation.dataset_alignment_field_alias
             first_dimension = find_field_in_modified_field(dimensions[0])
+            fetch_annotation = first_dimension.alias == alignment_dimension_alias
 
-            if first_dimension.alias == alignment_dimension_alias:
-                annotation_frame = self.fetch_annotation()
-
-        max_rows_returned, data_frame = fetch_data(
-            self.dataset.database,
-            queries,
-            dimensions,
-            share_dimensions,
-            self.reference_groups,
-        )
-
-        # Apply reference filters
-        for reference in self._references:
-            data_frame = apply_reference_filters(data_frame, reference)
+        metadata = {}
+        # The annotation and the total count are fetched in the background while the data is being fetched
+        with ThreadPoolExecutor(max_workers=2) as background_executor:
+            annotation_future = (
+                background_executor.submit(run_in_context(self.fetch_annotation)) if fetch_annotation else None
+            )
+            total_count_future = (
+                background_executor.submit(run_in_context(self._fetch_total_count), dimensions, hint)
+                if self._count_total
+                else None
+            )
+            max_rows_returned, data_frame = self._fetch_data(queries, dimensions, share_dimensions, metadata)
+
+        annotation_frame = annotation_future.result() if annotation_future is not None else None
+        if total_count_future is not None:
+            metadata["total_count"] = total_count_future.result()
+
+        with trace_span("operations"):
+            # Apply reference filters
+            for reference in self._references:
+                data_frame = apply_reference_filters(data_frame, reference)
+
+            # Apply operations
+            for operation in operations:
+                for reference in [None] + self._references:
+                    df_key = alias_selector(reference_alias(operation, reference))
+                    data_frame[df_key] = operation.apply(data_frame, reference)
+
+            data_frame = scrub_totals_from_share_results(data_frame, dimensions)
+            data_frame = special_cases.apply_operations_to_data_frame(operations, data_frame)
+
+        with trace_span("paginate"):
+            # When groups are paginated in the query, the data frame only needs to be sorted
+            groups_paginated_in_query = self._groups_paginated_in_query
+            data_frame = paginate(
+                data_frame,
+                self._widgets,
+                orders=self.orders,
+                limit=None if groups_paginated_in_query else self._client_limit,
+                offset=None if groups_paginated_in_query else self._client_offset,
+            )
 
-        # Apply operations
-        for operation in operations:
-            for reference in [None] + self._references:
-                df_key = alias_selector(reference_alias(operation, reference))
-                data_frame[df_key] = operation.apply(data_frame, reference)
+        with trace_span("transform"):
+            widget_data = _transform_widgets(
+                self._widgets, data_frame, dimensions, self._references, annotation_frame, executor=executor
+            )
 
-        data_frame = scrub_totals_from_share_results(data_frame, dimensions)
-        data_frame = special_cases.apply_operations_to_data_frame(operations, data_frame)
+        return widget_data, dict(max_rows_returned=max_rows_returned, **metadata)
 
-        data_frame = paginate(
-            data_frame,
-            self._widgets,
-            orders=self.orders,
-            limit=self._client_limit,
-            offset=self._client_offset,
-        )
+    def _compile(self, hint):
+        # Builds the queries which are passed on to `_fetch_data`
+        return add_hints(self.sql, hint)
 
-        # Apply transformations
-        widget_data = [
-            widget.transform(
-                data_frame,
+    def _fetch_data(self, queries, dimensions, share_dimensions, metadata):
+        shifts_references_locally = self._shifts_references_locally
+        if not self._seek and not shifts_references_locally:
+            return fetch_data(
+                self.dataset.database,
+                queries,
                 dimensions,
-                self._references,
-                annotation_frame,
+                share_dimensions,
+                self.reference_groups,
             )
-            for widget in self._widgets
-        ]
 
-        return self._transform_for_return(widget_data, max_rows_returned=max_rows_returned)
+        max_rows_returned, result_sets = fetch_result_sets(self.dataset.database, queries, dimensions)
+
+        if shifts_references_locally:
+            reference_groups = find_and_group_references_for_dimensions(dimensions, self._references)
+            result_sets = [
+                reference_result_set
+                for query, result_set in zip(queries, result_sets)
+                for reference_result_set in make_local_reference_result_sets(
+                    result_set, query._reference_filters, reference_groups, dimensions
+                )
+            ]
+
+        with trace_span("reduce_result_set"):
+            data_frame = reduce_result_set(result_sets, self.reference_groups, dimensions, share_dimensions)
+        if not self._seek:
+            return max_rows_returned, data_frame
+
+        # The continuation token is read from the last row returned by the database, before the result set is sorted
+        # by its index
+
+        page = result_sets[0]
+        metadata["next_page_token"] = (
+            encode_continuation_token(self._seek_orders, page) if len(page) >= self._page_size else None
+        )
+
+        return max_rows_returned, data_frame
 
     def fetch_annotation(self):
         """
-        Fetch annotation data for this query builder.
+        Fetch annotation data for this query builder. When the annotation has a cache, annotation data is cached per
+        query, so per range of the filters on the alignment dimension.
 
         :return:
             A data frame containing the annotation data.
         """
         annotation = self.dataset.annotation
+        annotation_query = self._make_annotation_query()
+
+        def fetch():
+            _, annotation_df = fetch_data(self.dataset.database, [annotation_query], [annotation.alignment_field])
+            return annotation_df
+
+        if annotation.cache is None:
+            return fetch()
+
+        annotation_df = annotation.cache.get((self.dataset.database.cache_key, str(annotation_query)), fetch)
+        # Cached annotation data is shared, so a copy is returned
+        return annotation_df.copy()
+
+    def _make_annotation_query(self):
+        annotation = self.dataset.annotation
 
         # Fetch filters for the dataset's alignment dimension from this query builder
         dataset_alignment_dimension_filters = self.fetch_query_filters(annotation.dataset_alignment_field_alias)
@@ -197,16 +595,12 @@ class DataSetQueryBuilder(ReferenceQueryBuilderMixin, WidgetQueryBuilderMixin, Q
 
         annotation_dimensions = [annotation_alignment_field, annotation.field]
 
-        annotation_query = self.dataset.database.make_slicer_query(
+        return self.dataset.database.make_slicer_query(
             base_table=annotation.table,
             dimensions=annotation_dimensions,
             filters=annotation_alignment_dimension_filters,
         )
 
-        _, annotation_df = fetch_data(self.dataset.database, [annotation_query], [annotation.alignment_field])
-
-        return annotation_df
-
     def fetch_query_filters(self, dimension_alias):
         """
         Fetch all filters matching the given dimension alias from this query builder. All fields of a filter
@@ -1,15 +1,20 @@
-from typing import List
+from functools import partial
+from typing import List, Sequence
 
-from pypika import Order
+from pypika import Order, functions as fn
 
+from fireant.dataset.fields import DataType
 from fireant.utils import alias_selector
 from .query_builder import (
     QueryBuilder,
+    QueryException,
     add_hints,
+    fetch_cached_results,
     get_column_names,
 )
 from fireant.queries.execution import fetch_data
 from fireant.queries.finders import find_joins_for_tables
+from fireant.queries.search import ChoicesIndex, StartsWith
 from fireant.formats import display_value
 
 
@@ -123,28 +128,122 @@ class DimensionChoicesQueryBuilder(QueryBuilder):
         :return:
             A list of dict (JSON) objects containing the widget configurations.
         """
-        query = add_hints(self.sql, hint)[0]
+        leading_orders = []
+        if force_include:
+            _, dimension_definition, _ = self._get_definitions()
+            include = self.dataset.database.to_char(dimension_definition).isin([str(x) for x in force_include])
+
+            # Ensure that these values are included
+            leading_orders.append((include, Order.desc))
+
+        query = self._make_fetch_query(hint, leading_orders)
+        choices, max_rows_returned = self._fetch_cached_choices(query)
+        return self._transform_for_return(choices, max_rows_returned=max_rows_returned)
+
+    def search(self, prefix: str, limit: int = 20, hint=None, use_index: bool = False):
+        """
+        Fetch the choices whose display value starts with a prefix, ignoring case, e.g. for a typeahead input. Exact
+        matches are returned first, followed by the other matches in the order of the choices.
+
+        Only the choices of dimensions with a text display can be searched, as the display values of other types are
+        formatted, so the values stored in the database would not match the displayed ones.
+
+        :param prefix:
+            The prefix to search for.
+        :param limit:
+            The maximum number of choices to return.
+        :param hint:
+            For database vendors that support it, add a query hint to collect analytics on the queries triggered by
+            fireant.
+        :param use_index:
+            When True, all choices are fetched once and searched in memory using a sorted index, instead of querying
+            the database for every search. The index is kept in the dataset's choices cache, so this requires the
+            dataset to have one in order to avoid querying the database.
+        :return:
+            The matching choices, in the same format as returned by `fetch`.
+        """
+        display_dimension = self.dimensions[-1]
+        if display_dimension.data_type != DataType.text:
+            raise QueryException(
+                "Only the choices of text dimensions can be searched, {} is a {} dimension.".format(
+                    display_dimension.alias, display_dimension.data_type.name
+                )
+            )
+
+        if use_index:
+            choices = self._get_choices_index(hint).search(prefix, limit)
+            return self._transform_for_return(choices, max_rows_returned=len(choices))
+
+        _, _, display_definition = self._get_definitions()
+        search_term = fn.Lower(display_definition)
+        lowered_prefix = prefix.lower()
+
+        query = self._make_fetch_query(hint, [(search_term == lowered_prefix, Order.desc)])
+        query = query.where(StartsWith(search_term, lowered_prefix)).limit(limit)
+
+        choices, max_rows_returned = self._fetch_cached_choices(query)
+        return self._transform_for_return(choices, max_rows_returned=max_rows_returned)
+
+    def _get_definitions(self):
+        """
+        Returns the definitions of the dimension, with and without its alias, and the definition of its display,
+        using the hint table if there is one.
+        """
         dimension = self.dimensions[0]
         alias_definition = dimension.definition.as_(alias_selector(dimension.alias))
         dimension_definition = dimension.definition
+        display_definition = self.dimensions[-1].definition
 
         if self.hint_table:
             alias_definition = alias_definition.replace_table(alias_definition.table, self.hint_table)
             dimension_definition = dimension.definition.replace_table(dimension_definition.table, self.hint_table)
+            display_definition = display_definition.replace_table(display_definition.table, self.hint_table)
 
-        if force_include:
-            include = self.dataset.database.to_char(dimension_definition).isin([str(x) for x in force_include])
+        return alias_definition, dimension_definition, display_definition
 
-            # Ensure that these values are included
-            query = query.orderby(include, order=Order.desc)
+    def _make_fetch_query(self, hint=None, leading_orders=()):
+        query = add_hints(self.sql, hint)[0]
+        alias_definition, dimension_definition, _ = self._get_definitions()
+
+        for term, orientation in leading_orders:
+            query = query.orderby(term, order=orientation)
 
         # Filter out NULL values from choices
         query = query.where(dimension_definition.notnull())
 
         # Order by the dimension definition that the choices are for
-        query = query.orderby(alias_definition)
+        return query.orderby(alias_definition)
+
+    def _get_cache_key(self, query):
+        return self.dataset.database.cache_key, str(query)
+
+    def _fetch_cached_choices(self, query):
+        choices_cache = self.dataset.choices_cache
+        if choices_cache is None:
+            return self._fetch_choices(query)
+
+        choices, max_rows_returned = choices_cache.get(self._get_cache_key(query), partial(self._fetch_choices, query))
+        # Cached choices are shared, so a copy is returned
+        return choices.copy(), max_rows_returned
+
+    def _get_choices_index(self, hint=None):
+        query = self._make_fetch_query(hint)
+
+        def make_index():
+            choices, _ = self._fetch_choices(query)
+            return ChoicesIndex(choices)
+
+        choices_cache = self.dataset.choices_cache
+        if choices_cache is None:
+            return make_index()
+
+        return choices_cache.get(("index",) + self._get_cache_key(query), make_index)
+
+    def _fetch_choices(self, query):
         max_rows_returned, data = fetch_data(self.dataset.database, [query], self.dimensions)
+        return self._make_choices(data), max_rows_returned
 
+    def _make_choices(self, data):
         if len(data.index.names) > 1:
             display_alias = data.index.names[1]
             data.reset_index(display_alias, inplace=True)
@@ -155,10 +254,41 @@ class DimensionChoicesQueryBuilder(QueryBuilder):
             choices = data["display"]
 
         dimension_display = self.dimensions[-1]
-        choices = choices.map(lambda raw: display_value(raw, dimension_display) or raw)
-        return self._transform_for_return(choices, max_rows_returned=max_rows_returned)
+        return choices.map(lambda raw: display_value(raw, dimension_display) or raw)
 
     def __repr__(self):
         return ".".join(
             ["dataset", self._dimensions[0].alias, "choices"] + ["filter({})".format(repr(f)) for f in self._filters]
         )
+
+
+def fetch_choices(builders: Sequence[DimensionChoicesQueryBuilder], hint=None) -> List:
+    """
+    Fetches the choices of several dimension choices query builders at once. The queries are executed together in a
+    single call to the database, so over a single connection, or concurrently if the database is configured with the
+    `ThreadPoolConcurrencyMiddleware`. Choices found in the choices cache of their dataset are not fetched again.
+
+    There is still one query per builder. The queries are not combined into one, e.g. with UNION ALL, as the
+    dimensions of the builders have different types and numbers of columns.
+
+    :param builders:
+        The dimension choices query builders. The queries of builders whose datasets use different databases are
+        executed in a call to each database.
+    :param hint:
+        For database vendors that support it, add a query hint to collect analytics on the queries triggered by
+        fireant.
+    :return:
+        A list with the choices of each builder, in the same format as returned by `fetch`.
+    """
+    queries = [builder._make_fetch_query(hint) for builder in builders]
+    results = fetch_cached_results(
+        builders,
+        queries,
+        lambda builder: builder.dataset.choices_cache,
+        lambda builder, data: builder._make_choices(data),
+    )
+
+    return [
+        builder._transform_for_return(choices.copy(), max_rows_returned=max_rows_returned)
+        for builder, (choices, max_rows_returned) in zip(builders, results)
+    ]
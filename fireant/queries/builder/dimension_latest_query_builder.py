@@ -1,3 +1,6 @@
+from functools import partial
+from typing import List, Sequence
+
 import pandas as pd
 
 from fireant.dataset.fields import Field
@@ -5,8 +8,9 @@ from fireant.utils import (
     alias_for_alias_selector,
     immutable,
 )
-from fireant.queries.builder.query_builder import QueryBuilder, QueryException, add_hints
+from fireant.queries.builder.query_builder import QueryBuilder, QueryException, add_hints, fetch_cached_results
 from fireant.queries.execution import fetch_data
+from fireant.queries.finders import find_required_tables_to_join
 
 
 class DimensionLatestQueryBuilder(QueryBuilder):
@@ -27,6 +31,9 @@ class DimensionLatestQueryBuilder(QueryBuilder):
         needed for the query to fetch choices for dimensions.
 
         The dataset query extends this with metrics, references, and totals.
+
+        When the dataset has a latest table, the latest values are read from it instead of the dataset's table, unless
+        a dimension requires a join.
         """
         if not self.dimensions:
             raise QueryException("Must select at least one dimension to query latest values")
@@ -36,13 +43,31 @@ class DimensionLatestQueryBuilder(QueryBuilder):
             joins=self.dataset.joins,
             dimensions=self.dimensions,
         )
+
+        latest_table = self.dataset.latest_table
+        if latest_table is not None and not find_required_tables_to_join(self.dimensions, self.table):
+            query = query.replace_table(self.table, latest_table)
+
         return [query]
 
     def fetch(self, hint=None):
-        queries = add_hints(self.sql, hint)
-        max_rows_returned, data = fetch_data(self.dataset.database, queries, self.dimensions)
-        data = self._get_latest_data_from_df(data)
-        return self._transform_for_return(data, max_rows_returned=max_rows_returned)
+        query = add_hints(self.sql, hint)[0]
+
+        latest_cache = self.dataset.latest_cache
+        if latest_cache is None:
+            data, max_rows_returned = self._fetch_latest(query)
+        else:
+            data, max_rows_returned = latest_cache.get(self._get_cache_key(query), partial(self._fetch_latest, query))
+
+        # Cached latest values are shared, so a copy is returned
+        return self._transform_for_return(data.copy(), max_rows_returned=max_rows_returned)
+
+    def _get_cache_key(self, query):
+        return self.dataset.database.cache_key, str(query)
+
+    def _fetch_latest(self, query):
+        max_rows_returned, data = fetch_data(self.dataset.database, [query], self.dimensions)
+        return self._get_latest_data_from_df(data), max_rows_returned
 
     def _get_latest_data_from_df(self, df: pd.DataFrame) -> pd.Series:
         latest = df.reset_index().iloc[0]
@@ -50,3 +75,34 @@ class DimensionLatestQueryBuilder(QueryBuilder):
         latest.name = None
         latest.index = [alias_for_alias_selector(alias) for alias in latest.index]
         return latest
+
+
+def fetch_latest(builders: Sequence[DimensionLatestQueryBuilder], hint=None) -> List:
+    """
+    Fetches the latest values of several dimension latest query builders at once, e.g. for every dataset shown on a
+    dashboard. The queries of the builders using the same database are executed together in a single call to that
+    database. Latest values found in the latest cache of their dataset are not fetched again.
+
+    There is still one query per builder, as the latest queries of different datasets select different dimensions
+    from different tables, so they are not combined into one.
+
+    :param builders:
+        The dimension latest query builders. Their datasets may use different databases.
+    :param hint:
+        For database vendors that support it, add a query hint to collect analytics on the queries triggered by
+        fireant.
+    :return:
+        A list with the latest values of each builder, in the same format as returned by `fetch`.
+    """
+    queries = [add_hints(builder.sql, hint)[0] for builder in builders]
+    results = fetch_cached_results(
+        builders,
+        queries,
+        lambda builder: builder.dataset.latest_cache,
+        lambda builder, data: builder._get_latest_data_from_df(data),
+    )
+
+    return [
+        builder._transform_for_return(data.copy(), max_rows_returned=max_rows_returned)
+        for builder, (data, max_rows_returned) in zip(builders, results)
+    ]
@@ -1,4 +1,4 @@
-from typing import TYPE_CHECKING, Union
+from typing import Callable, List, Optional, Sequence, TYPE_CHECKING, Union
 
 from pypika import Order
 
@@ -8,7 +8,8 @@ from fireant.utils import (
     deepcopy,
     immutable,
 )
-from ..execution import fetch_data
+from ..cache import ResultCache
+from ..execution import fetch_data, fetch_result_sets, reduce_result_set
 from ..finders import find_field_in_modified_field
 from ..sets import (
     apply_set_dimensions,
@@ -16,6 +17,8 @@ from ..sets import (
 )
 
 if TYPE_CHECKING:
+    import pandas as pd
+
     from fireant.dataset import DataSet
 
 
@@ -28,11 +31,62 @@ def add_hints(queries, hint=None):
 
 
 def get_column_names(database, table):
-    column_definitions = database.get_column_definitions(table._schema._name, table._table_name)
+    column_definitions = database.get_cached_column_definitions(table._schema._name, table._table_name)
 
     return {column_definition[0] for column_definition in column_definitions}
 
 
+def fetch_cached_results(
+    builders: Sequence["QueryBuilder"],
+    queries: Sequence,
+    get_cache: Callable[["QueryBuilder"], Optional[ResultCache]],
+    make_result: Callable[["QueryBuilder", "pd.DataFrame"], object],
+) -> List:
+    """
+    Fetches the results of the queries of several query builders, skipping the results found in the cache of their
+    builder. The missing queries of the builders using the same database are executed together in a single call to
+    that database, but are not combined into a single query.
+
+    :param builders:
+        The query builders, which must have a `_get_cache_key(query)` method.
+    :param queries:
+        The query of each builder.
+    :param get_cache:
+        A function returning the cache of a builder, or None if its results are not cached.
+    :param make_result:
+        A function making the result of a builder from the data frame of its query.
+    :return:
+        A list with a tuple of the result and the number of rows returned for each builder.
+    """
+    results = [None] * len(builders)
+
+    for i, (builder, query) in enumerate(zip(builders, queries)):
+        cache = get_cache(builder)
+        if cache is not None:
+            results[i] = cache.peek(builder._get_cache_key(query))
+
+    missing_per_database = {}
+    for i, result in enumerate(results):
+        if result is None:
+            missing_per_database.setdefault(builders[i].dataset.database.cache_key, []).append(i)
+
+    for missing in missing_per_database.values():
+        database = builders[missing[0]].dataset.database
+        dimensions = [dimension for i in missing for dimension in builders[i].dimensions]
+        _, result_sets = fetch_result_sets(database, [queries[i] for i in missing], dimensions)
+
+        for i, result_set in zip(missing, result_sets):
+            builder = builders[i]
+            data = reduce_result_set([result_set], (), builder.dimensions, ())
+            results[i] = (make_result(builder, data), len(result_set))
+
+            cache = get_cache(builder)
+            if cache is not None:
+                cache.put(builder._get_cache_key(queries[i]), results[i])
+
+    return results
+
+
 def validate_fields(fields, dataset):
     fields = [find_field_in_modified_field(field) for field in fields]
 
@@ -0,0 +1,173 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class _KeyLock:
+    # A lock for fetching the result of a key, with the number of threads holding or waiting for it
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.users = 0
+
+
+class ResultCache:
+    """
+    A thread-safe in-memory cache for the results of queries, such as dimension choices.
+
+    Results are fresh for `ttl` seconds after they were fetched. For another `stale_ttl` seconds after that, the stale
+    result is still returned while it is refreshed in a background thread, so callers never wait for a query unless
+    there is no usable result at all. Concurrent requests for the same missing result wait for a single fetch.
+
+    The cache is shared between copies of the objects holding it, as query builders are copied on every call.
+    """
+
+    def __init__(self, ttl: float = 300, stale_ttl: float = 0, max_size: Optional[int] = 1024):
+        """
+        :param ttl:
+            The number of seconds a result is fresh for.
+        :param stale_ttl: (Default: 0)
+            The number of seconds after a result has expired during which it is still returned while being refreshed.
+        :param max_size: (Default: 1024)
+            The maximum number of results to keep. The least recently used results are evicted first. None for no
+            limit.
+        """
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_size = max_size
+        self._init_state()
+
+    def _init_state(self):
+        # Maps keys to tuples of the result and the time at which it was fetched
+        self._entries = OrderedDict()
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        # The locks of the keys being fetched, which are removed when no thread uses them anymore
+        self._key_locks = {}
+
+    def get(self, key: Hashable, fetch: Callable[[], Any]):
+        """
+        Returns the cached result for a key, calling `fetch` to fetch it if there is no fresh result.
+
+        :param key:
+            A hashable value identifying the result, e.g. the SQL of the query.
+        :param fetch:
+            A function without arguments fetching the result.
+        :return:
+            The cached result. Results are shared, so they must not be modified.
+        """
+        entry = self._lookup(key)
+
+        if entry is not None:
+            result, fetched_at = entry
+            age = time.monotonic() - fetched_at
+
+            if age < self.ttl:
+                return result
+
+            if age < self.ttl + self.stale_ttl:
+                self._refresh_in_background(key, fetch)
+                return result
+
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, _KeyLock())
+            key_lock.users += 1
+
+        try:
+            with key_lock.lock:
+                # Another thread might have fetched the result while this one was waiting
+                result = self.peek(key)
+                if result is not None:
+                    return result
+
+                return self._fetch(key, fetch)
+        finally:
+            with self._lock:
+                key_lock.users -= 1
+                if not key_lock.users:
+                    del self._key_locks[key]
+
+    def peek(self, key: Hashable):
+        """
+        Returns the cached result for a key if it is fresh, or None otherwise. This never fetches anything.
+        """
+        entry = self._lookup(key)
+
+        if entry is not None and time.monotonic() - entry[1] < self.ttl:
+            return entry[0]
+
+        return None
+
+    def put(self, key: Hashable, result):
+        """
+        Stores a result fetched elsewhere, e.g. as part of a batch.
+        """
+        self._fetch(key, lambda: result)
+
+    def invalidate(self, key: Hashable):
+        """
+        Removes the cached result for a key.
+        """
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        """
+        Removes all cached results.
+        """
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _lookup(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def _fetch(self, key, fetch):
+        result = fetch()
+
+        with self._lock:
+            self._entries[key] = (result, time.monotonic())
+            self._entries.move_to_end(key)
+
+            while self.max_size is not None and len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+        return result
+
+    def _refresh_in_background(self, key, fetch):
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def refresh():
+            try:
+                self._fetch(key, fetch)
+            except Exception:
+                # The stale result is returned until it can be refreshed or expires
+                logger.exception("result_cache_refresh_failed")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=refresh, daemon=True).start()
+
+    def __deepcopy__(self, memo=None):
+        return self
+
+    def __getstate__(self):
+        # Locks can't be pickled. Cached results are not worth sending elsewhere either.
+        return dict(ttl=self.ttl, stale_ttl=self.stale_ttl, max_size=self.max_size)
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._init_state()
@@ -10,7 +10,9 @@ from fireant.dataset.modifiers import RollupValue
 from fireant.dataset.references import calculate_delta_percent
 from fireant.dataset.totals import get_totals_marker_for_dtype
 from fireant.queries.finders import find_field_in_modified_field, find_totals_dimensions
+from fireant.queries.fingerprint import RenderedQuery
 from fireant.queries.pandas_workaround import df_subtract
+from fireant.queries.tracing import current_trace, trace_span
 from fireant.utils import alias_selector, chunks
 
 
@@ -28,7 +30,31 @@ def fetch_data(
     share_dimensions: Iterable[Field] = (),
     reference_groups=(),
 ) -> Tuple[int, pd.DataFrame]:
-    queries = [str(query) for query in queries]
+    max_rows_returned, results = fetch_result_sets(database, queries, dimensions)
+    with trace_span("reduce_result_set"):
+        return max_rows_returned, reduce_result_set(results, reference_groups, dimensions, share_dimensions)
+
+
+def fetch_result_sets(
+    database: Database,
+    queries: List[Type[QueryBuilder]],
+    dimensions: Iterable[Field],
+) -> Tuple[int, List[pd.DataFrame]]:
+    """
+    Executes the queries and returns a data frame for each of them, with the rows in the order returned by the
+    database. Rows above the database's max result set size are dropped.
+
+    :param database: The database to execute the queries on.
+    :param queries: The queries to execute.
+    :param dimensions: A list of dimensions, used for parsing date dimensions.
+    :return: The maximum number of rows returned by any query and a list of data frames.
+    """
+    trace = current_trace()
+    if trace is not None:
+        trace.tag_queries(queries)
+
+    # The rendered queries keep the pypika queries, so middlewares can fingerprint them
+    queries = [RenderedQuery(query) for query in queries]
 
     # Indicate which dimensions need to be parsed as date types
     # For this we create a dictionary with the dimension alias as key and PANDAS_TO_DATETIME_FORMAT as value
@@ -38,7 +64,8 @@ def fetch_data(
         if unmodified_dimension.data_type == DataType.date:
             pandas_parse_dates[alias_selector(unmodified_dimension.alias)] = PANDAS_TO_DATETIME_FORMAT
 
-    results = database.fetch_dataframes(*queries, parse_dates=pandas_parse_dates)
+    with trace_span("fetch", database=str(database), queries=len(queries)):
+        results = database.fetch_dataframes(*queries, parse_dates=pandas_parse_dates)
     max_rows_returned = 0
     for result_df in results:
         row_count = len(result_df)
@@ -50,7 +77,7 @@ def fetch_data(
             result_df.drop(result_df.index[database.max_result_set_size :], inplace=True)
 
     logger.info('max_rows_returned', extra={'row_count': max_rows_returned, 'database': str(database)})
-    return max_rows_returned, reduce_result_set(results, reference_groups, dimensions, share_dimensions)
+    return max_rows_returned, results
 
 
 def reduce_result_set(
@@ -0,0 +1,127 @@
+import hashlib
+from typing import Optional, Tuple
+
+from pypika import Table
+from pypika.queries import Join, QueryBuilder
+from pypika.terms import Parameter, Tuple as TupleTerm, ValueWrapper
+
+from .rewrite import rewrite_term
+
+# The attributes of queries and joins holding the criteria which literals are normalised in
+_CRITERIA = ("_wheres", "_prewheres", "_havings", "criterion")
+
+PLACEHOLDER = "?"
+
+
+def _is_literal_list(value) -> bool:
+    return isinstance(value, TupleTerm) and all(isinstance(item, ValueWrapper) for item in value.values)
+
+
+def _replace_literal(value):
+    if isinstance(value, ValueWrapper):
+        return Parameter(PLACEHOLDER)
+    if _is_literal_list(value):
+        return Parameter("({})".format(PLACEHOLDER))
+    return None
+
+
+def normalize_query(query: QueryBuilder) -> QueryBuilder:
+    """
+    Returns a copy of a query in which the literals of the criteria, e.g. of filters, join conditions and seek
+    predicates, are replaced by placeholders. Lists of literals, e.g. of IN filters, are replaced by a single
+    placeholder, so the queries of requests filtering on different values share the same normalised query. Other
+    literals, e.g. the granularity of truncated dates, and the limit are kept, as they change the shape of the query.
+    The query is not modified.
+
+    The query is copied with `rewrite_term`, including its subqueries, so tables are shared with the original query.
+    """
+    criteria = set()
+
+    def replace(node):
+        if isinstance(node, (QueryBuilder, Join)):
+            # Queries and joins are visited before their criteria
+            criteria.update(id(getattr(node, attribute, None)) for attribute in _CRITERIA)
+            return None
+
+        if id(node) in criteria:
+            return rewrite_term(node, _replace_literal, subqueries=True, constants=True)
+
+        return None
+
+    return rewrite_term(query, replace, subqueries=True)
+
+
+def fingerprint_sql(sql: str) -> str:
+    return hashlib.sha1(sql.encode("utf-8")).hexdigest()[:16]
+
+
+def fingerprint_query(query: QueryBuilder) -> Tuple[str, str]:
+    """
+    :param query:
+        A pypika query.
+    :return:
+        The fingerprint of the query and its normalised SQL (see `normalize_query`). Queries only differing in the
+        values they filter on have the same fingerprint.
+    """
+    normalized_sql = str(normalize_query(query))
+    return fingerprint_sql(normalized_sql), normalized_sql
+
+
+def _find_base_table(query) -> Optional[Table]:
+    # The base table of blended queries is the one of the subquery of the primary dataset
+    while isinstance(query, QueryBuilder) and query._from:
+        query = query._from[0]
+    return query if isinstance(query, Table) else None
+
+
+class RenderedQuery(str):
+    """
+    The SQL of a pypika query, which keeps the query so the fingerprint of the SQL can be computed when it's needed,
+    e.g. by middlewares, which are only passed the SQL of the queries they execute.
+    """
+
+    def __new__(cls, query: QueryBuilder):
+        sql = super().__new__(cls, str(query))
+        sql.query = query
+        sql._fingerprint = None
+        return sql
+
+    def __reduce__(self):
+        # Copied or pickled as plain SQL, e.g. when passed to another process
+        return str, (str(self),)
+
+    def _normalize(self):
+        if self._fingerprint is None:
+            self._fingerprint, self._normalized_sql = fingerprint_query(self.query)
+
+    @property
+    def fingerprint(self) -> str:
+        self._normalize()
+        return self._fingerprint
+
+    @property
+    def normalized_sql(self) -> str:
+        self._normalize()
+        return self._normalized_sql
+
+    @property
+    def table(self) -> Optional[str]:
+        """
+        The base table of the query, which identifies the dataset it was built for.
+        """
+        table = _find_base_table(self.query)
+        return table.get_sql(quote_char=None) if table is not None else None
+
+
+def get_query_fingerprint(sql: str) -> Tuple[str, str]:
+    """
+    Returns the fingerprint and the normalised SQL of a query passed to a database. Literals are only normalised in
+    queries built by fireant, the fingerprint of any other SQL is the fingerprint of the SQL itself.
+    """
+    if isinstance(sql, RenderedQuery):
+        return sql.fingerprint, sql.normalized_sql
+    return fingerprint_sql(str(sql)), str(sql)
+
+
+def get_query_table(sql: str) -> Optional[str]:
+    return sql.table if isinstance(sql, RenderedQuery) else None
@@ -1,5 +1,6 @@
 from typing import Tuple
 
+import numpy as np
 import pandas as pd
 from pandas.core.dtypes.common import is_datetime64_ns_dtype
 from pypika import Order
@@ -73,26 +74,25 @@ def _simple_paginate(data_frame, start=None, end=None, orders=()):
     return data_frame[start:end]
 
 
-def _index_isnull(data_frame):
-    if isinstance(data_frame.index, pd.MultiIndex):
-        return [any(pd.isnull(value) for value in level) for level in list(data_frame.index)]
-
-    return pd.isnull(data_frame.index)
-
-
-def _aggregate_dimension_groups(group):
+def _get_aggregate_function(series):
     # FIXME this should aggregate according to field definition, instead of sum/max
     # Need a way to interpret definitions in python code in order to do that
-    if is_datetime64_ns_dtype(group):
+    if is_datetime64_ns_dtype(series):
         # sum aggregation doesn't work on the datetime type so use max instead
-        return group.max()
-    return group.sum()
+        return "max"
+    return "sum"
 
 
 def _group_paginate(data_frame, start=None, end=None, orders=()):
     """
     Applies pagination which limits the number of rows in the data frame grouped by the zeroth index level. This will
     in turn paginate the number of series in the data frame.
+
+    Each series is given a group number and the series on the requested page are ranked by their position on the page.
+    The rows to return are then selected and ordered with a single sort of the row positions, by value of the zeroth
+    index level, by rank and finally by their original position. Rows with a null value in any other index level do
+    not belong to a series, so they are kept at the end of each group of the zeroth index level.
+
     :param data_frame:
         A data frame to paginate
     :param start:
@@ -114,45 +114,35 @@ def _group_paginate(data_frame, start=None, end=None, orders=()):
         if alias_selector(field.alias) != data_frame.index.names[0]
     ]
 
+    # Groups are numbered in the order of their sorted dimension values, rows with a null dimension value get NaN
+    group_numbers = dimension_groups.ngroup().to_numpy()
+    n_groups = dimension_groups.ngroups
+
     if orders:
-        aggregated_df = dimension_groups.aggregate(_aggregate_dimension_groups)
         sort, ascending = _get_sorting_schema(orders)
+        aggregate_functions = {
+            column: _get_aggregate_function(data_frame[column]) for column in sort if column in data_frame.columns
+        }
+        aggregated_df = (
+            dimension_groups.agg(aggregate_functions) if aggregate_functions else dimension_groups.size().to_frame()
+        )
         sorted_df = aggregated_df.sort_values(by=sort, ascending=ascending)
-        sorted_dimension_values = tuple(sorted_df.index)[start:end]
+        sorted_groups = aggregated_df.index.get_indexer(sorted_df.index)
 
     else:
-        sorted_dimension_values = tuple(dimension_groups.apply(lambda g: g.name))[start:end]
+        sorted_groups = np.arange(n_groups)
 
-    sorted_dimension_values = (
-        pd.Index(sorted_dimension_values, name=dimension_levels[0])
-        if len(dimension_levels) == 1
-        else pd.MultiIndex.from_tuples(sorted_dimension_values, names=dimension_levels)
-    )
+    page_groups = sorted_groups[start:end]
+    group_ranks = np.full(n_groups, -1)
+    group_ranks[page_groups] = np.arange(len(page_groups))
+
+    is_null = np.isnan(group_numbers)
+    row_ranks = np.full(len(data_frame), -1)
+    row_ranks[~is_null] = group_ranks[group_numbers[~is_null].astype(np.intp)]
+
+    x_axis_codes, _ = pd.factorize(data_frame.index.get_level_values(0), sort=True)
+    positions = np.arange(len(data_frame))
 
-    def _apply_pagination(df):
-        """
-        This function applies sorting by using the sorted dimension values as an index to select values in the right
-        order out of the data frame. The index must be filtered to only values that are in this data frame, since
-        there might be missing combinations of index values.
-        """
-        dfx = df.reset_index(level=0, drop=True)
-        value_in_index = sorted_dimension_values.isin(dfx.index)
-        index_slice = sorted_dimension_values[value_in_index].values
-
-        """
-        In the case of bool dimensions, convert index_slice to an array of literal `True` and/or `False`,
-        because pandas `.loc` handles lists of bool as a mask. In which `True` returns the row and `False` won't.
-        """
-        if bool in {type(x) for x in sorted_dimension_values}:
-            num_missing_entries_in_boolean_mask = len(index_slice)
-            index_slice = [False] * len(dfx.index)
-
-            for i in range(num_missing_entries_in_boolean_mask):
-                index_slice[i] = True
-
-        # Need to include nulls so append them to the end of the sorted data frame
-        isnull = _index_isnull(dfx)
-
-        return pd.concat((dfx.loc[index_slice, :], dfx[isnull]))
-
-    return data_frame.sort_values(data_frame.index.names[0], ascending=True).groupby(level=0).apply(_apply_pagination)
+    is_selected = (x_axis_codes >= 0) & ((row_ranks >= 0) | is_null)
+    order = np.lexsort((positions, row_ranks, is_null, x_axis_codes))
+    return data_frame.take(order[is_selected[order]])
@@ -1,7 +1,22 @@
 import copy
 
+import pandas as pd
+from pypika.terms import Criterion
+
 from fireant.dataset.fields import Field, is_metric_field
+from fireant.dataset.filters import Filter
 from fireant.queries.finders import find_field_in_modified_field
+from fireant.utils import alias_selector
+
+# Frequencies of the periods used for aligning dates with the interval of a dimension
+PERIOD_FREQUENCIES = {
+    "hour": "h",
+    "day": "D",
+    "week": "W",
+    "month": "M",
+    "quarter": "Q",
+    "year": "Y",
+}
 
 
 def _replace_reference_dimension(dimension, offset_func, field_transformer, trunc_date=None):
@@ -70,3 +85,125 @@ def make_reference_filters(filters, ref_dimension, offset_func):
         reference_filters.append(ref_filter)
 
     return reference_filters
+
+
+class ReferenceRangesFilter(Filter):
+    """
+    A filter matching the values of a field within any of several ranges.
+    """
+
+    def __init__(self, field, ranges):
+        self.ranges = ranges
+        super().__init__(field)
+
+    @property
+    def definition(self):
+        return Criterion.any([self.field.definition.between(start, stop) for start, stop in self.ranges])
+
+
+def make_reference_range_filters(filters, reference_parts, date_add):
+    """
+    Widens the filters on reference dimensions so they also match the ranges of the references, which are the ranges
+    of the filters shifted back by the interval of each reference. This is used to fetch the data of the base query and
+    of all reference queries with a single query.
+
+    :param filters:
+    :param reference_parts:
+        A list of (reference dimension, time unit, interval) tuples.
+    :param date_add:
+        The function for shifting dates in the query, e.g. `Database.date_add`.
+    :return:
+    """
+    range_filters = []
+    for ref_filter in filters:
+        offsets = [
+            (unit, interval) for ref_dimension, unit, interval in reference_parts if ref_filter.field is ref_dimension
+        ]
+
+        if offsets:
+            ranges = [(ref_filter.start, ref_filter.stop)] + [
+                (
+                    date_add(ref_filter.start, date_part=unit, interval=-interval),
+                    date_add(ref_filter.stop, date_part=unit, interval=-interval),
+                )
+                for unit, interval in dict.fromkeys(offsets)
+            ]
+            ref_filter = ReferenceRangesFilter(ref_filter.field, ranges)
+
+        range_filters.append(ref_filter)
+
+    return range_filters
+
+
+def _make_date_offset(unit, interval):
+    if unit == "quarter":
+        return pd.DateOffset(months=3 * interval)
+    return pd.DateOffset(**{unit + "s": interval})
+
+
+def _find_dimension_key(dimensions, field):
+    for dimension in dimensions:
+        if find_field_in_modified_field(dimension) is field:
+            return alias_selector(dimension.alias), getattr(dimension, "interval_key", None)
+
+
+def _select_base_range(data_frame, filters, reference_dimensions, dimensions):
+    mask = pd.Series(True, index=data_frame.index)
+
+    for ref_filter in filters:
+        if not any(ref_filter.field is ref_dimension for ref_dimension in reference_dimensions):
+            continue
+
+        dimension_key, interval_key = _find_dimension_key(dimensions, ref_filter.field)
+        start = pd.Timestamp(ref_filter.start)
+        if interval_key in PERIOD_FREQUENCIES:
+            # The first interval of the range starts before the start of the range if the range isn't aligned
+            start = start.to_period(PERIOD_FREQUENCIES[interval_key]).start_time
+
+        values = data_frame[dimension_key]
+        mask &= (values >= start) & (values <= pd.Timestamp(ref_filter.stop))
+
+    return data_frame[mask]
+
+
+def make_local_reference_result_sets(result_set, filters, reference_groups, dimensions):
+    """
+    Splits the result set of a query fetched with the filters widened by `make_reference_range_filters` into the result
+    sets of the base query and of the query for each reference group. The reference result sets are made by shifting
+    the reference dimension forward by the interval of the reference, so every row lines up with the row it is a
+    reference for, the same way the reference queries shift the dimension in the database.
+
+    The result sets are the same as those of the separate queries when the filters on the reference dimensions cover
+    whole intervals of the dimensions, e.g. whole weeks for a weekly dimension. Otherwise the first and last intervals
+    contain the rows of the widened range.
+
+    :param result_set:
+        The result set of the query, with the dimensions as columns.
+    :param filters:
+        The filters of the query before they were widened.
+    :param reference_groups:
+        An `OrderedDict` of references grouped by (reference dimension, time unit, interval), as returned by
+        `find_and_group_references_for_dimensions`. Every reference dimension must be one of the dimensions.
+    :param dimensions:
+        The dimensions of the query.
+    :return:
+        A list with the base result set followed by a result set for each reference group.
+    """
+    reference_dimensions = [ref_dimension for ref_dimension, _, _ in reference_groups]
+    dimension_keys = {alias_selector(dimension.alias) for dimension in dimensions}
+
+    result_sets = [_select_base_range(result_set, filters, reference_dimensions, dimensions)]
+    for (ref_dimension, unit, interval), references in reference_groups.items():
+        dimension_key, _ = _find_dimension_key(dimensions, ref_dimension)
+
+        ref_df = result_set.copy()
+        ref_df[dimension_key] = ref_df[dimension_key] + _make_date_offset(unit, interval)
+        ref_df = _select_base_range(ref_df, filters, reference_dimensions, dimensions)
+
+        ref_key = references[0].reference_type.alias
+        ref_df.columns = [
+            column if column in dimension_keys else "{}_{}".format(column, ref_key) for column in ref_df.columns
+        ]
+        result_sets.append(ref_df)
+
+    return result_sets
@@ -0,0 +1,73 @@
+from typing import Callable, Optional
+
+from pypika.queries import Join, QueryBuilder, Selectable
+from pypika.terms import Node, ValueWrapper
+
+from fireant.dataset.modifiers import FieldModifier, Modifier
+
+
+def _is_node(value, subqueries: bool) -> bool:
+    # Tables are referenced by terms but never rewritten, and constants are immutable. Subqueries are only rewritten
+    # when asked to.
+    if subqueries and isinstance(value, (QueryBuilder, Join)):
+        return True
+    if isinstance(value, (Selectable, ValueWrapper)):
+        return False
+    return isinstance(value, (Node, Modifier, FieldModifier))
+
+
+def rewrite_term(
+    term,
+    replace: Callable[[object], Optional[object]],
+    subqueries: bool = False,
+    constants: bool = False,
+):
+    """
+    Returns a copy of an expression tree, e.g. the definition of a field, in which nodes are replaced. The tree is not
+    modified.
+
+    Every node of the tree is copied exactly once, with a shallow copy whose child nodes are replaced by their
+    copies. Constants, tables and subqueries are shared with the original tree, as they are never modified. Fireant
+    fields and modifiers are nodes as well, so definitions of fields referencing other fields are copied through.
+
+    :param term:
+        The root of the tree to copy, e.g. a pypika term or a fireant field.
+    :param replace:
+        A function returning the replacement for a node, or None to copy the node. Replacements are not copied nor
+        rewritten further.
+    :param subqueries: (Default: False)
+        Whether queries and their joins are nodes as well, so that subqueries are copied and their nodes replaced.
+        This also allows rewriting whole queries. Tables are still shared.
+    :param constants: (Default: False)
+        Whether constants are passed to `replace` as well. Constants which are not replaced are still shared.
+    :return:
+        The copy of the tree.
+    """
+    copies = {}
+
+    def rewrite(value):
+        if isinstance(value, (list, tuple)):
+            return type(value)(rewrite(item) for item in value)
+
+        if constants and isinstance(value, ValueWrapper):
+            replacement = replace(value)
+            return value if replacement is None else replacement
+
+        if not _is_node(value, subqueries):
+            return value
+
+        if id(value) in copies:
+            return copies[id(value)]
+
+        replacement = replace(value)
+        if replacement is not None:
+            copies[id(value)] = replacement
+            return replacement
+
+        # Bypass the constructor and the attribute proxying of modifiers
+        node = value.__class__.__new__(value.__class__)
+        copies[id(value)] = node
+        node.__dict__.update({key: rewrite(attribute) for key, attribute in value.__dict__.items()})
+        return node
+
+    return rewrite(term)
@@ -0,0 +1,73 @@
+import bisect
+import heapq
+from typing import Optional
+
+import pandas as pd
+from pypika.enums import Matching
+from pypika.terms import BasicCriterion, Term, ValueWrapper
+
+# An escape character which does not need to be escaped itself in any SQL dialect's string literals
+LIKE_ESCAPE_CHAR = "!"
+
+
+def escape_like(value: str) -> str:
+    """
+    Escapes the wildcards in a value to be used in a LIKE pattern with `LIKE_ESCAPE_CHAR` as escape character.
+    """
+    for char in (LIKE_ESCAPE_CHAR, "%", "_"):
+        value = value.replace(char, LIKE_ESCAPE_CHAR + char)
+    return value
+
+
+class StartsWith(BasicCriterion):
+    """
+    A criterion matching the values of a term starting with a prefix, using LIKE. Wildcards in the prefix are escaped,
+    so they match literally.
+    """
+
+    def __init__(self, term: Term, prefix: str, alias=None):
+        super().__init__(Matching.like, term, ValueWrapper(escape_like(prefix) + "%"), alias=alias)
+
+    def get_sql(self, **kwargs):
+        return "{} ESCAPE '{}'".format(super().get_sql(**kwargs), LIKE_ESCAPE_CHAR)
+
+
+class ChoicesIndex:
+    """
+    A sorted in-memory index of dimension choices, for searching them by prefix without querying the database.
+    """
+
+    def __init__(self, choices: pd.Series):
+        """
+        :param choices:
+            The choices to index, as returned by `DimensionChoicesQueryBuilder.fetch`. Their display values are indexed.
+        """
+        self.choices = choices
+
+        keys = [str(display).lower() for display in choices]
+        self._positions = sorted(range(len(keys)), key=keys.__getitem__)
+        self._keys = [keys[position] for position in self._positions]
+
+    def search(self, prefix: str, limit: Optional[int] = None) -> pd.Series:
+        """
+        Finds the choices whose display value starts with a prefix, ignoring case. Exact matches come first, followed
+        by the other matches in the order of the indexed choices.
+
+        :param prefix:
+            The prefix to search for.
+        :param limit:
+            The maximum number of choices to return. None for no limit.
+        :return:
+            The matching choices.
+        """
+        prefix = prefix.lower()
+        start = bisect.bisect_left(self._keys, prefix)
+        # The keys starting with the prefix end before the first key starting with the prefix's successor
+        end = bisect.bisect_left(self._keys, prefix[:-1] + chr(ord(prefix[-1]) + 1)) if prefix else len(self._keys)
+
+        matches = [
+            (key != prefix, position) for key, position in zip(self._keys[start:end], self._positions[start:end])
+        ]
+        ranked = sorted(matches) if limit is None else heapq.nsmallest(limit, matches)
+
+        return self.choices.iloc[[position for _, position in ranked]]
@@ -0,0 +1,107 @@
+import base64
+import binascii
+import json
+from datetime import date, datetime
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+from fireant.exceptions import DataSetException
+from fireant.utils import alias_selector
+
+
+class ContinuationTokenException(DataSetException):
+    pass
+
+
+def seek_orders(orders, dimensions):
+    """
+    Extends the orders of a query with the dimensions which are not ordered by yet. The rows of a query are unique per
+    combination of dimension values, so ordering by all dimensions makes the order total, which is required for
+    seeking past the last row of a page.
+
+    :param orders:
+        A list of (<Dimension/Metric>, pypika.Order) tuples.
+    :param dimensions:
+        The dimensions of the query.
+    :return:
+        The orders followed by the dimensions not ordered by yet, in ascending order.
+    """
+    order_aliases = {field.alias for field, _ in orders}
+
+    return list(orders) + [
+        (dimension, None)
+        for dimension in dimensions
+        if dimension.alias not in order_aliases and not dimension.is_aggregate
+    ]
+
+
+def _encode_value(value):
+    if value is None or (not isinstance(value, str) and pd.isnull(value)):
+        return None
+    if isinstance(value, datetime):
+        return {"datetime": value.isoformat()}
+    if isinstance(value, date):
+        return {"date": value.isoformat()}
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def _decode_value(value):
+    if isinstance(value, dict):
+        if "datetime" in value:
+            return datetime.fromisoformat(value["datetime"])
+        if "date" in value:
+            return date.fromisoformat(value["date"])
+        raise ValueError(value)
+    return value
+
+
+def encode_continuation_token(orders, data_frame: pd.DataFrame) -> Optional[str]:
+    """
+    Creates an opaque continuation token from the values of the order fields in the last row of a page.
+
+    :param orders:
+        The orders of the query, as returned by `seek_orders`.
+    :param data_frame:
+        The result set of the query, in the order returned by the database.
+    :return:
+        The token, or None if the page is empty.
+    """
+    if data_frame.empty:
+        return None
+
+    keys = [alias_selector(field.alias) for field, _ in orders]
+    values = [_encode_value(data_frame[key].iloc[-1]) for key in keys]
+
+    payload = json.dumps({"keys": keys, "values": values}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+
+def decode_continuation_token(token: str, orders) -> List:
+    """
+    Reads the values of the order fields from a continuation token created with `encode_continuation_token`.
+
+    :param token:
+        The continuation token.
+    :param orders:
+        The orders of the query, as returned by `seek_orders`. These must be the same as the orders of the query the
+        token was created for.
+    :return:
+        A list with a value for each order.
+    """
+    keys = [alias_selector(field.alias) for field, _ in orders]
+
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(token.encode("ascii")))
+        values = [_decode_value(value) for value in payload["values"]]
+        token_keys = payload["keys"]
+    except (binascii.Error, UnicodeError, ValueError, KeyError, TypeError, AttributeError):
+        raise ContinuationTokenException("Invalid continuation token.")
+
+    if token_keys != keys or len(values) != len(keys):
+        raise ContinuationTokenException("The continuation token was created for a query with different orders.")
+
+    return values
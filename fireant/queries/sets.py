@@ -15,6 +15,7 @@ from fireant.dataset.modifiers import (
     DimensionModifier,
     ResultSet,
 )
+from .rewrite import rewrite_term
 from ..utils import (
     alias_selector,
     flatten,
@@ -37,60 +38,18 @@ def _definition_field_for_data_blending(
                                            Fields.
     :param definition: A definition that might have its sub-parts (e.g. term, left, right) replaced.
                        That's likely the case for Criterion sub-classes and so on.
-    :return: A term sub-class to be used in place of the provided definition argument, when applicable.
+    :return: A copy of the provided definition argument with the sub-parts replaced, when applicable.
     """
-    if isinstance(definition, (terms.ValueWrapper,)):
-        # Constant values can be returned as is.
-        return definition
-
-    if isinstance(definition, (terms.Field,)) and definition == target_dataset_leaf_definition:
-        target_dataset_leaf_definition.replace_table(target_dataset_leaf_definition.table, definition.table)
-        return target_dataset_definition
-
-    # Function, ...
-    if hasattr(definition, 'args'):
-        definition.args = [
-            _definition_field_for_data_blending(target_dataset_definition, target_dataset_leaf_definition, arg)
-            for arg in definition.args
-        ]
-
-    # CustomFunction, ...
-    if hasattr(definition, 'params'):
-        definition.params = [
-            _definition_field_for_data_blending(target_dataset_definition, target_dataset_leaf_definition, param)
-            for param in definition.params
-        ]
-
-    # RangeCriterion, ContainsCriterion, Not, All,
-    if hasattr(definition, 'term'):
-        definition.term = _definition_field_for_data_blending(
-            target_dataset_definition, target_dataset_leaf_definition, definition.term
-        )
-
-    # BasicCriterion, ComplexCriterion, ...
-    if hasattr(definition, 'left'):
-        definition.left = _definition_field_for_data_blending(
-            target_dataset_definition, target_dataset_leaf_definition, definition.left
-        )
 
-    if hasattr(definition, 'right'):
-        definition.right = _definition_field_for_data_blending(
-            target_dataset_definition, target_dataset_leaf_definition, definition.right
-        )
-
-    # Case
-    if hasattr(definition, '_cases'):
-        definition._cases = [
-            _definition_field_for_data_blending(target_dataset_definition, target_dataset_leaf_definition, case)
-            for case in definition._cases
-        ]
+    def replace(node):
+        if isinstance(node, Field):
+            # Fields referenced in the definition keep their own definitions
+            return node
 
-    if hasattr(definition, '_else'):
-        definition._else = _definition_field_for_data_blending(
-            target_dataset_definition, target_dataset_leaf_definition, definition._else
-        )
+        if isinstance(node, terms.Field) and node == target_dataset_leaf_definition:
+            return target_dataset_definition
 
-    return definition
+    return rewrite_term(definition, replace)
 
 
 def _make_set_dimension(set_filter: Field, target_dataset: 'DataSet') -> Field:
@@ -108,7 +67,6 @@ def _make_set_dimension(set_filter: Field, target_dataset: 'DataSet') -> Field:
     while hasattr(old_definition, 'definition'):
         old_definition = old_definition.definition
 
-    old_definition = deepcopy(old_definition)
     old_definition_sql = old_definition.get_sql(quote_char="")
 
     set_dimension = deepcopy(set_filter.filter.field)
@@ -0,0 +1,151 @@
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+_current_trace = contextvars.ContextVar("fireant_trace", default=None)
+_current_span = contextvars.ContextVar("fireant_span", default=None)
+
+
+class Span:
+    """
+    A timed phase of fetching a query, e.g. compiling the SQL or executing one of the queries on the database.
+    """
+
+    def __init__(self, span_id: int, name: str, parent: Optional['Span'] = None, tags: Optional[Dict] = None):
+        self.span_id = span_id
+        self.name = name
+        self.parent = parent
+        self.tags = tags or {}
+        # The wall clock time is kept for exporting the span, the duration is measured with a monotonic clock
+        self.start_time = time.time()
+        self._start = time.perf_counter()
+        self.duration = None
+
+    def finish(self):
+        self.duration = time.perf_counter() - self._start
+
+    def to_dict(self) -> Dict:
+        return dict(
+            id=self.span_id,
+            parent_id=self.parent.span_id if self.parent is not None else None,
+            name=self.name,
+            tags=dict(self.tags),
+            start_time=self.start_time,
+            duration=round(self.duration, 6) if self.duration is not None else None,
+        )
+
+    def __repr__(self):
+        return "Span({}, duration={})".format(self.name, self.duration)
+
+
+class Trace:
+    """
+    Collects the spans of fetching a query. Spans are recorded for the phases of the current trace (see
+    `trace_span`), which is set for the current context only, so traces of queries fetched concurrently don't mix.
+    Spans can be recorded from several threads, as long as they run in a copy of the context (see `run_in_context`).
+    """
+
+    def __init__(self):
+        self.spans: List[Span] = []
+        self._query_tags = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def activate(self):
+        """
+        Sets this trace as the current trace, until the context manager exits.
+        """
+        token = _current_trace.set(self)
+        try:
+            yield self
+        finally:
+            _current_trace.reset(token)
+
+    @contextmanager
+    def span(self, name: str, **tags):
+        with self._lock:
+            span = Span(len(self.spans), name, parent=_current_span.get(), tags=tags)
+            self.spans.append(span)
+
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as exception:
+            span.tags["error"] = type(exception).__name__
+            raise
+        finally:
+            _current_span.reset(token)
+            span.finish()
+
+    def tag_queries(self, queries):
+        """
+        Keeps the tags of the queries for the spans of executing them, which only see their SQL. The tags are the
+        rolled up dimension of totals queries and the reference group of reference queries.
+        """
+        with self._lock:
+            for query in queries:
+                totals_dimension = getattr(query, "_totals", None)
+                self._query_tags[str(query)] = dict(
+                    totals=totals_dimension.alias if totals_dimension is not None else None,
+                    references=[reference.alias for reference in getattr(query, "_references", None) or ()],
+                )
+
+    def query_tags(self, sql: str) -> Dict:
+        return dict(self._query_tags.get(sql, {}), sql=sql)
+
+    def to_dict(self) -> List[Dict]:
+        return [span.to_dict() for span in self.spans]
+
+
+def current_trace() -> Optional[Trace]:
+    return _current_trace.get()
+
+
+@contextmanager
+def trace_span(name: str, **tags):
+    """
+    Records a span for the current trace. Does nothing when no trace is active, which is the default.
+
+    :param name:
+        The name of the phase, e.g. "execute".
+    :param tags:
+        Tags describing the span, e.g. the SQL of the query.
+    :return:
+        A context manager yielding the span, or None if no trace is active.
+    """
+    trace = _current_trace.get()
+    if trace is None:
+        yield None
+        return
+
+    with trace.span(name, **tags) as span:
+        yield span
+
+
+@contextmanager
+def query_span(name: str, sql: str):
+    """
+    Records a span for a query of the current trace, tagged with its SQL and the tags of the query.
+    """
+    trace = _current_trace.get()
+    if trace is None:
+        yield None
+        return
+
+    with trace.span(name, **trace.query_tags(sql)) as span:
+        yield span
+
+
+def run_in_context(func):
+    """
+    Wraps a function so it runs in a copy of the current context, e.g. when submitted to a thread pool, so its spans
+    are recorded for the current trace.
+    """
+    context = contextvars.copy_context()
+
+    def wrapper(*args, **kwargs):
+        return context.copy().run(func, *args, **kwargs)
+
+    return wrapper
@@ -6,7 +6,7 @@ from unittest.mock import (
 
 from pypika import Field
 
-from fireant.database import Database
+from fireant.database import Database, QueryCost
 from fireant.middleware.decorators import connection_middleware
 
 
@@ -72,3 +72,48 @@ class TestBaseDatabase(TestCase):
 
         self.assertEqual(2, connection_mock.call_count)
         self.assertNotEqual(connection_1, connection_2)
+
+    @patch.object(Database, 'get_column_definitions', return_value=[('a', 'varchar')])
+    def test_column_definitions_are_not_cached_by_default(self, mock_get_column_definitions):
+        db = Database()
+
+        db.get_cached_column_definitions('schema', 'table')
+        db.get_cached_column_definitions('schema', 'table')
+
+        self.assertEqual(2, mock_get_column_definitions.call_count)
+
+    @patch.object(Database, 'get_column_definitions', return_value=[('a', 'varchar')])
+    def test_column_definitions_are_cached_per_table(self, mock_get_column_definitions):
+        db = Database(column_definitions_cache_ttl=60)
+
+        self.assertEqual([('a', 'varchar')], db.get_cached_column_definitions('schema', 'table'))
+        db.get_cached_column_definitions('schema', 'table')
+        db.get_cached_column_definitions('schema', 'other_table')
+
+        self.assertEqual(2, mock_get_column_definitions.call_count)
+        mock_get_column_definitions.assert_called_with('schema', 'other_table')
+
+    def test_cache_key_identifies_the_database_on_a_host(self):
+        db = Database(host='host', port=1, database='a')
+
+        self.assertEqual(db.cache_key, Database(host='host', port=1, database='a').cache_key)
+        self.assertNotEqual(db.cache_key, Database(host='host', port=1, database='b').cache_key)
+        self.assertNotEqual(db.cache_key, Database(host='host', port=2, database='a').cache_key)
+
+    @patch.object(Database, 'fetch')
+    def test_query_costs_are_not_estimated_by_default(self, mock_fetch):
+        db = Database()
+
+        self.assertIsNone(db.estimate_query_cost('SELECT 1'))
+        mock_fetch.assert_not_called()
+
+    @patch.object(Database, 'parse_query_plan', return_value=QueryCost(rows=10, cost=1.5))
+    @patch.object(Database, 'make_explain_query', return_value='EXPLAIN SELECT 1')
+    @patch.object(Database, 'fetch', return_value=[('plan',)])
+    def test_query_cost_is_estimated_from_the_query_plan(self, mock_fetch, mock_explain, mock_parse):
+        db = Database()
+
+        self.assertEqual(QueryCost(rows=10, cost=1.5), db.estimate_query_cost('SELECT 1'))
+        mock_explain.assert_called_once_with('SELECT 1')
+        mock_fetch.assert_called_once_with('EXPLAIN SELECT 1', connection=None)
+        mock_parse.assert_called_once_with([('plan',)])
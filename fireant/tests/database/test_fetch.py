@@ -8,6 +8,7 @@ from unittest.mock import (
 
 from fireant import Database
 from fireant.middleware import log_middleware
+from fireant.queries.fingerprint import fingerprint_sql
 
 
 class FetchDataTests(TestCase):
@@ -73,7 +74,9 @@ class FetchDataLoggingTests(TestCase):
         mock_time.side_effect = [1520520255.0, 1520520277.0]
         self.database.fetch_dataframe(self.mock_query)
 
-        mock_logger.warning.assert_called_once_with('[22.0 seconds]: SELECT *')
+        mock_logger.warning.assert_called_once_with(
+            '[22.0 seconds]: SELECT *', extra=dict(fingerprint=fingerprint_sql('SELECT *'), table=None)
+        )
 
     @patch.object(time, 'time')
     @patch('fireant.middleware.decorators.slow_query_logger')
@@ -7,7 +7,7 @@ from unittest.mock import (
 
 from pypika import Column as PypikaColumn, Field, MySQLQuery
 
-from fireant.database import MySQLDatabase
+from fireant.database import MySQLDatabase, QueryCost
 from fireant.database.mysql import MySQLTypeEngine
 from fireant.database.sql_types import VarChar
 
@@ -168,6 +168,27 @@ class TestMySQLDatabase(TestCase):
             connection=None,
         )
 
+    def test_null_safe_equal(self):
+        self.assertEqual('"a"<=>"b"', str(MySQLDatabase().null_safe_equal(Field('a'), Field('b'))))
+
+    def test_make_explain_query(self):
+        self.assertEqual('EXPLAIN FORMAT=JSON SELECT 1', MySQLDatabase().make_explain_query('SELECT 1'))
+
+    def test_parse_query_plan_with_largest_join_result(self):
+        plan = (
+            '{"query_block": {"select_id": 1, "cost_info": {"query_cost": "1204.50"}, "nested_loop": ['
+            '{"table": {"table_name": "politician", "rows_examined_per_scan": 1000, "rows_produced_per_join": 1000}},'
+            '{"table": {"table_name": "district", "rows_examined_per_scan": 1, "rows_produced_per_join": 1000}}'
+            ']}}'
+        )
+
+        self.assertEqual(QueryCost(rows=1000, cost=1204.5), MySQLDatabase().parse_query_plan([(plan,)]))
+
+    def test_parse_query_plan_without_estimates(self):
+        plan = '{"query_block": {"select_id": 1, "message": "No tables used"}}'
+
+        self.assertEqual(QueryCost(rows=None, cost=None), MySQLDatabase().parse_query_plan([(plan,)]))
+
 
 class TestMySQLTypeEngine(TestCase):
     @classmethod
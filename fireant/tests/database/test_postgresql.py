@@ -6,7 +6,7 @@ from unittest.mock import (
 
 from pypika import Field
 
-from fireant.database import PostgreSQLDatabase
+from fireant.database import PostgreSQLDatabase, QueryCost
 
 
 class TestPostgreSQL(TestCase):
@@ -105,3 +105,18 @@ class TestPostgreSQL(TestCase):
             connection=None,
             parameters={'schema': 'test_schema', 'table': 'test_table'},
         )
+
+    def test_make_explain_query(self):
+        self.assertEqual('EXPLAIN SELECT 1', self.database.make_explain_query('SELECT 1'))
+
+    def test_parse_query_plan_with_estimates_of_root_node(self):
+        rows = [
+            ('HashAggregate  (cost=2041.00..2043.50 rows=200 width=40)',),
+            ('  Group Key: political_party',),
+            ('  ->  Seq Scan on politician  (cost=0.00..1541.00 rows=100000 width=12)',),
+        ]
+
+        self.assertEqual(QueryCost(rows=200, cost=2043.5), self.database.parse_query_plan(rows))
+
+    def test_parse_query_plan_without_estimates(self):
+        self.assertEqual(QueryCost(rows=None, cost=None), self.database.parse_query_plan([('Result',)]))
@@ -7,7 +7,7 @@ from unittest.mock import (
 import pytest
 from pypika import Field
 
-from fireant.database import SnowflakeDatabase
+from fireant.database import QueryCost, SnowflakeDatabase
 
 try:
     # Import submodules so they can be patched
@@ -163,3 +163,13 @@ class TestSnowflake(TestCase):
             connection=None,
             parameters={'schema': 'test_schema', 'table': 'test_table'},
         )
+
+    def test_make_explain_query(self):
+        self.assertEqual('EXPLAIN USING JSON SELECT 1', SnowflakeDatabase().make_explain_query('SELECT 1'))
+
+    def test_parse_query_plan_with_bytes_to_scan(self):
+        plan = (
+            '{"GlobalStats": {"partitionsTotal": 10, "partitionsAssigned": 2, "bytesAssigned": 1024}, "Operations": []}'
+        )
+
+        self.assertEqual(QueryCost(rows=None, cost=1024), SnowflakeDatabase().parse_query_plan([(plan,)]))
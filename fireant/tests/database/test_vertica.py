@@ -8,6 +8,7 @@ from unittest.mock import (
 from pypika import Column as PypikaColumn, Field, VerticaQuery
 
 from fireant.database import (
+    QueryCost,
     VerticaDatabase,
     VerticaTypeEngine,
 )
@@ -117,6 +118,22 @@ class TestVertica(TestCase):
             expected_query, connection=None, parameters={'schema': 'test_schema', 'table': 'test_table'}
         )
 
+    def test_make_explain_query(self):
+        self.assertEqual('EXPLAIN SELECT 1', VerticaDatabase().make_explain_query('SELECT 1'))
+
+    def test_parse_query_plan_with_estimates_of_root_path(self):
+        rows = [
+            ('',),
+            (' Access Path:',),
+            (' +-GROUPBY HASH (LOCAL RESEGMENT GROUPS) [Cost: 1.5K, Rows: 10M (NO STATISTICS)] (PATH ID: 1)',),
+            (' |  +---> STORAGE ACCESS for politician [Cost: 900, Rows: 20B (NO STATISTICS)] (PATH ID: 2)',),
+        ]
+
+        self.assertEqual(QueryCost(rows=10_000_000, cost=1500.0), VerticaDatabase().parse_query_plan(rows))
+
+    def test_parse_query_plan_without_estimates(self):
+        self.assertEqual(QueryCost(rows=None, cost=None), VerticaDatabase().parse_query_plan([('',)]))
+
     @patch.object(VerticaDatabase, 'execute')
     def test_import_csv(self, mock_execute):
         VerticaDatabase().import_csv('abc', '/path/to/file')
@@ -1,9 +1,12 @@
 import copy
+from concurrent.futures import ThreadPoolExecutor
 from unittest import TestCase
+from unittest.mock import patch
 
 from pypika import Order, functions as fn
 
 import fireant as f
+from fireant.queries.builder.dataset_blender_query_builder import make_datasets_and_field_maps
 from fireant.tests.dataset.mocks import (
     Rollup,
     MockMySQLDatabase,
@@ -1004,3 +1007,100 @@ class DataSetBlenderQueryBuilderTests(TestCase):
             .widget(f.ReactTable(mock_dataset_blender.fields["votes"]))
             .dimension(mock_dataset_blender.fields["district-id"])
         ).sql
+
+
+class DataSetBlenderFieldMapsTests(TestCase):
+    def _make_query(self, blender):
+        return (
+            blender.query()
+            .widget(f.ReactTable(blender.fields["candidate-spend-per-wins"]))
+            .dimension(f.day(blender.fields.timestamp))
+        )
+
+    def test_field_maps_are_not_computed_per_query_without_set_filters(self):
+        query = self._make_query(mock_dataset_blender)
+
+        with patch(
+            "fireant.queries.builder.dataset_blender_query_builder.make_datasets_and_field_maps"
+        ) as mock_make_field_maps:
+            query.sql
+
+        mock_make_field_maps.assert_not_called()
+
+    def test_field_maps_are_computed_per_query_with_set_filters(self):
+        blender = mock_dataset_blender
+        query = self._make_query(blender).filter(f.ResultSet(blender.fields["candidate-id"] == 12))
+
+        with patch(
+            "fireant.queries.builder.dataset_blender_query_builder.make_datasets_and_field_maps",
+            wraps=make_datasets_and_field_maps,
+        ) as mock_make_field_maps:
+            query.sql
+
+        mock_make_field_maps.assert_called_once()
+
+    def test_field_maps_are_shared_between_copies_of_the_blender(self):
+        blender_copy = copy.deepcopy(mock_dataset_blender)
+
+        self.assertIs(mock_dataset_blender._field_maps, blender_copy._field_maps)
+
+    def test_field_maps_include_extra_fields(self):
+        blender = mock_dataset_blender.extra_fields(
+            f.Field(
+                "votes-per-wins",
+                definition=mock_dataset_blender.fields.votes / mock_dataset_blender.fields.wins,
+                data_type=f.DataType.number,
+            )
+        )
+
+        queries = (
+            blender.query()
+            .widget(f.ReactTable(blender.fields["votes-per-wins"]))
+            .dimension(f.day(blender.fields.timestamp))
+        ).sql
+
+        self.assertIsNot(mock_dataset_blender._field_maps, blender._field_maps)
+        self.assertIn('"sq0"."$votes"/"sq0"."$wins" "$votes-per-wins"', str(queries[0]))
+
+
+class DataSetBlenderConcurrentQueryBuilderTests(TestCase):
+    def _make_queries(self):
+        blender = mock_dataset_blender
+        spend_per_wins = blender.fields["candidate-spend-per-wins"]
+
+        return [
+            blender.query().widget(f.ReactTable(spend_per_wins)).dimension(f.day(blender.fields.timestamp)),
+            blender.query()
+            .widget(f.ReactTable(spend_per_wins))
+            .dimension(f.day(blender.fields.timestamp))
+            .reference(f.WeekOverWeek(blender.fields.timestamp)),
+            blender.query()
+            .widget(f.ReactTable(spend_per_wins))
+            .dimension(f.day(blender.fields.timestamp))
+            .filter(f.ResultSet(spend_per_wins.gt(1000))),
+            blender.query()
+            .widget(f.ReactTable(blender.fields["votes"], blender.fields["candidate-spend"]))
+            .dimension(blender.fields["candidate-id"])
+            .orderby(spend_per_wins, Order.desc),
+        ]
+
+    def test_blended_queries_compiled_concurrently_are_the_same_as_compiled_sequentially(self):
+        queries = self._make_queries()
+        expected = [[str(sql) for sql in query.sql] for query in queries]
+
+        def compile_query(i):
+            return i, [str(sql) for sql in queries[i].sql]
+
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            results = list(executor.map(compile_query, [i % len(queries) for i in range(200)]))
+
+        for i, sql in results:
+            self.assertEqual(expected[i], sql)
+
+    def test_compiling_blended_queries_does_not_modify_dataset_fields(self):
+        for query in self._make_queries():
+            query.sql
+
+        for dataset in (mock_dataset_blender.primary_dataset, mock_dataset_blender.secondary_dataset):
+            for field in dataset.fields:
+                self.assertNotIn("get_sql", field.__dict__)
@@ -0,0 +1,344 @@
+import sqlite3
+from unittest import TestCase
+from unittest.mock import Mock, patch
+
+import pandas as pd
+from pypika import Case, Field as PypikaField, Order, Query, Tables, Tuple, functions as fn
+from pypika.enums import Arithmetic, Boolean, Equality
+from pypika.terms import (
+    ArithmeticExpression,
+    BasicCriterion,
+    BetweenCriterion,
+    ComplexCriterion,
+    ContainsCriterion,
+    Not,
+    Pow,
+    ValueWrapper,
+)
+
+import fireant as f
+from fireant import DataSet, DataType, Field
+from fireant.queries.blending import BlendingEvaluationException, evaluate_term
+from fireant.queries.rewrite import rewrite_term
+from fireant.tests.database.mock_database import MockDatabase
+
+t0, t1 = Tables("test0", "test1")
+
+
+class SecondaryMockDatabase(MockDatabase):
+    pass
+
+
+def _make_blender(primary_database, secondary_database):
+    primary_dataset = DataSet(
+        table=t0,
+        database=primary_database,
+        fields=[
+            Field("timestamp", definition=t0.timestamp, data_type=DataType.date),
+            Field("metric0", definition=fn.Sum(t0.metric)),
+        ],
+    )
+    secondary_dataset = DataSet(
+        table=t1,
+        database=secondary_database,
+        fields=[
+            Field("timestamp", definition=t1.timestamp, data_type=DataType.date),
+            Field("metric1", definition=fn.Sum(t1.metric)),
+        ],
+    )
+    return (
+        primary_dataset.blend(secondary_dataset)
+        .on_dimensions()
+        .extra_fields(
+            Field(
+                "ratio",
+                definition=primary_dataset.fields.metric0 / secondary_dataset.fields.metric1,
+                data_type=DataType.number,
+            )
+        )
+    )
+
+
+def _fetch_dataframes_by_table(result_sets_per_table, calls):
+    def fetch_dataframes(database, *queries, parse_dates=None):
+        table = "test0" if '"test0"' in queries[0] else "test1"
+        calls.append((type(database), table, len(queries)))
+        return [result_set.copy() for result_set in result_sets_per_table[table]]
+
+    return fetch_dataframes
+
+
+# noinspection SqlDialectInspection,SqlNoDataSourceInspection
+class DataSetBlenderLocalBlendingTests(TestCase):
+    maxDiff = None
+
+    def setUp(self):
+        self.blender = _make_blender(MockDatabase(), SecondaryMockDatabase())
+        self.result_sets = {
+            "test0": [
+                pd.DataFrame(
+                    {
+                        "$timestamp": pd.to_datetime(["2020-01-01", "2020-01-02"]),
+                        "$metric0": [1.0, 2.0],
+                    }
+                )
+            ],
+            "test1": [
+                pd.DataFrame(
+                    {
+                        "$timestamp": pd.to_datetime(["2020-01-02", "2020-01-03"]),
+                        "$metric1": [4.0, 8.0],
+                    }
+                )
+            ],
+        }
+
+    def _fetch(self, query, *metrics):
+        calls = []
+        widget = f.Widget(*metrics)
+        widget.transform = Mock()
+
+        with patch.object(MockDatabase, "fetch_dataframes", _fetch_dataframes_by_table(self.result_sets, calls)):
+            query.widget(widget).fetch()
+
+        # The data frame is ordered by the default orders of the query
+        return widget.transform.call_args[0][0].sort_index(), calls
+
+    def test_sql_returns_the_queries_of_each_dataset(self):
+        queries = (
+            self.blender.query()
+            .dimension(f.day(self.blender.fields.timestamp))
+            .widget(f.ReactTable(self.blender.fields.ratio))
+            .blend_locally()
+            .sql
+        )
+
+        self.assertEqual(
+            [
+                "SELECT "
+                "TRUNC(\"timestamp\",'DD') \"$timestamp\","
+                'SUM("metric") "$metric0" '
+                'FROM "test0" '
+                'GROUP BY "$timestamp"',
+                "SELECT "
+                "TRUNC(\"timestamp\",'DD') \"$timestamp\","
+                'SUM("metric") "$metric1" '
+                'FROM "test1" '
+                'GROUP BY "$timestamp"',
+            ],
+            [str(query) for query in queries],
+        )
+
+    def test_queries_are_executed_on_the_database_of_each_dataset(self):
+        query = self.blender.query().dimension(f.day(self.blender.fields.timestamp)).blend_locally()
+
+        _, calls = self._fetch(query, self.blender.fields.ratio)
+
+        self.assertEqual(
+            [(MockDatabase, "test0", 1), (SecondaryMockDatabase, "test1", 1)],
+            sorted(calls, key=lambda call: call[1]),
+        )
+
+    def test_dataset_queries_are_built_once_per_fetch(self):
+        query = self.blender.query().dimension(f.day(self.blender.fields.timestamp)).blend_locally()
+        builder_class = type(query)
+
+        with patch.object(
+            builder_class, "_make_datasets_queries", autospec=True, side_effect=builder_class._make_datasets_queries
+        ) as mock_make_datasets_queries:
+            self._fetch(query, self.blender.fields.ratio)
+
+        mock_make_datasets_queries.assert_called_once()
+
+    def test_result_sets_are_left_joined_on_mapped_dimensions(self):
+        query = self.blender.query().dimension(f.day(self.blender.fields.timestamp)).blend_locally()
+
+        data_frame, _ = self._fetch(query, self.blender.fields.metric0, self.blender.fields.metric1)
+
+        self.assertEqual(list(pd.to_datetime(["2020-01-01", "2020-01-02"])), list(data_frame.index))
+        self.assertEqual([1.0, 2.0], list(data_frame["$metric0"]))
+        self.assertTrue(pd.isnull(data_frame["$metric1"].iloc[0]))
+        self.assertEqual(4.0, data_frame["$metric1"].iloc[1])
+
+    def test_complex_metrics_are_evaluated_over_the_joined_result_sets(self):
+        query = self.blender.query().dimension(f.day(self.blender.fields.timestamp)).blend_locally()
+
+        data_frame, _ = self._fetch(query, self.blender.fields.ratio)
+
+        self.assertEqual(["$timestamp"], list(data_frame.index.names))
+        self.assertEqual(["$ratio"], list(data_frame.columns))
+        self.assertTrue(pd.isnull(data_frame["$ratio"].iloc[0]))
+        self.assertEqual(0.5, data_frame["$ratio"].iloc[1])
+
+    def test_result_sets_are_cross_joined_without_dimensions(self):
+        self.result_sets = {
+            "test0": [pd.DataFrame({"$metric0": [3.0]})],
+            "test1": [pd.DataFrame({"$metric1": [4.0]})],
+        }
+        query = self.blender.query().blend_locally()
+
+        data_frame, _ = self._fetch(query, self.blender.fields.ratio)
+
+        self.assertEqual([0.75], list(data_frame["$ratio"]))
+
+    def test_query_limit_is_applied_after_ordering_the_blended_result_set(self):
+        query = (
+            self.blender.query()
+            .dimension(f.day(self.blender.fields.timestamp))
+            .orderby(self.blender.fields.metric0, Order.desc)
+            .limit_query(1)
+            .blend_locally()
+        )
+
+        data_frame, _ = self._fetch(query, self.blender.fields.metric0)
+
+        self.assertEqual([2.0], list(data_frame["$metric0"]))
+
+    def test_references_are_blended_per_query_set(self):
+        self.result_sets = {
+            "test0": [
+                pd.DataFrame({"$timestamp": pd.to_datetime(["2020-01-02"]), "$metric0": [2.0]}),
+                pd.DataFrame({"$timestamp": pd.to_datetime(["2020-01-02"]), "$metric0_dod": [1.0]}),
+            ],
+            "test1": [
+                pd.DataFrame({"$timestamp": pd.to_datetime(["2020-01-02"]), "$metric1": [4.0]}),
+                pd.DataFrame({"$timestamp": pd.to_datetime(["2020-01-02"]), "$metric1_dod": [8.0]}),
+            ],
+        }
+        query = (
+            self.blender.query()
+            .dimension(f.day(self.blender.fields.timestamp))
+            .reference(f.DayOverDay(self.blender.fields.timestamp))
+            .blend_locally()
+        )
+
+        data_frame, calls = self._fetch(query, self.blender.fields.ratio)
+
+        self.assertEqual(
+            [(MockDatabase, "test0", 2), (SecondaryMockDatabase, "test1", 2)],
+            sorted(calls, key=lambda call: call[1]),
+        )
+        self.assertEqual([0.5], list(data_frame["$ratio"]))
+        self.assertEqual([0.125], list(data_frame["$ratio_dod"]))
+
+
+class EvaluateTermTests(TestCase):
+    def setUp(self):
+        self.data_frame = pd.DataFrame({"a": [1.0, 2.0, None], "b": ["x", "y", "z"]})
+        self.fields = {
+            "a": Field("a", definition=t0.a),
+            "b": Field("b", definition=t0.b),
+        }
+
+    def _evaluate(self, term):
+        index = self.data_frame.index
+        result = evaluate_term(term, lambda field: self.data_frame[field.alias], index)
+        return list(result) if isinstance(result, pd.Series) else result
+
+    def test_arithmetic(self):
+        result = self._evaluate((self.fields["a"] + 1) * 2)
+
+        self.assertEqual([4.0, 6.0], result[:2])
+        self.assertTrue(pd.isnull(result[2]))
+
+    def test_case(self):
+        # Comparing fields creates filters, so the criteria compare expressions of the fields instead
+        term = Case().when(self.fields["a"] * 1 > 1, "big").when(fn.Coalesce(self.fields["b"], "") == "x", "x")
+        term = term.else_("other")
+
+        self.assertEqual(["x", "big", "other"], self._evaluate(term))
+
+    def test_contains(self):
+        self.assertEqual([True, False, True], self._evaluate(fn.Coalesce(self.fields["b"], "").isin(["x", "z"])))
+
+    def test_coalesce(self):
+        self.assertEqual([1.0, 2.0, 0.0], self._evaluate(fn.Coalesce(self.fields["a"], 0)))
+
+    def test_unsupported_expressions_raise_exception(self):
+        with self.assertRaises(BlendingEvaluationException):
+            self._evaluate(fn.Lower(self.fields["b"]))
+
+    def test_comparisons_with_null_are_null(self):
+        result = self._evaluate(BasicCriterion(Equality.gt, self.fields["a"], ValueWrapper(1)))
+
+        self.assertEqual([False, True], result[:2])
+        self.assertIs(pd.NA, result[2])
+
+    def test_negated_comparisons_with_null_are_null(self):
+        result = self._evaluate(Not(BasicCriterion(Equality.gt, self.fields["a"], ValueWrapper(1))))
+
+        self.assertEqual([True, False], result[:2])
+        self.assertIs(pd.NA, result[2])
+
+    def test_division_by_zero_is_null(self):
+        result = self._evaluate(ArithmeticExpression(Arithmetic.div, ValueWrapper(1), self.fields["a"] - 1))
+
+        self.assertTrue(pd.isnull(result[0]))
+        self.assertEqual(1.0, result[1])
+        self.assertTrue(pd.isnull(result[2]))
+
+    def test_power_of_null_is_null(self):
+        result = self._evaluate(Pow(self.fields["a"], 0))
+
+        self.assertEqual([1.0, 1.0], result[:2])
+        self.assertTrue(pd.isnull(result[2]))
+
+
+class EvaluateTermSQLTests(TestCase):
+    """
+    Compares the evaluation of expressions over data frames with their evaluation by a database, with SQLite.
+    """
+
+    rows = [
+        (1.0, 0.0, "x"),
+        (2.0, 2.0, None),
+        (None, 1.0, "y"),
+        (0.0, None, "x"),
+        (-1.0, 3.0, None),
+        (None, None, None),
+    ]
+
+    def setUp(self):
+        self.data_frame = pd.DataFrame(self.rows, columns=["a", "b", "s"])
+        self.fields = {alias: Field(alias, definition=t0.field(alias)) for alias in self.data_frame.columns}
+
+        self.connection = sqlite3.connect(":memory:")
+        self.connection.execute("CREATE TABLE test0 (a REAL, b REAL, s TEXT)")
+        self.connection.executemany("INSERT INTO test0 VALUES (?, ?, ?)", self.rows)
+
+    def tearDown(self):
+        self.connection.close()
+
+    def _evaluate_in_sql(self, term):
+        sql_term = rewrite_term(term, lambda node: PypikaField(node.alias) if isinstance(node, Field) else None)
+        sql = str(Query.from_(t0).select(sql_term).orderby(PypikaField("rowid")))
+        return [value for (value,) in self.connection.execute(sql)]
+
+    def _evaluate(self, term):
+        result = evaluate_term(term, lambda field: self.data_frame[field.alias], self.data_frame.index)
+        return [None if pd.isnull(value) else value for value in result]
+
+    def test_expressions_evaluate_to_the_same_values_as_in_sql(self):
+        a, b, s = self.fields["a"], self.fields["b"], self.fields["s"]
+        a_gt_b = BasicCriterion(Equality.gt, a, b)
+        b_gt_1 = BasicCriterion(Equality.gt, b, ValueWrapper(1))
+        terms = {
+            "division": ArithmeticExpression(Arithmetic.div, a, b),
+            "addition": ArithmeticExpression(Arithmetic.add, a, b),
+            "power": Pow(a, b),
+            "power of zero": Pow(a, 0),
+            "comparison": a_gt_b,
+            "equality": BasicCriterion(Equality.eq, s, ValueWrapper("x")),
+            "not": Not(a_gt_b),
+            "and": ComplexCriterion(Boolean.and_, a_gt_b, b_gt_1),
+            "or": ComplexCriterion(Boolean.or_, a_gt_b, b_gt_1),
+            "not or": Not(ComplexCriterion(Boolean.or_, a_gt_b, b_gt_1)),
+            "in": ContainsCriterion(s, Tuple(ValueWrapper("x"))),
+            "not in": ContainsCriterion(s, Tuple(ValueWrapper("x"))).negate(),
+            "between": BetweenCriterion(a, ValueWrapper(0), ValueWrapper(1)),
+            "case": Case().when(Not(a_gt_b), "not greater").else_("greater or null"),
+        }
+
+        for name, term in terms.items():
+            with self.subTest(name):
+                self.assertEqual(self._evaluate_in_sql(term), self._evaluate(term))
@@ -0,0 +1,194 @@
+from unittest import TestCase
+from unittest.mock import MagicMock, Mock, patch
+
+from pypika import Field, Order
+
+import fireant as f
+from fireant import Database
+from fireant.tests.dataset.mocks import mock_dataset
+
+timestamp_daily = f.day(mock_dataset.fields.timestamp)
+
+
+def _line_chart(*metrics):
+    return f.HighCharts().axis(f.HighCharts.LineSeries(*metrics))
+
+
+# noinspection SqlDialectInspection,SqlNoDataSourceInspection
+class QueryBuilderGroupPaginationTests(TestCase):
+    maxDiff = None
+
+    def test_series_are_paginated_with_a_subquery(self):
+        queries = (
+            mock_dataset.query.widget(_line_chart(mock_dataset.fields.votes))
+            .dimension(timestamp_daily)
+            .dimension(mock_dataset.fields.political_party)
+            .orderby(mock_dataset.fields.votes, Order.desc)
+            .limit_client(2)
+            .offset_client(1)
+            .paginate_groups_in_query()
+        ).sql
+
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(
+            "SELECT "
+            "TRUNC(\"politician\".\"timestamp\",'DD') \"$timestamp\","
+            '"politician"."political_party" "$political_party",'
+            'SUM("politician"."votes") "$votes" '
+            'FROM "politics"."politician" '
+            "JOIN ("
+            'SELECT "political_party" "$political_party",SUM("votes") "$votes" '
+            'FROM "politics"."politician" '
+            'GROUP BY "$political_party" '
+            'ORDER BY "$votes" DESC '
+            "LIMIT 2 OFFSET 1"
+            ') "sq0" '
+            'ON "politician"."political_party"<=>"sq0"."$political_party" '
+            'GROUP BY "$timestamp","$political_party" '
+            'ORDER BY "$votes" DESC '
+            "LIMIT 200000",
+            str(queries[0]),
+        )
+
+    def test_series_are_ordered_by_series_dimensions_when_only_ordered_by_x_axis(self):
+        queries = (
+            mock_dataset.query.widget(_line_chart(mock_dataset.fields.votes))
+            .dimension(timestamp_daily)
+            .dimension(mock_dataset.fields.political_party)
+            .orderby(timestamp_daily, Order.desc)
+            .limit_client(2)
+            .paginate_groups_in_query()
+        ).sql
+
+        self.assertIn(
+            'JOIN (SELECT "political_party" "$political_party" '
+            'FROM "politics"."politician" '
+            'GROUP BY "$political_party" '
+            'ORDER BY "$political_party" '
+            'LIMIT 2) "sq0"',
+            str(queries[0]),
+        )
+
+    def test_totals_query_is_not_joined_with_the_series_query(self):
+        queries = (
+            mock_dataset.query.widget(_line_chart(mock_dataset.fields.votes))
+            .dimension(timestamp_daily)
+            .dimension(f.Rollup(mock_dataset.fields.political_party))
+            .limit_client(2)
+            .paginate_groups_in_query()
+        ).sql
+
+        self.assertEqual(len(queries), 2)
+        self.assertIn('JOIN (SELECT "political_party" "$political_party"', str(queries[0]))
+        self.assertEqual(
+            "SELECT "
+            "TRUNC(\"timestamp\",'DD') \"$timestamp\","
+            "'_FIREANT_ROLLUP_VALUE_' \"$political_party\","
+            'SUM("votes") "$votes" '
+            'FROM "politics"."politician" '
+            'GROUP BY "$timestamp" '
+            'ORDER BY "$timestamp","$political_party" '
+            "LIMIT 200000",
+            str(queries[1]),
+        )
+
+    def test_totals_query_is_joined_with_the_distinct_values_of_the_joined_dimensions(self):
+        queries = (
+            mock_dataset.query.widget(_line_chart(mock_dataset.fields.votes))
+            .dimension(timestamp_daily)
+            .dimension(mock_dataset.fields.political_party)
+            .dimension(f.Rollup(mock_dataset.fields["candidate-id"]))
+            .limit_client(2)
+            .paginate_groups_in_query()
+        ).sql
+
+        self.assertEqual(len(queries), 2)
+        self.assertIn(
+            'ON "politician"."political_party"<=>"sq0"."$political_party" '
+            'AND "politician"."candidate_id"<=>"sq0"."$candidate-id" ',
+            str(queries[0]),
+        )
+        # Each row of the totals query must only match one series, however many candidates the series query selects
+        self.assertIn(
+            'JOIN (SELECT DISTINCT "sq0"."$political_party" "$political_party" '
+            'FROM (SELECT "political_party" "$political_party","candidate_id" "$candidate-id" '
+            'FROM "politics"."politician" '
+            'GROUP BY "$political_party","$candidate-id" '
+            'ORDER BY "$political_party","$candidate-id" '
+            'LIMIT 2) "sq0") "sq0_distinct" '
+            'ON "politician"."political_party"<=>"sq0_distinct"."$political_party" ',
+            str(queries[1]),
+        )
+
+    def test_series_are_joined_null_safely_on_platforms_without_null_safe_equality(self):
+        query = Database().null_safe_equal(Field("a"), Field("b"))
+
+        self.assertEqual('"a"="b" OR ("a" IS NULL AND "b" IS NULL)', str(query))
+
+    def test_series_are_not_paginated_in_query_by_default(self):
+        queries = (
+            mock_dataset.query.widget(_line_chart(mock_dataset.fields.votes))
+            .dimension(timestamp_daily)
+            .dimension(mock_dataset.fields.political_party)
+            .limit_client(2)
+        ).sql
+
+        self.assertNotIn("JOIN", str(queries[0]))
+
+    def test_series_are_not_paginated_in_query_without_client_limit_or_offset(self):
+        queries = (
+            mock_dataset.query.widget(_line_chart(mock_dataset.fields.votes))
+            .dimension(timestamp_daily)
+            .dimension(mock_dataset.fields.political_party)
+            .paginate_groups_in_query()
+        ).sql
+
+        self.assertNotIn("JOIN", str(queries[0]))
+
+    def test_series_are_not_paginated_in_query_without_group_pagination_widgets(self):
+        queries = (
+            mock_dataset.query.widget(f.Pandas(mock_dataset.fields.votes))
+            .dimension(timestamp_daily)
+            .dimension(mock_dataset.fields.political_party)
+            .limit_client(2)
+            .paginate_groups_in_query()
+        ).sql
+
+        self.assertNotIn("JOIN", str(queries[0]))
+
+    def test_series_are_not_paginated_in_query_with_a_single_dimension(self):
+        queries = (
+            mock_dataset.query.widget(_line_chart(mock_dataset.fields.votes))
+            .dimension(timestamp_daily)
+            .limit_client(2)
+            .paginate_groups_in_query()
+        ).sql
+
+        self.assertNotIn("JOIN", str(queries[0]))
+
+
+@patch(
+    "fireant.queries.builder.dataset_query_builder.scrub_totals_from_share_results",
+    side_effect=lambda *args: args[0],
+)
+@patch("fireant.queries.builder.dataset_query_builder.paginate")
+@patch("fireant.queries.builder.dataset_query_builder.fetch_data", return_value=(100, MagicMock()))
+class QueryBuilderGroupPaginationFetchTests(TestCase):
+    def test_data_frame_is_only_sorted_when_groups_are_paginated_in_query(
+        self, mock_fetch_data: Mock, mock_paginate: Mock, *mocks
+    ):
+        widget = _line_chart(mock_dataset.fields.votes)
+        widget.transform = Mock()
+
+        # Need to keep widget the last call in the chain otherwise the object gets cloned and the assertion won't work
+        mock_dataset.query.dimension(timestamp_daily).dimension(mock_dataset.fields.political_party).limit_client(
+            2
+        ).offset_client(1).paginate_groups_in_query().widget(widget).fetch()
+
+        mock_paginate.assert_called_once_with(
+            mock_fetch_data.return_value[1],
+            [widget],
+            limit=None,
+            offset=None,
+            orders=[(timestamp_daily, None), (mock_dataset.fields.political_party, None)],
+        )
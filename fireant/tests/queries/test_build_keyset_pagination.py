@@ -0,0 +1,260 @@
+import copy
+from datetime import datetime
+from unittest import TestCase
+from unittest.mock import patch
+
+import pandas as pd
+from pypika import Order
+
+import fireant as f
+from fireant.database import MySQLDatabase, PostgreSQLDatabase, RedshiftDatabase
+from fireant.queries.builder.query_builder import QueryException
+from fireant.queries.seek import (
+    ContinuationTokenException,
+    decode_continuation_token,
+    encode_continuation_token,
+)
+from fireant.tests.dataset.mocks import mock_dataset, mock_dataset_blender
+
+timestamp_daily = f.day(mock_dataset.fields.timestamp)
+
+
+def _make_token(query, **values):
+    return encode_continuation_token(
+        query._seek_orders, pd.DataFrame({"$" + key: [value] for key, value in values.items()})
+    )
+
+
+class ContinuationTokenTests(TestCase):
+    orders = [(timestamp_daily, None), (mock_dataset.fields.political_party, None), (mock_dataset.fields.votes, None)]
+
+    def test_values_are_read_from_the_last_row(self):
+        data_frame = pd.DataFrame(
+            {
+                "$timestamp": pd.to_datetime(["2019-01-01", "2019-01-02"]),
+                "$political_party": ["d", "r"],
+                "$votes": [1, 2],
+            }
+        )
+
+        token = encode_continuation_token(self.orders, data_frame)
+
+        self.assertEqual([datetime(2019, 1, 2), "r", 2], decode_continuation_token(token, self.orders))
+
+    def test_empty_page_has_no_token(self):
+        self.assertIsNone(encode_continuation_token(self.orders, pd.DataFrame()))
+
+    def test_invalid_token_raises_exception(self):
+        with self.assertRaises(ContinuationTokenException):
+            decode_continuation_token("not a token", self.orders)
+
+    def test_token_for_other_orders_raises_exception(self):
+        token = encode_continuation_token(self.orders[:1], pd.DataFrame({"$timestamp": [datetime(2019, 1, 1)]}))
+
+        with self.assertRaises(ContinuationTokenException):
+            decode_continuation_token(token, self.orders)
+
+
+# noinspection SqlDialectInspection,SqlNoDataSourceInspection
+class QueryBuilderKeysetPaginationTests(TestCase):
+    maxDiff = None
+
+    def setUp(self):
+        self.query = (
+            mock_dataset.query.widget(f.Pandas(mock_dataset.fields.votes))
+            .dimension(timestamp_daily)
+            .dimension(mock_dataset.fields.political_party)
+            .limit_query(10)
+        )
+
+    def test_first_page_is_ordered_by_all_dimensions(self):
+        queries = self.query.orderby(mock_dataset.fields.political_party).seek().sql
+
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(
+            "SELECT "
+            "TRUNC(\"timestamp\",'DD') \"$timestamp\","
+            '"political_party" "$political_party",'
+            'SUM("votes") "$votes" '
+            'FROM "politics"."politician" '
+            'GROUP BY "$timestamp","$political_party" '
+            'ORDER BY CASE WHEN "political_party" IS NULL THEN 0 ELSE 1 END,"$political_party",'
+            'CASE WHEN "timestamp" IS NULL THEN 0 ELSE 1 END,"$timestamp" '
+            "LIMIT 10",
+            str(queries[0]),
+        )
+
+    def test_next_page_seeks_past_last_row_of_previous_page(self):
+        query = self.query.seek()
+        token = _make_token(query, timestamp=datetime(2019, 1, 1), political_party="d")
+
+        queries = query.seek(token).sql
+
+        self.assertEqual(
+            "SELECT "
+            "TRUNC(\"timestamp\",'DD') \"$timestamp\","
+            '"political_party" "$political_party",'
+            'SUM("votes") "$votes" '
+            'FROM "politics"."politician" '
+            "WHERE TRUNC(\"timestamp\",'DD')>'2019-01-01T00:00:00' "
+            "OR (TRUNC(\"timestamp\",'DD')='2019-01-01T00:00:00' AND \"political_party\">'d') "
+            'GROUP BY "$timestamp","$political_party" '
+            'ORDER BY CASE WHEN "timestamp" IS NULL THEN 0 ELSE 1 END,"$timestamp",'
+            'CASE WHEN "political_party" IS NULL THEN 0 ELSE 1 END,"$political_party" '
+            "LIMIT 10",
+            str(queries[0]),
+        )
+
+    def test_seek_predicate_is_combined_with_filters(self):
+        query = self.query.filter(mock_dataset.fields.political_party.isin(["d", "r"])).seek()
+        token = _make_token(query, timestamp=datetime(2019, 1, 1), political_party="d")
+
+        queries = query.seek(token).sql
+
+        self.assertIn(
+            "WHERE \"political_party\" IN ('d','r') "
+            "AND (TRUNC(\"timestamp\",'DD')>'2019-01-01T00:00:00' "
+            "OR (TRUNC(\"timestamp\",'DD')='2019-01-01T00:00:00' AND \"political_party\">'d')) ",
+            str(queries[0]),
+        )
+
+    def test_seek_predicate_with_metric_order_is_added_to_having_clause(self):
+        query = self.query.orderby(mock_dataset.fields.votes, Order.desc).seek()
+        token = _make_token(query, votes=5, timestamp=datetime(2019, 1, 1), political_party="d")
+
+        queries = query.seek(token).sql
+
+        self.assertEqual(
+            "SELECT "
+            "TRUNC(\"timestamp\",'DD') \"$timestamp\","
+            '"political_party" "$political_party",'
+            'SUM("votes") "$votes" '
+            'FROM "politics"."politician" '
+            'GROUP BY "$timestamp","$political_party" '
+            'HAVING SUM("votes")<5 '
+            "OR (SUM(\"votes\")=5 AND TRUNC(\"timestamp\",'DD')>'2019-01-01T00:00:00') "
+            "OR (SUM(\"votes\")=5 AND TRUNC(\"timestamp\",'DD')='2019-01-01T00:00:00' AND \"political_party\">'d') "
+            'ORDER BY CASE WHEN SUM("votes") IS NULL THEN 0 ELSE 1 END,"$votes" DESC,'
+            'CASE WHEN "timestamp" IS NULL THEN 0 ELSE 1 END,"$timestamp",'
+            'CASE WHEN "political_party" IS NULL THEN 0 ELSE 1 END,"$political_party" '
+            "LIMIT 10",
+            str(queries[0]),
+        )
+
+    def test_next_page_seeks_past_null_value_of_last_row(self):
+        query = self.query.seek()
+        token = _make_token(query, timestamp=datetime(2019, 1, 1), political_party=None)
+
+        queries = query.seek(token).sql
+
+        self.assertIn(
+            "WHERE TRUNC(\"timestamp\",'DD')>'2019-01-01T00:00:00' "
+            "OR (TRUNC(\"timestamp\",'DD')='2019-01-01T00:00:00' AND \"political_party\" IS NOT NULL) ",
+            str(queries[0]),
+        )
+
+    def test_token_from_query_with_other_orders_raises_exception(self):
+        token = _make_token(self.query.seek(), timestamp=datetime(2019, 1, 1), political_party="d")
+
+        with self.assertRaises(ContinuationTokenException):
+            self.query.orderby(mock_dataset.fields.political_party).seek(token).sql
+
+    def test_seek_with_totals_raises_exception(self):
+        with self.assertRaises(QueryException):
+            self.query.dimension(f.Rollup(mock_dataset.fields["candidate-name"])).seek().sql
+
+    def test_seek_with_references_raises_exception(self):
+        with self.assertRaises(QueryException):
+            self.query.reference(f.WeekOverWeek(timestamp_daily)).seek().sql
+
+    def test_seek_with_blended_dataset_raises_exception(self):
+        query = (
+            mock_dataset_blender.query.widget(f.Pandas(mock_dataset_blender.fields["candidate-spend"]))
+            .dimension(f.day(mock_dataset_blender.fields.timestamp))
+            .seek()
+        )
+
+        with self.assertRaises(QueryException):
+            query.sql
+
+
+class DatabaseSeekCriterionTests(TestCase):
+    orders = [(mock_dataset.fields.political_party, None), (mock_dataset.fields["candidate-name"], Order.asc)]
+
+    def test_row_values_are_compared_on_postgresql_and_mysql(self):
+        for database in (PostgreSQLDatabase(), MySQLDatabase(database="test")):
+            with self.subTest(database=database):
+                criterion = database.make_seek_criterion(self.orders, ["d", "x"])
+
+                self.assertEqual('("political_party","candidate_name")>(\'d\',\'x\')', str(criterion))
+
+    def test_row_values_are_compared_descending(self):
+        orders = [(field, Order.desc) for field, _ in self.orders]
+
+        criterion = PostgreSQLDatabase().make_seek_criterion(orders, ["d", "x"])
+
+        self.assertEqual('("political_party","candidate_name")<(\'d\',\'x\')', str(criterion))
+
+    def test_criterion_is_expanded_with_mixed_orientations(self):
+        orders = [self.orders[0], (self.orders[1][0], Order.desc)]
+
+        criterion = PostgreSQLDatabase().make_seek_criterion(orders, ["d", "x"])
+
+        self.assertEqual(
+            '"political_party">\'d\' OR ("political_party"=\'d\' AND "candidate_name"<\'x\')', str(criterion)
+        )
+
+    def test_criterion_is_expanded_on_redshift(self):
+        criterion = RedshiftDatabase().make_seek_criterion(self.orders, ["d", "x"])
+
+        self.assertEqual(
+            '"political_party">\'d\' OR ("political_party"=\'d\' AND "candidate_name">\'x\')', str(criterion)
+        )
+
+    def test_null_values_are_compared_with_is_null(self):
+        criterion = RedshiftDatabase().make_seek_criterion(self.orders, [None, "x"])
+
+        self.assertEqual(
+            '"political_party" IS NOT NULL OR ("political_party" IS NULL AND "candidate_name">\'x\')', str(criterion)
+        )
+
+    def test_criterion_is_expanded_on_postgresql_with_null_values(self):
+        criterion = PostgreSQLDatabase().make_seek_criterion(self.orders, ["d", None])
+
+        self.assertEqual(
+            '"political_party">\'d\' OR ("political_party"=\'d\' AND "candidate_name" IS NOT NULL)', str(criterion)
+        )
+
+
+class QueryBuilderKeysetPaginationFetchTests(TestCase):
+    def setUp(self):
+        self.dataset = copy.deepcopy(mock_dataset)
+        self.dataset.return_additional_metadata = True
+
+    def _fetch(self, page, limit):
+        query = (
+            self.dataset.query.widget(f.Pandas(self.dataset.fields.votes))
+            .dimension(self.dataset.fields.political_party)
+            .orderby(self.dataset.fields.votes, Order.desc)
+            .limit_query(limit)
+            .seek()
+        )
+
+        with patch.object(type(self.dataset.database), "fetch_dataframes", return_value=[page]):
+            return query, query.fetch()
+
+    def test_next_page_token_is_read_from_last_row_returned_by_database(self):
+        page = pd.DataFrame({"$political_party": ["r", "d"], "$votes": [7, 5]})
+
+        query, result = self._fetch(page, limit=2)
+
+        token = result["metadata"]["next_page_token"]
+        self.assertEqual([5, "d"], decode_continuation_token(token, query._seek_orders))
+        self.assertEqual(2, result["metadata"]["max_rows_returned"])
+
+    def test_last_page_has_no_next_page_token(self):
+        page = pd.DataFrame({"$political_party": ["r", "d"], "$votes": [7, 5]})
+
+        _, result = self._fetch(page, limit=3)
+
+        self.assertIsNone(result["metadata"]["next_page_token"])
@@ -0,0 +1,239 @@
+from datetime import date
+from unittest import TestCase
+from unittest.mock import Mock, patch
+
+import pandas as pd
+
+import fireant as f
+from fireant import Rollup
+from fireant.queries.builder import QueryException
+from fireant.tests.dataset.mocks import mock_dataset, test_database
+
+timestamp_daily = f.day(mock_dataset.fields.timestamp)
+timestamp_weekly = f.week(mock_dataset.fields.timestamp)
+
+
+# noinspection SqlDialectInspection,SqlNoDataSourceInspection
+class QueryBuilderLocalReferencesTests(TestCase):
+    maxDiff = None
+
+    def test_references_are_fetched_with_a_single_query(self):
+        queries = (
+            mock_dataset.query.widget(f.Pandas(mock_dataset.fields.votes))
+            .dimension(timestamp_daily)
+            .reference(f.WeekOverWeek(mock_dataset.fields.timestamp))
+            .reference(f.WeekOverWeek(mock_dataset.fields.timestamp, delta=True))
+            .reference(f.YearOverYear(mock_dataset.fields.timestamp))
+            .filter(mock_dataset.fields.timestamp.between(date(2020, 1, 8), date(2020, 1, 14)))
+            .shift_references_locally()
+            .sql
+        )
+
+        self.assertEqual(1, len(queries))
+        self.assertEqual(
+            "SELECT "
+            "TRUNC(\"timestamp\",'DD') \"$timestamp\","
+            'SUM("votes") "$votes" '
+            'FROM "politics"."politician" '
+            "WHERE \"timestamp\" BETWEEN '2020-01-08' AND '2020-01-14' "
+            "OR \"timestamp\" BETWEEN TIMESTAMPADD(week,-1,'2020-01-08') AND TIMESTAMPADD(week,-1,'2020-01-14') "
+            "OR \"timestamp\" BETWEEN TIMESTAMPADD(week,-52,'2020-01-08') AND TIMESTAMPADD(week,-52,'2020-01-14') "
+            'GROUP BY "$timestamp" '
+            'ORDER BY "$timestamp" '
+            'LIMIT 200000',
+            str(queries[0]),
+        )
+
+    def test_other_filters_are_not_widened(self):
+        queries = (
+            mock_dataset.query.widget(f.Pandas(mock_dataset.fields.votes))
+            .dimension(timestamp_daily)
+            .reference(f.WeekOverWeek(mock_dataset.fields.timestamp))
+            .filter(mock_dataset.fields.political_party == "d")
+            .filter(mock_dataset.fields.timestamp.between(date(2020, 1, 8), date(2020, 1, 14)))
+            .shift_references_locally()
+            .sql
+        )
+
+        self.assertEqual(
+            "SELECT "
+            "TRUNC(\"timestamp\",'DD') \"$timestamp\","
+            'SUM("votes") "$votes" '
+            'FROM "politics"."politician" '
+            "WHERE \"political_party\"='d' "
+            "AND (\"timestamp\" BETWEEN '2020-01-08' AND '2020-01-14' "
+            "OR \"timestamp\" BETWEEN TIMESTAMPADD(week,-1,'2020-01-08') AND TIMESTAMPADD(week,-1,'2020-01-14')) "
+            'GROUP BY "$timestamp" '
+            'ORDER BY "$timestamp" '
+            'LIMIT 200000',
+            str(queries[0]),
+        )
+
+    def test_one_query_per_totals_dimension(self):
+        queries = (
+            mock_dataset.query.widget(f.Pandas(mock_dataset.fields.votes))
+            .dimension(timestamp_daily, Rollup(mock_dataset.fields.political_party))
+            .reference(f.WeekOverWeek(mock_dataset.fields.timestamp))
+            .shift_references_locally()
+            .sql
+        )
+
+        self.assertEqual(2, len(queries))
+
+    def test_references_are_fetched_with_separate_queries_when_disabled(self):
+        queries = (
+            mock_dataset.query.widget(f.Pandas(mock_dataset.fields.votes))
+            .dimension(timestamp_daily)
+            .reference(f.WeekOverWeek(mock_dataset.fields.timestamp))
+            .shift_references_locally()
+            .shift_references_locally(False)
+            .sql
+        )
+
+        self.assertEqual(2, len(queries))
+
+    def test_raises_exception_when_reference_dimension_is_not_selected(self):
+        query = (
+            mock_dataset.query.widget(f.Pandas(mock_dataset.fields.votes))
+            .dimension(mock_dataset.fields.political_party)
+            .reference(f.WeekOverWeek(mock_dataset.fields.timestamp))
+            .shift_references_locally()
+        )
+
+        with self.assertRaises(QueryException):
+            query.sql
+
+    def test_raises_exception_when_reference_dimension_is_rolled_up(self):
+        query = (
+            mock_dataset.query.widget(f.Pandas(mock_dataset.fields.votes))
+            .dimension(Rollup(timestamp_daily))
+            .reference(f.WeekOverWeek(mock_dataset.fields.timestamp))
+            .shift_references_locally()
+        )
+
+        with self.assertRaises(QueryException):
+            query.sql
+
+    def test_raises_exception_when_filtering_by_metrics(self):
+        query = (
+            mock_dataset.query.widget(f.Pandas(mock_dataset.fields.votes))
+            .dimension(timestamp_daily)
+            .reference(f.WeekOverWeek(mock_dataset.fields.timestamp))
+            .filter(mock_dataset.fields.votes > 10)
+            .shift_references_locally()
+        )
+
+        with self.assertRaises(QueryException):
+            query.sql
+
+    def test_raises_exception_when_paginating_in_the_query(self):
+        query = (
+            mock_dataset.query.widget(f.Pandas(mock_dataset.fields.votes))
+            .dimension(timestamp_daily)
+            .reference(f.WeekOverWeek(mock_dataset.fields.timestamp))
+            .limit_query(10)
+            .shift_references_locally()
+        )
+
+        with self.assertRaises(QueryException):
+            query.sql
+
+    def test_raises_exception_when_reference_dimension_is_not_filtered_by_a_range(self):
+        query = (
+            mock_dataset.query.widget(f.Pandas(mock_dataset.fields.votes))
+            .dimension(timestamp_daily)
+            .reference(f.WeekOverWeek(mock_dataset.fields.timestamp))
+            .filter(mock_dataset.fields.timestamp.isin([date(2020, 1, 8)]))
+            .shift_references_locally()
+        )
+
+        with self.assertRaises(QueryException):
+            query.sql
+
+    def test_raises_exception_for_blended_datasets(self):
+        blender = mock_dataset.blend(mock_dataset).on_dimensions()
+        query = (
+            blender.query.widget(f.Pandas(blender.fields.votes))
+            .dimension(f.day(blender.fields.timestamp))
+            .reference(f.WeekOverWeek(blender.fields.timestamp))
+            .shift_references_locally()
+        )
+
+        with self.assertRaises(QueryException):
+            query.sql
+
+
+class QueryBuilderFetchLocalReferencesTests(TestCase):
+    def _fetch(self, query, result_set):
+        widget = f.Widget(mock_dataset.fields.votes)
+        widget.transform = Mock()
+
+        with patch.object(type(test_database), "fetch_dataframes", return_value=[result_set]) as mock_fetch:
+            query.widget(widget).fetch()
+
+        mock_fetch.assert_called_once()
+        # The data frame is ordered by the default orders of the query
+        return widget.transform.call_args[0][0].sort_index()
+
+    def test_references_are_computed_by_shifting_the_reference_dimension(self):
+        # Two weeks of data, of which only the second week is within the filter range
+        result_set = pd.DataFrame(
+            {
+                "$timestamp": pd.date_range("2020-01-01", "2020-01-14"),
+                "$votes": [float(day) for day in range(1, 15)],
+            }
+        )
+        query = (
+            mock_dataset.query.dimension(timestamp_daily)
+            .reference(f.WeekOverWeek(mock_dataset.fields.timestamp))
+            .reference(f.WeekOverWeek(mock_dataset.fields.timestamp, delta=True))
+            .filter(mock_dataset.fields.timestamp.between(date(2020, 1, 8), date(2020, 1, 14)))
+            .shift_references_locally()
+        )
+
+        data_frame = self._fetch(query, result_set)
+
+        self.assertEqual(list(pd.date_range("2020-01-08", "2020-01-14")), list(data_frame.index))
+        self.assertEqual([8.0, 9.0, 10.0, 11.0, 12.0, 13.0, 14.0], list(data_frame["$votes"]))
+        self.assertEqual([1.0, 2.0, 3.0, 4.0, 5.0, 6.0, 7.0], list(data_frame["$votes_wow"]))
+        self.assertEqual([7.0] * 7, list(data_frame["$votes_wow_delta"]))
+
+    def test_base_range_is_aligned_with_the_interval_of_the_reference_dimension(self):
+        # 2020-01-06 and 2020-01-13 are Mondays, the filter starts on a Wednesday
+        result_set = pd.DataFrame(
+            {
+                "$timestamp": pd.to_datetime(["2019-12-30", "2020-01-06", "2020-01-13"]),
+                "$votes": [1.0, 2.0, 3.0],
+            }
+        )
+        query = (
+            mock_dataset.query.dimension(timestamp_weekly)
+            .reference(f.WeekOverWeek(mock_dataset.fields.timestamp))
+            .filter(mock_dataset.fields.timestamp.between(date(2020, 1, 8), date(2020, 1, 19)))
+            .shift_references_locally()
+        )
+
+        data_frame = self._fetch(query, result_set)
+
+        self.assertEqual(list(pd.to_datetime(["2020-01-06", "2020-01-13"])), list(data_frame.index))
+        self.assertEqual([2.0, 3.0], list(data_frame["$votes"]))
+        self.assertEqual([1.0, 2.0], list(data_frame["$votes_wow"]))
+
+    def test_references_without_filter_on_reference_dimension(self):
+        result_set = pd.DataFrame(
+            {
+                "$timestamp": pd.to_datetime(["2020-01-01", "2020-01-02"]),
+                "$votes": [1.0, 2.0],
+            }
+        )
+        query = (
+            mock_dataset.query.dimension(timestamp_daily)
+            .reference(f.DayOverDay(mock_dataset.fields.timestamp))
+            .shift_references_locally()
+        )
+
+        data_frame = self._fetch(query, result_set)
+
+        self.assertEqual([1.0, 2.0], list(data_frame["$votes"]))
+        self.assertTrue(pd.isnull(data_frame["$votes_dod"].iloc[0]))
+        self.assertEqual(1.0, data_frame["$votes_dod"].iloc[1])
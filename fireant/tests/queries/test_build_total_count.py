@@ -0,0 +1,187 @@
+import copy
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+
+import fireant as f
+from fireant.database import PostgreSQLDatabase, RedshiftDatabase, SnowflakeDatabase, VerticaDatabase
+from fireant.queries.builder.query_builder import QueryException
+from fireant.tests.dataset.mocks import mock_dataset, mock_dataset_blender
+
+timestamp_daily = f.day(mock_dataset.fields.timestamp)
+
+
+# noinspection SqlDialectInspection,SqlNoDataSourceInspection
+class DatabaseTotalCountQueryTests(TestCase):
+    maxDiff = None
+
+    def _make_query(self, database, dimensions, filters=(), approximate=False):
+        return database.make_total_count_query(
+            mock_dataset.table, mock_dataset.joins, dimensions, filters, approximate=approximate
+        )
+
+    def test_rows_of_grouped_query_are_counted(self):
+        query = self._make_query(
+            VerticaDatabase(),
+            [timestamp_daily, mock_dataset.fields.political_party],
+            [mock_dataset.fields.political_party.isin(["d"])],
+        )
+
+        self.assertEqual(
+            'SELECT COUNT(*) "$count" FROM ('
+            "SELECT "
+            "TRUNC(\"timestamp\",'DD') \"$timestamp\","
+            '"political_party" "$political_party" '
+            'FROM "politics"."politician" '
+            "WHERE \"political_party\" IN ('d') "
+            'GROUP BY "$timestamp","$political_party"'
+            ') "sq0"',
+            str(query),
+        )
+
+    def test_approximate_count_on_vertica(self):
+        query = self._make_query(
+            VerticaDatabase(),
+            [mock_dataset.fields.political_party],
+            [mock_dataset.fields.political_party.isin(["d"])],
+            approximate=True,
+        )
+
+        self.assertEqual(
+            'SELECT APPROXIMATE_COUNT_DISTINCT("political_party") "$count" '
+            'FROM "politics"."politician" '
+            "WHERE \"political_party\" IN ('d')",
+            str(query),
+        )
+
+    def test_approximate_count_of_multiple_dimensions_on_vertica_hashes_them(self):
+        query = self._make_query(
+            VerticaDatabase(), [timestamp_daily, mock_dataset.fields.political_party], approximate=True
+        )
+
+        self.assertEqual(
+            "SELECT APPROXIMATE_COUNT_DISTINCT(HASH(TRUNC(\"timestamp\",'DD'),\"political_party\")) \"$count\" "
+            'FROM "politics"."politician"',
+            str(query),
+        )
+
+    def test_approximate_count_with_joined_dimension(self):
+        query = self._make_query(VerticaDatabase(), [mock_dataset.fields["district-name"]], approximate=True)
+
+        self.assertEqual(
+            'SELECT APPROXIMATE_COUNT_DISTINCT("district"."district_name") "$count" '
+            'FROM "politics"."politician" '
+            'FULL OUTER JOIN "locations"."district" ON "politician"."district_id"="district"."id"',
+            str(query),
+        )
+
+    def test_approximate_count_on_snowflake(self):
+        query = self._make_query(
+            SnowflakeDatabase(), [timestamp_daily, mock_dataset.fields.political_party], approximate=True
+        )
+
+        self.assertEqual(
+            "SELECT APPROX_COUNT_DISTINCT(TRUNC(timestamp,'DD'),political_party) \"$count\" FROM politics.politician",
+            str(query),
+        )
+
+    def test_approximate_count_on_redshift(self):
+        query = self._make_query(RedshiftDatabase(), [mock_dataset.fields.political_party], approximate=True)
+
+        self.assertEqual(
+            'SELECT APPROXIMATE COUNT(DISTINCT "political_party") "$count" FROM "politics"."politician"',
+            str(query),
+        )
+
+    def test_exact_count_is_used_when_approximate_count_is_not_supported(self):
+        for database, dimensions in (
+            (PostgreSQLDatabase(), [mock_dataset.fields.political_party]),
+            (RedshiftDatabase(), [timestamp_daily, mock_dataset.fields.political_party]),
+        ):
+            with self.subTest(database=database):
+                query = self._make_query(database, dimensions, approximate=True)
+
+                self.assertTrue(str(query).startswith('SELECT COUNT(*) "$count" FROM (SELECT '))
+
+    def test_exact_count_is_used_with_metric_filters(self):
+        query = self._make_query(
+            VerticaDatabase(),
+            [mock_dataset.fields.political_party],
+            [mock_dataset.fields.votes > 10],
+            approximate=True,
+        )
+
+        self.assertEqual(
+            'SELECT COUNT(*) "$count" FROM ('
+            'SELECT "political_party" "$political_party" '
+            'FROM "politics"."politician" '
+            'GROUP BY "$political_party" '
+            'HAVING SUM("votes")>10'
+            ') "sq0"',
+            str(query),
+        )
+
+
+@patch("fireant.queries.builder.dataset_query_builder.fetch_data", return_value=(100, MagicMock()))
+@patch("fireant.queries.builder.dataset_query_builder.paginate")
+class QueryBuilderTotalCountTests(TestCase):
+    def setUp(self):
+        self.dataset = copy.deepcopy(mock_dataset)
+        self.dataset.return_additional_metadata = True
+
+    def _query(self, *dimensions):
+        widget = f.Widget(self.dataset.fields.votes)
+        widget.transform = MagicMock()
+        return self.dataset.query.widget(widget).dimension(*dimensions).limit_client(10)
+
+    def test_total_count_is_returned_in_metadata(self, *mocks):
+        query = self._query(self.dataset.fields.political_party).count_total()
+
+        with patch.object(type(self.dataset.database), "fetch", return_value=[(42,)]) as mock_fetch:
+            result = query.fetch()
+
+        self.assertEqual(dict(max_rows_returned=100, total_count=42), result["metadata"])
+        mock_fetch.assert_called_once_with(
+            'SELECT COUNT(*) "$count" FROM ('
+            'SELECT "political_party" "$political_party" '
+            'FROM "politics"."politician" '
+            'GROUP BY "$political_party"'
+            ') "sq0"'
+        )
+
+    def test_approximate_total_count(self, *mocks):
+        query = self._query(self.dataset.fields.political_party).count_total(approximate=True)
+
+        with patch.object(type(self.dataset.database), "fetch", return_value=[(42,)]) as mock_fetch:
+            query.fetch()
+
+        mock_fetch.assert_called_once_with(
+            'SELECT APPROXIMATE_COUNT_DISTINCT("political_party") "$count" FROM "politics"."politician"'
+        )
+
+    def test_total_count_without_dimensions_is_one(self, *mocks):
+        query = self._query().count_total()
+
+        with patch.object(type(self.dataset.database), "fetch") as mock_fetch:
+            result = query.fetch()
+
+        self.assertEqual(1, result["metadata"]["total_count"])
+        mock_fetch.assert_not_called()
+
+    def test_total_count_is_not_fetched_by_default(self, *mocks):
+        query = self._query(self.dataset.fields.political_party)
+
+        with patch.object(type(self.dataset.database), "fetch") as mock_fetch:
+            result = query.fetch()
+
+        self.assertEqual(dict(max_rows_returned=100), result["metadata"])
+        mock_fetch.assert_not_called()
+
+    def test_total_count_with_blended_dataset_raises_exception(self, *mocks):
+        query = (
+            mock_dataset_blender.query.widget(f.Pandas(mock_dataset_blender.fields["candidate-spend"]))
+            .dimension(f.day(mock_dataset_blender.fields.timestamp))
+            .count_total()
+        )
+
+        with self.assertRaises(QueryException):
+            query.sql
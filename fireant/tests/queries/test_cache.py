@@ -0,0 +1,147 @@
+import copy
+import pickle
+import threading
+from unittest import TestCase
+from unittest.mock import Mock, patch
+
+from fireant.queries.cache import ResultCache
+
+
+@patch("fireant.queries.cache.time")
+class ResultCacheTests(TestCase):
+    def test_result_is_fetched_once_while_fresh(self, mock_time):
+        mock_time.monotonic.return_value = 0
+        cache = ResultCache(ttl=10)
+        fetch = Mock(return_value="a")
+
+        self.assertEqual("a", cache.get("key", fetch))
+        mock_time.monotonic.return_value = 9
+        self.assertEqual("a", cache.get("key", fetch))
+
+        fetch.assert_called_once_with()
+
+    def test_results_are_cached_per_key(self, mock_time):
+        mock_time.monotonic.return_value = 0
+        cache = ResultCache(ttl=10)
+
+        self.assertEqual("a", cache.get("a", lambda: "a"))
+        self.assertEqual("b", cache.get("b", lambda: "b"))
+        self.assertEqual(2, len(cache))
+
+    def test_expired_result_is_fetched_again(self, mock_time):
+        mock_time.monotonic.return_value = 0
+        cache = ResultCache(ttl=10)
+        cache.get("key", lambda: "a")
+
+        mock_time.monotonic.return_value = 10
+        self.assertEqual("b", cache.get("key", lambda: "b"))
+
+    def test_stale_result_is_returned_while_refreshing_in_background(self, mock_time):
+        mock_time.monotonic.return_value = 0
+        cache = ResultCache(ttl=10, stale_ttl=10)
+        cache.get("key", lambda: "a")
+
+        refreshed = threading.Event()
+
+        def fetch():
+            refreshed.set()
+            return "b"
+
+        mock_time.monotonic.return_value = 15
+        with patch("fireant.queries.cache.threading.Thread") as mock_thread:
+            self.assertEqual("a", cache.get("key", fetch))
+            self.assertEqual("a", cache.get("key", fetch))
+
+        # Only one refresh is started for a key
+        mock_thread.assert_called_once()
+        mock_thread.call_args.kwargs["target"]()
+
+        self.assertTrue(refreshed.is_set())
+        self.assertEqual("b", cache.get("key", fetch))
+
+    def test_stale_result_is_kept_if_refresh_fails(self, mock_time):
+        mock_time.monotonic.return_value = 0
+        cache = ResultCache(ttl=10, stale_ttl=10)
+        cache.get("key", lambda: "a")
+
+        mock_time.monotonic.return_value = 15
+        with patch("fireant.queries.cache.threading.Thread") as mock_thread:
+            cache.get("key", Mock(side_effect=Exception))
+        mock_thread.call_args.kwargs["target"]()
+
+        with patch("fireant.queries.cache.threading.Thread"):
+            self.assertEqual("a", cache.get("key", lambda: "b"))
+
+    def test_least_recently_used_results_are_evicted(self, mock_time):
+        mock_time.monotonic.return_value = 0
+        cache = ResultCache(ttl=10, max_size=2)
+
+        cache.get("a", lambda: "a")
+        cache.get("b", lambda: "b")
+        cache.get("a", lambda: "a")
+        cache.get("c", lambda: "c")
+
+        fetch = Mock(return_value="b")
+        cache.get("b", fetch)
+        fetch.assert_called_once_with()
+        self.assertEqual(2, len(cache))
+
+    def test_invalidate_and_clear(self, mock_time):
+        mock_time.monotonic.return_value = 0
+        cache = ResultCache(ttl=10)
+        cache.get("a", lambda: "a")
+        cache.get("b", lambda: "b")
+
+        cache.invalidate("a")
+        self.assertEqual("c", cache.get("a", lambda: "c"))
+
+        cache.clear()
+        self.assertEqual(0, len(cache))
+
+    def test_key_locks_are_removed_once_fetched(self, mock_time):
+        mock_time.monotonic.return_value = 0
+        cache = ResultCache(ttl=10)
+
+        cache.get("a", lambda: "a")
+        with self.assertRaises(ValueError):
+            cache.get("b", Mock(side_effect=ValueError))
+
+        self.assertEqual({}, cache._key_locks)
+
+    def test_concurrent_requests_for_a_key_wait_for_a_single_fetch(self, mock_time):
+        mock_time.monotonic.return_value = 0
+        cache = ResultCache(ttl=10)
+        fetching, release = threading.Event(), threading.Event()
+
+        def fetch():
+            fetching.set()
+            release.wait(5)
+            return "a"
+
+        other_fetch = Mock(return_value="b")
+        thread = threading.Thread(target=cache.get, args=("key", fetch))
+        thread.start()
+        fetching.wait(5)
+        waiter = threading.Thread(target=cache.get, args=("key", other_fetch))
+        waiter.start()
+        release.set()
+        thread.join(5)
+        waiter.join(5)
+
+        other_fetch.assert_not_called()
+        self.assertEqual({}, cache._key_locks)
+
+    def test_copies_share_the_cache(self, mock_time):
+        cache = ResultCache(ttl=10)
+
+        self.assertIs(cache, copy.deepcopy(cache))
+
+    def test_pickled_cache_is_empty(self, mock_time):
+        mock_time.monotonic.return_value = 0
+        cache = ResultCache(ttl=10, stale_ttl=5, max_size=3)
+        cache.get("a", lambda: "a")
+
+        unpickled = pickle.loads(pickle.dumps(cache))
+
+        self.assertEqual((10, 5, 3), (unpickled.ttl, unpickled.stale_ttl, unpickled.max_size))
+        self.assertEqual(0, len(unpickled))
@@ -1048,13 +1048,6 @@ class DataSetBlenderIntegrationTests(TestCase):
             'FROM "test0" '
             'GROUP BY "$timestamp"'
             ') "sq0" '
-            "LEFT JOIN ("
-            "SELECT "
-            '"timestamp" "$timestamp" '
-            'FROM "test1" '
-            'GROUP BY "$timestamp" '
-            'HAVING SUM("metric") BETWEEN 10 AND 20'
-            ') "sq1" ON "sq0"."$timestamp"="sq1"."$timestamp" '
             'ORDER BY "$timestamp" '
             'LIMIT 200000',
             str(query),
@@ -1120,13 +1113,6 @@ class DataSetBlenderIntegrationTests(TestCase):
             'FROM "test0" '
             'GROUP BY "$timestamp"'
             ') "sq0" '
-            "LEFT JOIN ("
-            "SELECT "
-            '"timestamp" "$timestamp" '
-            'FROM "test1" '
-            'GROUP BY "$timestamp" '
-            'HAVING SUM("metric") BETWEEN 10 AND 20'
-            ') "sq1" ON "sq0"."$timestamp"="sq1"."$timestamp" '
             'ORDER BY "$timestamp" '
             'LIMIT 200000',
             str(query_1),
@@ -1702,3 +1688,92 @@ class DataSetBlenderMultipleDatasetsTests(TestCase):
                 )
             )
         )
+
+
+# noinspection SqlDialectInspection,SqlNoDataSourceInspection
+class DataSetBlenderPruningTests(TestCase):
+    maxDiff = None
+
+    def setUp(self):
+        db = MockDatabase()
+        t0, t1 = Tables("test0", "test1")
+        self.primary_ds = DataSet(
+            table=t0,
+            database=db,
+            fields=[
+                Field("timestamp", definition=t0.timestamp, data_type=DataType.date),
+                Field("metric0", definition=fn.Sum(t0.metric)),
+            ],
+        )
+        self.secondary_ds = DataSet(
+            table=t1,
+            database=db,
+            fields=[
+                Field("timestamp", definition=t1.timestamp, data_type=DataType.date),
+                Field("metric0", definition=fn.Sum(t1.metric0)),
+                Field("metric1", definition=fn.Sum(t1.metric)),
+            ],
+        )
+        blend_ds = self.primary_ds.blend(self.secondary_ds).on(
+            {
+                self.primary_ds.fields.timestamp: self.secondary_ds.fields.timestamp,
+                self.primary_ds.fields.metric0: self.secondary_ds.fields.metric0,
+            }
+        )
+        self.blend_ds = blend_ds.extra_fields(
+            Field("ratio", definition=blend_ds.fields.metric0 / blend_ds.fields.metric1, data_type=DataType.number)
+        )
+
+    def test_metric_mapped_in_several_datasets_is_only_selected_from_the_first_one(self):
+        query = (
+            self.blend_ds.query()
+            .dimension(self.blend_ds.fields.timestamp)
+            .widget(f.Widget(self.blend_ds.fields.ratio))
+            .orderby(self.blend_ds.fields.metric0)
+        ).sql[0]
+
+        self.assertEqual(
+            "SELECT "
+            '"sq0"."$timestamp" "$timestamp",'
+            '"sq0"."$metric0"/"sq1"."$metric1" "$ratio",'
+            '"sq0"."$metric0" "$metric0" '
+            "FROM ("
+            "SELECT "
+            '"timestamp" "$timestamp",'
+            'SUM("metric") "$metric0" '
+            'FROM "test0" '
+            'GROUP BY "$timestamp"'
+            ') "sq0" '
+            "LEFT JOIN ("
+            "SELECT "
+            '"timestamp" "$timestamp",'
+            'SUM("metric") "$metric1" '
+            'FROM "test1" '
+            'GROUP BY "$timestamp"'
+            ') "sq1" ON "sq0"."$timestamp"="sq1"."$timestamp" '
+            'ORDER BY "$metric0" '
+            'LIMIT 200000',
+            str(query),
+        )
+
+    def test_dataset_queries_are_not_modified_when_their_columns_are_referenced(self):
+        query = (
+            self.blend_ds.query()
+            .dimension(self.blend_ds.fields.timestamp)
+            .widget(f.Widget(self.blend_ds.fields.metric0, self.blend_ds.fields.metric1))
+        ).sql[0]
+
+        self.assertIn('SUM("metric") "$metric0" FROM "test0"', str(query))
+        self.assertIn('SUM("metric") "$metric1" FROM "test1"', str(query))
+
+    def test_dataset_joined_only_for_a_metric_filter_is_kept_for_totals(self):
+        # Without a GROUP BY, the secondary dataset query could match several rows of the primary dataset query
+        query_1, query_2 = (
+            self.blend_ds.query()
+            .dimension(f.Rollup(self.blend_ds.fields.timestamp))
+            .widget(f.Widget(self.blend_ds.fields.metric0))
+            .filter(self.blend_ds.fields.metric1.between(10, 20))
+        ).sql
+
+        self.assertNotIn('"sq1"', str(query_1))
+        self.assertIn('LEFT JOIN (SELECT \'_FIREANT_ROLLUP_VALUE_\' "$timestamp" FROM "test1" HAVING', str(query_2))
@@ -8,7 +8,8 @@ from unittest.mock import (
 
 import pandas as pd
 
-from fireant import DataSet, DataType, Field
+from fireant import DataSet, DataType, Field, ResultCache
+from fireant.queries.builder.query_builder import QueryException
 from fireant.tests.dataset.matchers import (
     FieldMatcher,
     PypikaQueryMatcher,
@@ -344,3 +345,220 @@ class DimensionsChoicesFetchTests(TestCase):
         self.assertTrue(
             pd.Series(['a', 'b', 'c'], index=['a', 'b', 'c'], name='political_party').equals(result['data'])
         )
+
+
+@patch("fireant.queries.builder.dimension_choices_query_builder.fetch_data")
+class DimensionsChoicesCacheTests(TestCase):
+    def setUp(self):
+        self.dataset = DataSet(
+            table=politicians_table,
+            database=test_database,
+            choices_cache=ResultCache(ttl=60),
+            fields=[
+                Field("political_party", definition=politicians_table.political_party, data_type=DataType.text),
+                Field("candidate-name", definition=politicians_table.candidate_name, data_type=DataType.text),
+            ],
+        )
+
+    @staticmethod
+    def _choices_df():
+        return pd.DataFrame({'$political_party': ['d', 'r']}).set_index('$political_party')
+
+    def test_choices_are_fetched_once(self, mock_fetch_data: Mock):
+        mock_fetch_data.side_effect = lambda *args: (2, self._choices_df())
+
+        choices_1 = self.dataset.fields.political_party.choices.fetch()
+        choices_2 = self.dataset.fields.political_party.choices.fetch()
+
+        mock_fetch_data.assert_called_once()
+        self.assertEqual(['d', 'r'], list(choices_1))
+        self.assertTrue(choices_1.equals(choices_2))
+        self.assertIsNot(choices_1, choices_2)
+
+    def test_choices_are_cached_per_filters(self, mock_fetch_data: Mock):
+        mock_fetch_data.side_effect = lambda *args: (2, self._choices_df())
+        choices = self.dataset.fields.political_party.choices
+
+        choices.fetch()
+        choices.filter(self.dataset.fields["candidate-name"].isin(["a"])).fetch()
+        choices.filter(self.dataset.fields["candidate-name"].isin(["a"])).fetch()
+
+        self.assertEqual(2, mock_fetch_data.call_count)
+
+
+# noinspection SqlDialectInspection,SqlNoDataSourceInspection
+@patch("fireant.queries.builder.dimension_choices_query_builder.fetch_data", return_value=(100, MagicMock()))
+class DimensionsChoicesSearchTests(TestCase):
+    def test_search_choices_by_prefix(self, mock_fetch_data: Mock):
+        mock_dataset.fields.political_party.choices.search("De", limit=5)
+
+        mock_fetch_data.assert_called_once_with(
+            ANY,
+            [
+                PypikaQueryMatcher(
+                    "SELECT "
+                    '"political_party" "$political_party" '
+                    'FROM "politics"."politician" '
+                    'WHERE NOT "political_party" IS NULL '
+                    "AND LOWER(\"political_party\") LIKE 'de%' ESCAPE '!' "
+                    'GROUP BY "$political_party" '
+                    "ORDER BY LOWER(\"political_party\")='de' DESC,\"$political_party\" "
+                    "LIMIT 5"
+                )
+            ],
+            FieldMatcher(mock_dataset.fields.political_party),
+        )
+
+    def test_search_choices_escapes_wildcards_in_prefix(self, mock_fetch_data: Mock):
+        mock_dataset.fields.political_party.choices.search("50%_!")
+
+        query = str(mock_fetch_data.call_args[0][1][0])
+        self.assertIn("LIKE '50!%!_!!%' ESCAPE '!'", query)
+        self.assertIn("LIMIT 20", query)
+
+    def test_search_choices_with_filters(self, mock_fetch_data: Mock):
+        mock_dataset.fields["candidate-name"].choices.filter(mock_dataset.fields.political_party.isin(["d"])).search(
+            "b"
+        )
+
+        self.assertEqual(
+            "SELECT "
+            '"candidate_name" "$candidate-name" '
+            'FROM "politics"."politician" '
+            "WHERE \"political_party\" IN ('d') "
+            'AND NOT "candidate_name" IS NULL '
+            "AND LOWER(\"candidate_name\") LIKE 'b%' ESCAPE '!' "
+            'GROUP BY "$candidate-name" '
+            "ORDER BY LOWER(\"candidate_name\")='b' DESC,\"$candidate-name\" "
+            "LIMIT 20",
+            str(mock_fetch_data.call_args[0][1][0]),
+        )
+
+    @patch.object(
+        mock_hint_dataset.database,
+        "get_column_definitions",
+        return_value=[
+            ["candidate_name", "varchar(128)"],
+            ["candidate_name_display", "varchar(128)"],
+        ],
+    )
+    def test_search_choices_by_display_value_with_hint_table(self, mock_get_column_definitions, mock_fetch_data):
+        mock_hint_dataset.fields.candidate_name.choices.search("b")
+
+        self.assertEqual(
+            "SELECT "
+            '"candidate_name" "$candidate_name",'
+            '"candidate_name_display" "$candidate_name_display" '
+            'FROM "politics"."hints" '
+            'WHERE NOT "candidate_name" IS NULL '
+            "AND LOWER(\"candidate_name_display\") LIKE 'b%' ESCAPE '!' "
+            'GROUP BY "$candidate_name","$candidate_name_display" '
+            "ORDER BY LOWER(\"candidate_name_display\")='b' DESC,\"$candidate_name\" "
+            "LIMIT 20",
+            str(mock_fetch_data.call_args[0][1][0]),
+        )
+
+    def test_search_choices_of_non_text_dimensions_raises_exception(self, mock_fetch_data: Mock):
+        for field in (mock_dataset.fields["candidate-id"], mock_dataset.fields.timestamp):
+            for use_index in (False, True):
+                with self.subTest(field=field.alias, use_index=use_index):
+                    with self.assertRaises(QueryException):
+                        field.choices.search("1", use_index=use_index)
+
+        mock_fetch_data.assert_not_called()
+
+    def test_search_choices_with_index_fetches_choices_once(self, mock_fetch_data: Mock):
+        dataset = DataSet(
+            table=politicians_table,
+            database=test_database,
+            choices_cache=ResultCache(ttl=60),
+            fields=[Field("state", definition=politicians_table.state, data_type=DataType.text)],
+        )
+        mock_fetch_data.return_value = (
+            3,
+            pd.DataFrame({"$state": ["Nevada", "New York", "Texas", "new"]}).set_index("$state"),
+        )
+
+        result_1 = dataset.fields.state.choices.search("ne", limit=2, use_index=True)
+        result_2 = dataset.fields.state.choices.search("NEW", use_index=True)
+
+        mock_fetch_data.assert_called_once()
+        self.assertNotIn("LIKE", str(mock_fetch_data.call_args[0][1][0]))
+        self.assertEqual(["Nevada", "New York"], list(result_1))
+        self.assertEqual(["new", "New York"], list(result_2))
+
+
+# noinspection SqlDialectInspection,SqlNoDataSourceInspection
+class DataSetFetchChoicesTests(TestCase):
+    def setUp(self):
+        self.dataset = DataSet(
+            table=politicians_table,
+            database=test_database,
+            fields=[
+                Field("political_party", definition=politicians_table.political_party, data_type=DataType.text),
+                Field("candidate-name", definition=politicians_table.candidate_name, data_type=DataType.text),
+            ],
+        )
+
+    @staticmethod
+    def _result_sets():
+        return [
+            pd.DataFrame({"$political_party": ["d", "r"]}),
+            pd.DataFrame({"$candidate-name": ["Bill", "Donald", "Hillary"]}),
+        ]
+
+    def test_choices_are_fetched_in_one_call(self):
+        with patch.object(type(test_database), "fetch_dataframes", return_value=self._result_sets()) as mock_fetch:
+            result = self.dataset.fetch_choices(
+                self.dataset.fields.political_party,
+                self.dataset.fields["candidate-name"],
+                filters=[self.dataset.fields.political_party.isin(["d", "r"])],
+            )
+
+        mock_fetch.assert_called_once_with(
+            "SELECT "
+            '"political_party" "$political_party" '
+            'FROM "politics"."politician" '
+            "WHERE \"political_party\" IN ('d','r') "
+            'AND NOT "political_party" IS NULL '
+            'GROUP BY "$political_party" '
+            'ORDER BY "$political_party"',
+            "SELECT "
+            '"candidate_name" "$candidate-name" '
+            'FROM "politics"."politician" '
+            "WHERE \"political_party\" IN ('d','r') "
+            'AND NOT "candidate_name" IS NULL '
+            'GROUP BY "$candidate-name" '
+            'ORDER BY "$candidate-name"',
+            parse_dates={},
+        )
+        self.assertEqual(["political_party", "candidate-name"], list(result))
+        self.assertEqual(["d", "r"], list(result["political_party"]))
+        self.assertEqual(["Bill", "Donald", "Hillary"], list(result["candidate-name"]))
+
+    def test_choices_are_enveloped_if_return_additional_metadata_True(self):
+        self.dataset.return_additional_metadata = True
+
+        with patch.object(type(test_database), "fetch_dataframes", return_value=self._result_sets()):
+            result = self.dataset.fetch_choices(
+                self.dataset.fields.political_party, self.dataset.fields["candidate-name"]
+            )
+
+        self.assertEqual(dict(max_rows_returned=2), result["political_party"]["metadata"])
+        self.assertEqual(dict(max_rows_returned=3), result["candidate-name"]["metadata"])
+
+    def test_cached_choices_are_not_fetched_again(self):
+        self.dataset.choices_cache = ResultCache(ttl=60)
+
+        with patch.object(type(test_database), "fetch_dataframes", return_value=self._result_sets()[:1]):
+            self.dataset.fetch_choices(self.dataset.fields.political_party)
+
+        with patch.object(type(test_database), "fetch_dataframes", return_value=self._result_sets()[1:]) as mock_fetch:
+            result = self.dataset.fetch_choices(
+                self.dataset.fields.political_party, self.dataset.fields["candidate-name"]
+            )
+
+        self.assertEqual(1, len(mock_fetch.call_args[0]))
+        self.assertIn('"$candidate-name"', mock_fetch.call_args[0][0])
+        self.assertEqual(["d", "r"], list(result["political_party"]))
+        self.assertEqual(["Bill", "Donald", "Hillary"], list(result["candidate-name"]))
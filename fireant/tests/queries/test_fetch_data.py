@@ -1,4 +1,7 @@
 import copy
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime
 from unittest import TestCase
 from unittest.mock import ANY, MagicMock, Mock, patch
 
@@ -6,13 +9,20 @@ import pandas as pd
 from pypika import Order, Table
 
 import fireant as f
-from fireant import DataSet, DataType, Field, Share
+from fireant import DataSet, DataType, Field, ResultCache, Share
 from fireant.dataset.filters import ComparisonOperator
 from fireant.dataset.references import ReferenceFilter
+from fireant.middleware import Profiler
 from fireant.queries.sets import _make_set_dimension
 from fireant.tests.database.mock_database import MockDatabase
 from fireant.tests.dataset.matchers import FieldMatcher, PypikaQueryMatcher
-from fireant.tests.dataset.mocks import mock_category_annotation_dataset, mock_dataset, mock_date_annotation_dataset
+from fireant.widgets.base import TransformContext
+from fireant.tests.dataset.mocks import (
+    dimx2_date_str_df,
+    mock_category_annotation_dataset,
+    mock_dataset,
+    mock_date_annotation_dataset,
+)
 
 
 # noinspection SqlDialectInspection,SqlNoDataSourceInspection
@@ -216,6 +226,22 @@ class QueryBuilderFetchDataTests(TestCase):
             None,
         )
 
+    def test_widgets_accepting_a_transform_context_share_it(self, mock_fetch_data: Mock, mock_paginate: Mock, *args):
+        widgets = [f.Pandas(mock_dataset.fields.votes), f.ReactTable(mock_dataset.fields.votes)]
+
+        with (
+            patch.object(f.Pandas, "transform", autospec=True) as mock_pandas_transform,
+            patch.object(f.ReactTable, "transform", autospec=True) as mock_reacttable_transform,
+        ):
+            mock_dataset.query.dimension(mock_dataset.fields.timestamp).widget(*widgets).fetch()
+
+        contexts = [
+            mock_transform.call_args.kwargs["transform_context"]
+            for mock_transform in (mock_pandas_transform, mock_reacttable_transform)
+        ]
+        self.assertIsInstance(contexts[0], TransformContext)
+        self.assertIs(contexts[0], contexts[1])
+
     def test_returns_results_from_widget_transform(self, *args):
         mock_widget = f.Widget(mock_dataset.fields.votes)
         mock_widget.transform = Mock()
@@ -316,9 +342,11 @@ class QueryBuilderAnnotationTests(TestCase):
     def get_fetch_call_args(self, mock_fetch_data):
         self.assertEqual(mock_fetch_data.call_count, 2)
 
-        fetch_annotation_data, fetch_data = mock_fetch_data.mock_calls[:2]
-        _, fetch_annotation_args, _ = fetch_annotation_data
-        _, fetch_data_args, _ = fetch_data
+        # The annotation is fetched concurrently with the data, so the calls are told apart by their arguments. Only
+        # the data is fetched with share dimensions and reference groups.
+        fetch_annotation_args, fetch_data_args = sorted(
+            (args for _, args, _ in mock_fetch_data.mock_calls[:2]), key=len
+        )
 
         return fetch_annotation_args, fetch_data_args
 
@@ -599,3 +627,140 @@ class QueryBuilderAnnotationTests(TestCase):
             ),
             fetch_data_args,
         )
+
+
+@patch("fireant.queries.builder.dataset_query_builder.fetch_data", return_value=(100, MagicMock()))
+class QueryBuilderAnnotationFetchTests(TestCase):
+    def setUp(self):
+        self.dataset = copy.deepcopy(mock_date_annotation_dataset)
+        self.widget = f.Widget(self.dataset.fields.votes)
+        self.widget.transform = Mock()
+
+    def _fetch(self, *filters):
+        self.dataset.query.widget(self.widget).dimension(self.dataset.fields.timestamp).filter(*filters).fetch()
+
+    def test_annotation_is_fetched_concurrently_with_data(self, mock_fetch_data: Mock):
+        data_fetch_started = threading.Event()
+
+        def fetch_data(database, queries, dimensions, *args):
+            if args:
+                data_fetch_started.set()
+                return 100, MagicMock()
+
+            # The annotation fetch can only finish if the data is fetched while it is still running
+            self.assertTrue(data_fetch_started.wait(timeout=5))
+            return 100, MagicMock()
+
+        mock_fetch_data.side_effect = fetch_data
+
+        self._fetch()
+
+        self.assertEqual(2, mock_fetch_data.call_count)
+
+    def test_annotation_is_cached_per_alignment_filter_range(self, mock_fetch_data: Mock):
+        self.dataset.annotation.cache = ResultCache(ttl=60)
+        in_2019 = self.dataset.fields.timestamp.between(datetime(2019, 1, 1), datetime(2019, 12, 31))
+        in_2020 = self.dataset.fields.timestamp.between(datetime(2020, 1, 1), datetime(2020, 12, 31))
+
+        self._fetch(in_2019)
+        self._fetch(in_2019)
+        self._fetch(in_2020)
+
+        # Only the data is fetched with share dimensions and reference groups
+        annotation_calls = [args for _, args, _ in mock_fetch_data.mock_calls if len(args) == 3]
+        self.assertEqual(5, mock_fetch_data.call_count)
+        self.assertEqual(2, len(annotation_calls))
+        self.assertIn("2019-01-01", str(annotation_calls[0][1][0]))
+        self.assertIn("2020-01-01", str(annotation_calls[1][1][0]))
+
+    def test_annotation_is_fetched_every_time_without_cache(self, mock_fetch_data: Mock):
+        self._fetch()
+        self._fetch()
+
+        self.assertEqual(4, mock_fetch_data.call_count)
+
+
+@patch("fireant.queries.builder.dataset_query_builder.fetch_data")
+class QueryBuilderConcurrentTransformTests(TestCase):
+    dimensions = (mock_dataset.fields.timestamp, mock_dataset.fields.political_party)
+    widgets = (
+        f.Pandas(mock_dataset.fields.votes, pivot=[mock_dataset.fields.political_party]),
+        f.ReactTable(mock_dataset.fields.votes, mock_dataset.fields.wins),
+        f.HighCharts().axis(f.HighCharts.LineSeries(mock_dataset.fields.votes)),
+        f.CSV(mock_dataset.fields.wins),
+    )
+
+    def fetch(self, mock_fetch_data, executor=None):
+        mock_fetch_data.return_value = 100, dimx2_date_str_df.copy()
+        return mock_dataset.query.dimension(*self.dimensions).widget(*self.widgets).fetch(executor=executor)
+
+    def assert_widget_results_equal(self, expected, results):
+        self.assertEqual(len(expected), len(results))
+        for expected_result, result in zip(expected, results):
+            if isinstance(expected_result, pd.DataFrame):
+                pd.testing.assert_frame_equal(expected_result, result)
+            else:
+                self.assertEqual(expected_result, result)
+
+    def test_transform_widgets_with_thread_pool(self, mock_fetch_data: Mock):
+        expected = self.fetch(mock_fetch_data)
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = self.fetch(mock_fetch_data, executor=executor)
+
+        self.assert_widget_results_equal(expected, results)
+
+    def test_transform_widgets_with_process_pool(self, mock_fetch_data: Mock):
+        expected = self.fetch(mock_fetch_data)
+
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            results = self.fetch(mock_fetch_data, executor=executor)
+
+        self.assert_widget_results_equal(expected, results)
+
+    def test_widgets_share_transform_context_with_thread_pool(self, mock_fetch_data: Mock):
+        with (
+            patch.object(f.ReactTable, "transform", autospec=True) as mock_transform,
+            ThreadPoolExecutor(max_workers=2) as executor,
+        ):
+            mock_fetch_data.return_value = 100, dimx2_date_str_df.copy()
+            mock_dataset.query.dimension(*self.dimensions).widget(
+                f.ReactTable(mock_dataset.fields.votes), f.ReactTable(mock_dataset.fields.wins)
+            ).fetch(executor=executor)
+
+        first_context, second_context = [call.kwargs["transform_context"] for call in mock_transform.call_args_list]
+        self.assertIs(first_context, second_context)
+
+
+@patch("fireant.queries.builder.dataset_query_builder.fetch_data", return_value=(100, MagicMock()))
+class QueryBuilderProfileTests(TestCase):
+    def test_profile_covers_widget_transforms(self, mock_fetch_data: Mock):
+        def transform_votes(*args):
+            return "votes"
+
+        sink = Mock()
+        mock_widget = f.Widget(mock_dataset.fields.votes)
+        mock_widget.transform = transform_votes
+
+        result = mock_dataset.query.widget(mock_widget).profile(Profiler(sink)).fetch()
+
+        self.assertEqual(["votes"], result)
+        (profile,) = sink.call_args[0]
+        self.assertEqual(("fetch", dict(table=str(mock_dataset.table))), (profile.name, profile.tags))
+        self.assertIn("transform_votes", [function for _, _, function in profile.stats.stats])
+
+    def test_profiler_is_shared_by_copies_of_the_query(self, mock_fetch_data: Mock):
+        profiler = Profiler(Mock())
+
+        query = mock_dataset.query.profile(profiler).widget(f.Widget(mock_dataset.fields.votes))
+
+        self.assertIs(profiler, query._profiler)
+
+    def test_requests_are_not_profiled_by_default(self, mock_fetch_data: Mock):
+        mock_widget = f.Widget(mock_dataset.fields.votes)
+        mock_widget.transform = Mock()
+
+        with patch("fireant.middleware.profiling.cProfile.Profile") as mock_profile:
+            mock_dataset.query.widget(mock_widget).fetch()
+
+        mock_profile.assert_not_called()
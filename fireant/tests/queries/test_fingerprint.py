@@ -0,0 +1,117 @@
+import copy
+import pickle
+from datetime import date
+from unittest import TestCase
+
+from pypika import Query, Table, functions as fn
+
+import fireant as f
+from fireant.queries.fingerprint import RenderedQuery, fingerprint_query, get_query_fingerprint
+from fireant.tests.dataset.mocks import mock_dataset
+
+timestamp_daily = f.day(mock_dataset.fields.timestamp)
+
+
+def _build_query(*filters, dimensions=(timestamp_daily,)):
+    query_builder = mock_dataset.query.widget(f.Widget(mock_dataset.fields.votes))
+    (query,) = query_builder.dimension(*dimensions).filter(*filters).sql
+    return query
+
+
+class FingerprintQueryTests(TestCase):
+    def test_literals_of_filters_are_normalised(self):
+        query = _build_query(
+            mock_dataset.fields.timestamp.between(date(2020, 1, 1), date(2020, 2, 1)),
+            mock_dataset.fields.political_party.isin(["d", "r"]),
+            mock_dataset.fields.votes > 10,
+        )
+
+        _, normalized_sql = fingerprint_query(query)
+
+        self.assertEqual(
+            "SELECT "
+            "TRUNC(\"timestamp\",'DD') \"$timestamp\","
+            'SUM("votes") "$votes" '
+            'FROM "politics"."politician" '
+            'WHERE "timestamp" BETWEEN ? AND ? '
+            'AND "political_party" IN (?) '
+            'GROUP BY "$timestamp" '
+            'HAVING SUM("votes")>? '
+            'ORDER BY "$timestamp" '
+            "LIMIT 200000",
+            normalized_sql,
+        )
+
+    def test_literals_of_criteria_of_subqueries_and_joins_are_normalised(self):
+        table = Table("politician")
+        subquery = Query.from_(table).select(table.party).where(table.votes > 10)
+        query = (
+            Query.from_(table)
+            .join(subquery)
+            .on((table.party == subquery.party) & (subquery.party != "i"))
+            .select(table.party, fn.Coalesce(table.state, "n/a"))
+        )
+
+        _, normalized_sql = fingerprint_query(query)
+
+        self.assertEqual(
+            'SELECT "politician"."party",COALESCE("politician"."state",\'n/a\') '
+            'FROM "politician" '
+            'JOIN (SELECT "party" FROM "politician" WHERE "votes">?) "sq0" '
+            'ON "politician"."party"="sq0"."party" AND "sq0"."party"<>?',
+            normalized_sql,
+        )
+
+    def test_query_is_not_modified(self):
+        query = _build_query(mock_dataset.fields.political_party.isin(["d", "r"]))
+        sql = str(query)
+
+        fingerprint_query(query)
+
+        self.assertEqual(sql, str(query))
+
+    def test_queries_filtering_on_different_values_have_the_same_fingerprint(self):
+        fingerprint, _ = fingerprint_query(
+            _build_query(
+                mock_dataset.fields.timestamp.between(date(2020, 1, 1), date(2020, 2, 1)),
+                mock_dataset.fields.political_party.isin(["d", "r"]),
+            )
+        )
+        other_fingerprint, _ = fingerprint_query(
+            _build_query(
+                mock_dataset.fields.timestamp.between(date(2019, 1, 1), date(2019, 3, 1)),
+                mock_dataset.fields.political_party.isin(["i"]),
+            )
+        )
+
+        self.assertEqual(fingerprint, other_fingerprint)
+
+    def test_queries_with_different_dimensions_have_different_fingerprints(self):
+        fingerprint, _ = fingerprint_query(_build_query(dimensions=[timestamp_daily]))
+        other_fingerprint, _ = fingerprint_query(_build_query(dimensions=[f.month(mock_dataset.fields.timestamp)]))
+
+        self.assertNotEqual(fingerprint, other_fingerprint)
+
+
+class RenderedQueryTests(TestCase):
+    def test_rendered_query_is_the_sql_of_the_query(self):
+        query = _build_query(mock_dataset.fields.political_party.isin(["d"]))
+
+        sql = RenderedQuery(query)
+
+        self.assertEqual(str(query), sql)
+        self.assertEqual(fingerprint_query(query), get_query_fingerprint(sql))
+        self.assertEqual("politics.politician", sql.table)
+
+    def test_plain_sql_is_fingerprinted_as_is(self):
+        fingerprint, normalized_sql = get_query_fingerprint("SELECT 1")
+
+        self.assertEqual("SELECT 1", normalized_sql)
+        self.assertNotEqual(fingerprint, get_query_fingerprint("SELECT 2")[0])
+
+    def test_rendered_query_is_copied_as_plain_sql(self):
+        sql = RenderedQuery(_build_query())
+
+        for copied_sql in (copy.deepcopy(sql), pickle.loads(pickle.dumps(sql))):
+            self.assertIs(str, type(copied_sql))
+            self.assertEqual(sql, copied_sql)
@@ -1,10 +1,19 @@
+from datetime import datetime
 from unittest import TestCase
 from unittest.mock import patch
 
 import pandas as pd
+from pypika import Table
 
-from fireant import DataSet, DataType, Field
-from fireant.tests.dataset.mocks import mock_dataset, politicians_table, test_database
+from fireant import DataSet, DataType, Field, ResultCache, fetch_latest
+from fireant.queries.execution import PANDAS_TO_DATETIME_FORMAT
+from fireant.tests.dataset.mocks import (
+    MockMySQLDatabase,
+    mock_dataset,
+    politicians_table,
+    test_database,
+    voters_table,
+)
 
 
 # noinspection SqlDialectInspection,SqlNoDataSourceInspection
@@ -59,3 +68,128 @@ class DimensionsLatestQueryBuilderTests(TestCase):
 
         self.assertEqual(dict(max_rows_returned=100), result['metadata'])
         self.assertTrue(result['data'].equals(pd.Series(['a'], index=['political_party'])))
+
+
+partitions_table = Table("politician_partitions", schema="politics")
+
+
+def _make_dataset(database=test_database, **kwargs):
+    return DataSet(
+        table=politicians_table,
+        database=database,
+        fields=[
+            Field("timestamp", definition=politicians_table.timestamp, data_type=DataType.date),
+            Field("join_timestamp", definition=voters_table.timestamp, data_type=DataType.date),
+        ],
+        joins=mock_dataset.joins,
+        **kwargs,
+    )
+
+
+# noinspection SqlDialectInspection,SqlNoDataSourceInspection
+class DimensionsLatestTableTests(TestCase):
+    def test_latest_value_is_read_from_latest_table(self):
+        dataset = _make_dataset(latest_table=partitions_table)
+
+        query = dataset.latest(dataset.fields.timestamp).sql[0]
+
+        self.assertEqual('SELECT MAX("timestamp") "$timestamp" FROM "politics"."politician_partitions"', str(query))
+
+    def test_latest_table_is_not_used_for_dimensions_requiring_a_join(self):
+        dataset = _make_dataset(latest_table=partitions_table)
+
+        query = dataset.latest(dataset.fields.timestamp, dataset.fields.join_timestamp).sql[0]
+
+        self.assertEqual(
+            'SELECT '
+            'MAX("politician"."timestamp") "$timestamp",'
+            'MAX("voter"."timestamp") "$join_timestamp" '
+            'FROM "politics"."politician" '
+            'JOIN "politics"."voter" ON "politician"."id"="voter"."politician_id"',
+            str(query),
+        )
+
+
+@patch('fireant.queries.builder.dimension_latest_query_builder.fetch_data')
+class DimensionsLatestCacheTests(TestCase):
+    @staticmethod
+    def _latest_df():
+        return pd.DataFrame({'$timestamp': [datetime(2020, 1, 1)]})
+
+    def test_latest_value_is_fetched_once(self, mock_fetch_data):
+        mock_fetch_data.side_effect = lambda *args: (1, self._latest_df())
+        dataset = _make_dataset(latest_cache=ResultCache(ttl=60))
+
+        latest_1 = dataset.latest(dataset.fields.timestamp).fetch()
+        latest_2 = dataset.latest(dataset.fields.timestamp).fetch()
+
+        mock_fetch_data.assert_called_once()
+        self.assertEqual(datetime(2020, 1, 1), latest_1['timestamp'])
+        self.assertTrue(latest_1.equals(latest_2))
+        self.assertIsNot(latest_1, latest_2)
+
+    def test_latest_value_is_fetched_every_time_without_cache(self, mock_fetch_data):
+        mock_fetch_data.side_effect = lambda *args: (1, self._latest_df())
+        dataset = _make_dataset()
+
+        dataset.latest(dataset.fields.timestamp).fetch()
+        dataset.latest(dataset.fields.timestamp).fetch()
+
+        self.assertEqual(2, mock_fetch_data.call_count)
+
+
+# noinspection SqlDialectInspection,SqlNoDataSourceInspection
+class FetchLatestTests(TestCase):
+    def test_latest_values_of_datasets_on_the_same_database_are_fetched_in_one_call(self):
+        dataset_1 = _make_dataset()
+        dataset_2 = _make_dataset(latest_table=partitions_table)
+        result_sets = [
+            pd.DataFrame({'$timestamp': [datetime(2020, 1, 1)]}),
+            pd.DataFrame({'$timestamp': [datetime(2020, 1, 2)]}),
+        ]
+
+        with patch.object(type(test_database), 'fetch_dataframes', return_value=result_sets) as mock_fetch:
+            latest_1, latest_2 = fetch_latest(
+                [dataset_1.latest(dataset_1.fields.timestamp), dataset_2.latest(dataset_2.fields.timestamp)]
+            )
+
+        mock_fetch.assert_called_once_with(
+            'SELECT MAX("timestamp") "$timestamp" FROM "politics"."politician"',
+            'SELECT MAX("timestamp") "$timestamp" FROM "politics"."politician_partitions"',
+            parse_dates={'$timestamp': PANDAS_TO_DATETIME_FORMAT},
+        )
+        self.assertEqual(datetime(2020, 1, 1), latest_1['timestamp'])
+        self.assertEqual(datetime(2020, 1, 2), latest_2['timestamp'])
+
+    def test_latest_values_are_fetched_once_per_database(self):
+        dataset_1 = _make_dataset()
+        dataset_2 = _make_dataset(database=MockMySQLDatabase())
+        latest_df = pd.DataFrame({'$timestamp': [datetime(2020, 1, 1)]})
+
+        builders = [dataset_1.latest(dataset_1.fields.timestamp), dataset_2.latest(dataset_2.fields.timestamp)]
+
+        with patch.object(type(test_database), 'fetch_dataframes', return_value=[latest_df]) as mock_vertica:
+            with patch.object(MockMySQLDatabase, 'fetch_dataframes', return_value=[latest_df]) as mock_mysql:
+                fetch_latest(builders)
+
+        mock_vertica.assert_called_once()
+        mock_mysql.assert_called_once()
+
+    def test_cached_latest_values_are_not_fetched_again(self):
+        dataset = _make_dataset(latest_cache=ResultCache(ttl=60))
+        result_sets = [
+            pd.DataFrame({'$timestamp': [datetime(2020, 1, 1)]}),
+            pd.DataFrame({'$join_timestamp': [datetime(2020, 1, 2)]}),
+        ]
+
+        with patch.object(type(test_database), 'fetch_dataframes', return_value=result_sets) as mock_fetch:
+            fetch_latest([dataset.latest(dataset.fields.timestamp), dataset.latest(dataset.fields.join_timestamp)])
+
+        with patch.object(type(test_database), 'fetch_dataframes') as mock_fetch:
+            latest, join_latest = fetch_latest(
+                [dataset.latest(dataset.fields.timestamp), dataset.latest(dataset.fields.join_timestamp)]
+            )
+
+        mock_fetch.assert_not_called()
+        self.assertEqual(datetime(2020, 1, 1), latest['timestamp'])
+        self.assertEqual(datetime(2020, 1, 2), join_latest['join_timestamp'])
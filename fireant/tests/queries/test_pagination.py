@@ -265,6 +265,24 @@ class GroupPaginationTests(TestCase):
         expected = dimx2_date_bool_df.loc[(slice(None), False), :]
         assert_frame_equal(expected, paginated)
 
+    def test_group_paginate_with_bool_dims__paginate_single_value_with_order(self):
+        paginated = paginate(dimx2_date_bool_df, [mock_chart_widget], [(Mock(alias="votes"), Order.desc)], limit=1)
+        expected = dimx2_date_bool_df.loc[(slice(None), True), :]
+        assert_frame_equal(expected, paginated)
+
+    def test_group_paginate_keeps_rows_with_null_dimension_values_at_the_end_of_each_group(self):
+        idx = pd.MultiIndex.from_tuples(
+            [(0, None), (0, 'a'), (0, 'b'), (1, 'b'), (1, None), (1, 'c'), (None, 'a')],
+            names=[TS, mock_dimension_definition.alias],
+        )
+        df = pd.DataFrame({mock_metric_definition.alias: [1, 2, 3, 4, 5, 6, 0]}, index=idx)
+
+        paginated = paginate(df, [mock_chart_widget], [(mock_metric_definition, Order.desc)], limit=2)
+
+        # Series "c" and "b" have the most votes. Rows with a null x-axis value are dropped.
+        expected = df.iloc[[2, 0, 3, 5, 4]]
+        assert_frame_equal(expected, paginated)
+
     def test_group_pagination_with_order_on_non_selected_datetime_metric(self):
         index_values = [['2016-10-03', '2016-10-04', '2016-10-05'], ['General', 'City']]
         # City values have the highest aggregated $updated_time timestamp (as paginate uses MAX for datetimes):
@@ -0,0 +1,96 @@
+from unittest import TestCase
+
+from pypika import Query, Table, functions as fn
+from pypika.terms import Field as PypikaField, ValueWrapper
+
+import fireant as f
+from fireant import DataType, Field
+from fireant.queries.rewrite import rewrite_term
+
+table = Table("test")
+
+
+class RewriteTermTests(TestCase):
+    def test_original_term_is_not_modified(self):
+        term = fn.Sum(table.a) / fn.Sum(table.b)
+
+        copy = rewrite_term(term, lambda node: table.c if node is term.right.args[0] else None)
+
+        self.assertEqual('SUM("a")/SUM("b")', str(term))
+        self.assertEqual('SUM("a")/SUM("c")', str(copy))
+
+    def test_every_node_is_copied_once(self):
+        shared = fn.Sum(table.a)
+        term = shared + shared
+        visited = []
+
+        copy = rewrite_term(term, lambda node: visited.append(node))
+
+        self.assertEqual(3, len(visited))
+        self.assertIsNot(term.left, copy.left)
+        self.assertIs(copy.left, copy.right)
+
+    def test_cost_is_linear_in_expression_depth(self):
+        term = table.a
+        for i in range(200):
+            term = term + i
+        visited = []
+
+        rewrite_term(term, lambda node: visited.append(node))
+
+        # An arithmetic expression and its left operand per level, besides the field at the bottom
+        self.assertEqual(201, len(visited))
+
+    def test_constants_and_tables_are_shared(self):
+        constant = ValueWrapper(1)
+        term = table.a + constant
+
+        copy = rewrite_term(term, lambda node: None)
+
+        self.assertIs(constant, copy.right)
+        self.assertIs(table, copy.left.table)
+
+    def test_replacements_are_not_rewritten(self):
+        replacement = fn.Sum(table.b)
+        term = table.a + 1
+
+        replacements = {id(term.left): replacement, id(replacement.args[0]): table.c}
+
+        copy = rewrite_term(term, lambda node: replacements.get(id(node)))
+
+        self.assertIs(replacement, copy.left)
+        self.assertEqual('SUM("b")+1', str(copy))
+
+    def test_fields_and_modifiers_are_copied_through(self):
+        field = Field("a", definition=table.a, data_type=DataType.number)
+        rollup = f.Rollup(field)
+
+        copy = rewrite_term(rollup, lambda node: table.b if node is field.definition else None)
+
+        self.assertIsNot(field, copy.dimension)
+        self.assertEqual('"a"', str(field.definition))
+        self.assertEqual('"b"', str(copy.dimension.definition))
+
+    def test_constants_are_replaced_when_asked_to(self):
+        term = table.a + 1
+
+        copy = rewrite_term(
+            term, lambda node: ValueWrapper(2) if isinstance(node, ValueWrapper) else None, constants=True
+        )
+
+        self.assertEqual('"a"+1', str(term))
+        self.assertEqual('"a"+2', str(copy))
+
+    def test_subqueries_are_shared_unless_asked_to_rewrite_them(self):
+        subquery = Query.from_(table).select(table.a).where(table.b == 1)
+        query = Query.from_(subquery).select(subquery.a)
+        replace = lambda node: table.c if isinstance(node, PypikaField) and node.name == "b" else None
+
+        shared = rewrite_term(query, replace)
+        rewritten = rewrite_term(query, replace, subqueries=True)
+
+        self.assertIs(subquery, shared._from[0])
+        self.assertIsNot(subquery, rewritten._from[0])
+        self.assertIs(table, rewritten._from[0]._from[0])
+        self.assertEqual('SELECT "sq0"."a" FROM (SELECT "a" FROM "test" WHERE "b"=1) "sq0"', str(query))
+        self.assertEqual('SELECT "sq0"."a" FROM (SELECT "a" FROM "test" WHERE "c"=1) "sq0"', str(rewritten))
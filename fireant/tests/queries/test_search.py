@@ -0,0 +1,46 @@
+from unittest import TestCase
+
+import pandas as pd
+
+from fireant.queries.search import ChoicesIndex, escape_like
+
+
+class EscapeLikeTests(TestCase):
+    def test_wildcards_and_escape_char_are_escaped(self):
+        self.assertEqual("a!%b!_c!!d", escape_like("a%b_c!d"))
+
+
+class ChoicesIndexTests(TestCase):
+    def setUp(self):
+        self.choices = pd.Series(
+            ["Berlin", "bern", "Bern", "Amsterdam", "Bergen", "Basel"],
+            index=["ber", "brn", "BRN", "ams", "bgn", "bsl"],
+        )
+        self.index = ChoicesIndex(self.choices)
+
+    def test_search_ignores_case(self):
+        self.assertEqual(["Amsterdam"], list(self.index.search("AM")))
+
+    def test_exact_matches_come_first(self):
+        result = self.index.search("berge")
+
+        self.assertEqual(["Bergen"], list(result))
+
+        result = ChoicesIndex(pd.Series(["Bernau", "Bern"])).search("bern")
+
+        self.assertEqual(["Bern", "Bernau"], list(result))
+
+    def test_index_of_choices_is_kept(self):
+        self.assertEqual(["brn", "BRN"], list(self.index.search("bern").index))
+
+    def test_prefix_matches_are_returned_in_the_order_of_the_choices(self):
+        self.assertEqual(["Berlin", "bern", "Bern", "Bergen"], list(self.index.search("ber")))
+
+    def test_search_with_limit(self):
+        self.assertEqual(["Berlin", "bern"], list(self.index.search("b", limit=2)))
+
+    def test_empty_prefix_matches_all_choices(self):
+        self.assertEqual(list(self.choices), list(self.index.search("")))
+
+    def test_no_matches(self):
+        self.assertEqual([], list(self.index.search("x")))
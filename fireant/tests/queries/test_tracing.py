@@ -0,0 +1,158 @@
+import copy
+from concurrent.futures import ThreadPoolExecutor
+from unittest import TestCase
+from unittest.mock import MagicMock, Mock, patch
+
+import pandas as pd
+
+import fireant as f
+from fireant import Rollup
+from fireant.queries.tracing import Trace, current_trace, run_in_context, trace_span
+from fireant.tests.dataset.mocks import mock_dataset
+
+timestamp_daily = f.day(mock_dataset.fields.timestamp)
+
+
+class TraceTests(TestCase):
+    def test_spans_are_not_recorded_without_an_active_trace(self):
+        with trace_span("compile") as span:
+            self.assertIsNone(span)
+
+        self.assertIsNone(current_trace())
+
+    def test_nested_spans_reference_their_parent_span(self):
+        trace = Trace()
+
+        with trace.activate():
+            with trace_span("fetch", queries=2):
+                with trace_span("execute", sql="SELECT 1"):
+                    pass
+
+        fetch, execute = trace.to_dict()
+        self.assertEqual(dict(id=0, parent_id=None, name="fetch", tags=dict(queries=2)), _without_times(fetch))
+        self.assertEqual(dict(id=1, parent_id=0, name="execute", tags=dict(sql="SELECT 1")), _without_times(execute))
+        self.assertGreaterEqual(fetch["duration"], execute["duration"])
+
+    def test_failing_spans_are_tagged_with_the_error(self):
+        trace = Trace()
+
+        with self.assertRaises(ValueError), trace.activate(), trace_span("execute"):
+            raise ValueError()
+
+        self.assertEqual(dict(error="ValueError"), trace.spans[0].tags)
+        self.assertIsNotNone(trace.spans[0].duration)
+
+    def test_spans_of_threads_are_recorded_when_running_in_context(self):
+        trace = Trace()
+
+        def execute(sql):
+            with trace_span("execute", sql=sql):
+                pass
+
+        with trace.activate(), trace_span("fetch"), ThreadPoolExecutor(max_workers=2) as executor:
+            list(executor.map(run_in_context(execute), ["SELECT 1", "SELECT 2"]))
+            executor.submit(execute, "SELECT 3").result()
+
+        self.assertEqual(
+            [("fetch", None), ("execute", 0), ("execute", 0)],
+            [(span.name, span.parent and span.parent.span_id) for span in trace.spans],
+        )
+
+
+def _without_times(span):
+    return {key: value for key, value in span.items() if key not in ("start_time", "duration")}
+
+
+class QueryBuilderTracingTests(TestCase):
+    def setUp(self):
+        self.dataset = copy.deepcopy(mock_dataset)
+        self.dataset.return_additional_metadata = True
+
+    def _fetch(self, query):
+        widget = f.Widget(self.dataset.fields.votes)
+        widget.transform = Mock(return_value="widget")
+        data_frame = pd.DataFrame(
+            {
+                "$timestamp": pd.to_datetime(["2020-01-01"]),
+                "$political_party": ["d"],
+                "$votes": [1],
+                "$votes_dod": [1],
+            }
+        )
+
+        with (
+            patch.object(type(self.dataset.database), "connect", MagicMock()),
+            patch("fireant.database.base.pd.read_sql", return_value=data_frame),
+        ):
+            return query.widget(widget).fetch()
+
+    def test_trace_is_not_returned_by_default(self):
+        result = self._fetch(self.dataset.query.dimension(timestamp_daily))
+
+        self.assertNotIn("trace", result["metadata"])
+
+    def test_phases_are_traced(self):
+        result = self._fetch(self.dataset.query.dimension(timestamp_daily).trace())
+
+        self.assertEqual(
+            [
+                ("compile", None),
+                ("fetch", None),
+                ("connect", "fetch"),
+                ("execute", "fetch"),
+                ("reduce_result_set", None),
+                ("operations", None),
+                ("paginate", None),
+                ("transform", None),
+                ("transform_widget", "transform"),
+            ],
+            _names_and_parents(result["metadata"]["trace"]),
+        )
+
+    def test_query_spans_are_tagged_with_totals_dimension_and_references(self):
+        query = (
+            self.dataset.query.dimension(timestamp_daily, Rollup(self.dataset.fields.political_party))
+            .reference(f.DayOverDay(self.dataset.fields.timestamp))
+            .trace()
+        )
+
+        result = self._fetch(query)
+
+        self.assertEqual(
+            [
+                (None, []),
+                (None, ["dod"]),
+                ("political_party", []),
+                ("political_party", ["dod"]),
+            ],
+            [
+                (span["tags"]["totals"], span["tags"]["references"])
+                for span in result["metadata"]["trace"]
+                if span["name"] == "execute"
+            ],
+        )
+
+    def test_hook_is_called_with_the_trace(self):
+        hook = Mock()
+
+        result = self._fetch(self.dataset.query.dimension(timestamp_daily).trace(hook))
+
+        hook.assert_called_once()
+        (trace,) = hook.call_args[0]
+        self.assertEqual(trace.to_dict(), result["metadata"]["trace"])
+
+    def test_hook_is_called_when_fetching_fails(self):
+        hook = Mock()
+        query = self.dataset.query.dimension(timestamp_daily).trace(hook)
+
+        with patch.object(type(self.dataset.database), "fetch_dataframes", side_effect=ValueError()):
+            with self.assertRaises(ValueError):
+                self._fetch(query)
+
+        (trace,) = hook.call_args[0]
+        self.assertEqual(dict(database=str(self.dataset.database), queries=1, error="ValueError"), trace.spans[1].tags)
+
+
+def _names_and_parents(spans):
+    names = {span["id"]: span["name"] for span in spans}
+    return [(span["name"], names.get(span["parent_id"])) for span in spans]
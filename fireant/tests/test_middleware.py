@@ -1,4 +1,12 @@
+import copy
+import json
+import os
+import pickle
 import signal
+import tempfile
+import threading
+import tracemalloc
+from datetime import date
 from unittest import TestCase
 from unittest.mock import (
     MagicMock,
@@ -6,9 +14,19 @@ from unittest.mock import (
     patch,
 )
 
-from fireant.exceptions import QueryCancelled
+import pandas as pd
+
+import fireant as f
+from fireant import Database
+from fireant.database import QueryCost
+from fireant.exceptions import QueryCancelled, QueryTooExpensive
 from fireant.middleware.concurrency import ThreadPoolConcurrencyMiddleware
+from fireant.middleware.cost_guard import QueryCostGuard
 from fireant.middleware.decorators import CancelableConnection, connection_middleware
+from fireant.middleware.profiling import DirectoryProfileSink, LoggingProfileSink, Profiler
+from fireant.middleware.statistics import QueryStatistics
+from fireant.queries.fingerprint import RenderedQuery
+from fireant.tests.dataset.mocks import mock_dataset
 
 
 class TestThreadPoolConcurrencyMiddleware(TestCase):
@@ -93,3 +111,316 @@ class TestConnectionMiddleware(TestCase):
             pass
 
         mock_time.sleep.assert_called_once_with(5)
+
+
+def _allocate_and_sum(n):
+    return sum(list(range(n)))
+
+
+class TestProfiler(TestCase):
+    def test_profile_is_passed_to_the_sink(self):
+        sink = MagicMock()
+
+        with Profiler(sink).profile("fetch", table="test"):
+            _allocate_and_sum(100000)
+
+        (result,) = sink.call_args[0]
+        self.assertEqual("fetch", result.name)
+        self.assertEqual(dict(table="test"), result.tags)
+        self.assertGreater(result.memory_peak, 100000 * 8)
+        self.assertIn("_allocate_and_sum", result.summary())
+
+    def test_memory_is_not_traced_after_profiling(self):
+        with Profiler(MagicMock()).profile("fetch"):
+            pass
+
+        self.assertFalse(tracemalloc.is_tracing())
+
+    def test_cpu_and_memory_profiles_can_be_disabled(self):
+        sink = MagicMock()
+
+        with Profiler(sink, cpu=False, memory=False).profile("fetch"):
+            pass
+
+        (result,) = sink.call_args[0]
+        self.assertIsNone(result.stats)
+        self.assertIsNone(result.memory_peak)
+
+    @patch("fireant.middleware.profiling.random.random", side_effect=[0.05, 0.15])
+    def test_only_sampled_requests_are_profiled(self, _):
+        sink = MagicMock()
+        profiler = Profiler(sink, sample_rate=0.1)
+
+        for _ in range(2):
+            with profiler.profile("fetch"):
+                pass
+
+        sink.assert_called_once()
+
+    def test_nested_requests_are_not_profiled(self):
+        sink = MagicMock()
+        profiler = Profiler(sink)
+
+        with profiler.profile("fetch"):
+            with profiler.profile("execute"):
+                pass
+
+        (result,) = sink.call_args[0]
+        self.assertEqual("fetch", result.name)
+        sink.assert_called_once()
+
+    def test_failing_sink_does_not_fail_the_request(self):
+        with patch("fireant.middleware.profiling.profile_logger") as mock_logger:
+            with Profiler(MagicMock(side_effect=ValueError())).profile("fetch"):
+                pass
+
+        mock_logger.exception.assert_called_once()
+
+    def test_profiler_as_middleware(self):
+        sink = MagicMock()
+        mock_database = MagicMock()
+        mock_database.__str__.return_value = "database"
+        mock_database.fetch_dataframes.return_value = ["result"]
+
+        results = Profiler(sink)(mock_database.fetch_dataframes)(mock_database, "query_a", "query_b")
+
+        self.assertEqual(["result"], results)
+        (result,) = sink.call_args[0]
+        self.assertEqual(("execute", dict(database="database", queries=2)), (result.name, result.tags))
+
+    def test_profiler_is_shared_by_copies_of_the_database(self):
+        profiler = Profiler(MagicMock())
+        dataset = copy.deepcopy(mock_dataset)
+        dataset.database.middlewares = [profiler] + dataset.database.middlewares
+
+        query = dataset.query.widget(f.Widget(dataset.fields.votes))
+
+        self.assertIs(profiler, query.dataset.database.middlewares[0])
+
+
+class TestProfileSinks(TestCase):
+    def _profile(self, sink):
+        with Profiler(sink).profile("fetch", table="test"):
+            _allocate_and_sum(1000)
+
+    def test_logging_sink_logs_summary(self):
+        mock_logger = MagicMock()
+
+        self._profile(LoggingProfileSink(mock_logger, limit=5))
+
+        (message,) = mock_logger.info.call_args[0]
+        self.assertTrue(message.startswith("fetch {'table': 'test'} ["))
+        self.assertIn("_allocate_and_sum", message)
+
+    def test_directory_sink_writes_stats_and_metadata(self):
+        with tempfile.TemporaryDirectory() as directory:
+            self._profile(DirectoryProfileSink(os.path.join(directory, "profiles")))
+
+            files = sorted(os.listdir(os.path.join(directory, "profiles")))
+            self.assertEqual([".json", ".prof"], [os.path.splitext(file)[1] for file in files])
+
+            with open(os.path.join(directory, "profiles", files[0])) as file:
+                metadata = json.load(file)
+
+        self.assertEqual("fetch", metadata["name"])
+        self.assertEqual(dict(table="test"), metadata["tags"])
+
+
+def _build_rendered_query(start_date):
+    (query,) = (
+        mock_dataset.query.filter(mock_dataset.fields.timestamp.between(start_date, date(2021, 1, 1)))
+        .widget(f.Widget(mock_dataset.fields.votes))
+        .sql
+    )
+    return RenderedQuery(query)
+
+
+class TestQueryStatistics(TestCase):
+    def setUp(self):
+        self.statistics = QueryStatistics()
+        self.mock_database = MagicMock()
+        self.data_frame = pd.DataFrame({"$votes": [1, 2]})
+        self.mock_database.fetch_dataframes.side_effect = lambda database, query: [self.data_frame]
+
+    def test_queries_are_aggregated_by_fingerprint_and_dataset(self):
+        fetch_dataframes = self.statistics(self.mock_database.fetch_dataframes)
+
+        fetch_dataframes(self.mock_database, _build_rendered_query(date(2019, 1, 1)))
+        fetch_dataframes(self.mock_database, _build_rendered_query(date(2020, 1, 1)), "SELECT 1")
+
+        snapshot = self.statistics.snapshot()
+        fingerprints = {statistic["sql"]: statistic for statistic in snapshot["fingerprints"]}
+        self.assertEqual(2, len(fingerprints))
+        statistic = fingerprints[_build_rendered_query(date(2019, 1, 1)).normalized_sql]
+        self.assertEqual(
+            dict(count=2, errors=0, rows=4, bytes=2 * self.data_frame.memory_usage(index=True).sum()),
+            {key: statistic[key] for key in ("count", "errors", "rows", "bytes")},
+        )
+        self.assertEqual(1, fingerprints["SELECT 1"]["count"])
+        (dataset,) = snapshot["datasets"]
+        self.assertEqual(("politics.politician", 2), (dataset["table"], dataset["count"]))
+        self.assertLessEqual(dataset["p50"], dataset["p95"])
+        self.assertLessEqual(dataset["p95"], dataset["p99"])
+
+    def test_failing_queries_are_counted_as_errors(self):
+        self.mock_database.fetch_dataframes.side_effect = ValueError()
+
+        with self.assertRaises(ValueError):
+            self.statistics(self.mock_database.fetch_dataframes)(self.mock_database, "SELECT 1")
+
+        (statistic,) = self.statistics.snapshot()["fingerprints"]
+        self.assertEqual((0, 1, None), (statistic["count"], statistic["errors"], statistic["p50"]))
+
+    def test_statistics_over_max_keys_are_aggregated_as_other(self):
+        statistics = QueryStatistics(max_keys=2)
+
+        for i in range(4):
+            statistics.record("SELECT {}".format(i), 1.0, rows=1)
+        statistics.record("SELECT 0", 1.0, rows=1)
+
+        fingerprints = {statistic["sql"]: statistic["count"] for statistic in statistics.snapshot()["fingerprints"]}
+        self.assertEqual({"SELECT 0": 2, "SELECT 1": 1, None: 2}, fingerprints)
+        other = [statistic for statistic in statistics.snapshot()["fingerprints"] if statistic["sql"] is None]
+        self.assertEqual("other", other[0]["fingerprint"])
+
+    def test_snapshot_resets_statistics(self):
+        self.statistics.record("SELECT 1", 1.0, rows=1)
+
+        self.assertEqual(1, len(self.statistics.snapshot(reset=True)["fingerprints"]))
+        self.assertEqual(dict(fingerprints=[], datasets=[]), self.statistics.snapshot())
+
+    def test_statistics_are_shared_by_copies_of_the_database(self):
+        dataset = copy.deepcopy(mock_dataset)
+        dataset.database.middlewares = [self.statistics] + dataset.database.middlewares
+
+        query = dataset.query.widget(f.Widget(dataset.fields.votes))
+
+        self.assertIs(self.statistics, query.dataset.database.middlewares[0])
+
+    def test_statistics_are_not_pickled(self):
+        self.statistics.record("SELECT 1", 1.0)
+
+        statistics = pickle.loads(pickle.dumps(self.statistics))
+
+        self.assertEqual(1000, statistics.max_samples)
+        self.assertEqual(dict(fingerprints=[], datasets=[]), statistics.snapshot())
+
+
+class TestQueryCostGuard(TestCase):
+    def setUp(self):
+        self.mock_database = MagicMock()
+        self.mock_database.__str__.return_value = "database"
+        self.mock_database.estimate_query_cost.return_value = QueryCost(rows=1000, cost=50.0)
+        self.mock_database.fetch_dataframes.side_effect = lambda database, query: ["result of " + query]
+
+    def _fetch(self, guard, *queries):
+        return guard(self.mock_database.fetch_dataframes)(self.mock_database, *queries)
+
+    def test_cheap_queries_are_executed(self):
+        results = self._fetch(QueryCostGuard(max_rows=1000, max_cost=50), "query_a", "query_b")
+
+        self.assertEqual(["result of query_a", "result of query_b"], results)
+
+    def test_expensive_queries_are_rejected(self):
+        for guard in (QueryCostGuard(max_rows=999), QueryCostGuard(max_cost=49)):
+            with self.subTest(max_rows=guard.max_rows, max_cost=guard.max_cost):
+                with self.assertRaises(QueryTooExpensive):
+                    self._fetch(guard, "query_a")
+
+        self.mock_database.fetch_dataframes.assert_not_called()
+
+    def test_expensive_queries_are_downgraded(self):
+        guard = QueryCostGuard(max_rows=10, action=QueryCostGuard.DOWNGRADE, downgrade=lambda sql: sql + " downgraded")
+
+        results = self._fetch(guard, "query_a")
+
+        self.assertEqual(["result of query_a downgraded"], results)
+
+    def test_expensive_queries_wait_for_a_slot_when_queued(self):
+        guard = QueryCostGuard(max_rows=10, action=QueryCostGuard.QUEUE, queue_timeout=0.01)
+
+        self.assertEqual(["result of query_a"], self._fetch(guard, "query_a"))
+
+        guard._queue.acquire()
+        with self.assertRaises(QueryTooExpensive):
+            self._fetch(guard, "query_b")
+
+    def test_queued_queries_wait_indefinitely_without_timeout(self):
+        guard = QueryCostGuard(max_rows=10, action=QueryCostGuard.QUEUE)
+        guard._queue.acquire()
+        timer = threading.Timer(0.05, guard._queue.release)
+        timer.start()
+
+        self.assertEqual(["result of query_a"], self._fetch(guard, "query_a"))
+        timer.join()
+
+    def test_identical_queries_are_explained_once(self):
+        guard = QueryCostGuard(max_rows=1000)
+
+        self._fetch(guard, _build_rendered_query(date(2019, 1, 1)), _build_rendered_query(date(2019, 1, 1)))
+
+        self.mock_database.estimate_query_cost.assert_called_once()
+        self.assertEqual(1, len(guard.plan_cache))
+
+    def test_queries_filtering_on_other_values_are_explained_again(self):
+        guard = QueryCostGuard(max_rows=1000)
+
+        self._fetch(guard, _build_rendered_query(date(2019, 1, 1)), _build_rendered_query(date(2020, 1, 1)))
+
+        self.assertEqual(2, self.mock_database.estimate_query_cost.call_count)
+
+    def test_queries_are_explained_per_database(self):
+        guard = QueryCostGuard(max_rows=1000)
+        fetch_dataframes = guard(self.mock_database.fetch_dataframes)
+
+        for name in ("a", "b"):
+            database = Database(host="host", database=name)
+            database.estimate_query_cost = MagicMock(return_value=QueryCost(rows=1, cost=None))
+            fetch_dataframes(database, "query_a")
+
+            database.estimate_query_cost.assert_called_once_with("query_a", connection=None)
+
+    def test_queries_are_explained_over_the_given_connection(self):
+        connection = MagicMock()
+        self.mock_database.fetch_queries.side_effect = lambda database, query, connection: [query]
+
+        QueryCostGuard(max_rows=1000)(self.mock_database.fetch_queries)(
+            self.mock_database, "query_a", connection=connection
+        )
+
+        self.mock_database.estimate_query_cost.assert_called_once_with("query_a", connection=connection)
+
+    def test_queries_are_executed_when_their_cost_cannot_be_estimated(self):
+        self.mock_database.estimate_query_cost.side_effect = ValueError()
+        guard = QueryCostGuard(max_rows=10)
+
+        self._fetch(guard, "query_a", "query_a")
+
+        self.assertEqual(2, self.mock_database.fetch_dataframes.call_count)
+        self.mock_database.estimate_query_cost.assert_called_once()
+
+    def test_explain_queries_pass_through_the_guard(self):
+        database = Database(middlewares=[QueryCostGuard(max_rows=10)])
+        database.make_explain_query = lambda query: "EXPLAIN " + query
+        database.parse_query_plan = lambda rows: QueryCost(rows=1, cost=None)
+        mock_cursor = MagicMock()
+        mock_cursor.fetchall.return_value = [("plan",)]
+        database.connect = MagicMock()
+        database.connect.return_value.__enter__.return_value.cursor.return_value = mock_cursor
+
+        database.fetch("SELECT 1")
+
+        self.assertEqual(
+            [call("EXPLAIN SELECT 1", ()), call("SELECT 1", ())],
+            mock_cursor.execute.call_args_list,
+        )
+
+    def test_downgrading_requires_a_downgrade_function(self):
+        with self.assertRaises(ValueError):
+            QueryCostGuard(max_rows=10, action=QueryCostGuard.DOWNGRADE)
+
+    def test_guard_is_shared_by_copies_and_can_be_pickled(self):
+        guard = QueryCostGuard(max_rows=10, max_concurrent_expensive_queries=2)
+
+        self.assertIs(guard, copy.deepcopy(guard))
+        self.assertEqual(2, pickle.loads(pickle.dumps(guard)).max_concurrent_expensive_queries)
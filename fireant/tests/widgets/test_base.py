@@ -1,12 +1,13 @@
 import pandas as pd
 
 from unittest import TestCase
+from unittest.mock import Mock
 
 from fireant.tests.dataset.mocks import (
     dimx2_date_str_df,
     mock_dataset,
 )
-from fireant.widgets.base import Widget
+from fireant.widgets.base import TransformContext, Widget
 from fireant.utils import alias_selector
 
 
@@ -41,3 +42,29 @@ class ReactTableTransformerTests(TestCase):
             widget.hide_aliases(transform_dimensions),
             {'$political_party', '$votes', '$field_x'},
         )
+
+
+class TransformContextTests(TestCase):
+    def test_memoize_calls_func_once_per_source_and_key(self):
+        context = TransformContext()
+        source = pd.DataFrame()
+        func = Mock()
+
+        first = context.memoize(source, ("key",), func)
+        second = context.memoize(source, ("key",), func)
+
+        func.assert_called_once_with()
+        self.assertIs(first, second)
+
+    def test_memoize_distinguishes_keys(self):
+        context = TransformContext()
+        source = pd.DataFrame()
+
+        self.assertEqual(1, context.memoize(source, ("a",), lambda: 1))
+        self.assertEqual(2, context.memoize(source, ("b",), lambda: 2))
+
+    def test_memoize_distinguishes_sources(self):
+        context = TransformContext()
+
+        self.assertEqual(1, context.memoize(pd.DataFrame(), ("key",), lambda: 1))
+        self.assertEqual(2, context.memoize(pd.DataFrame(), ("key",), lambda: 2))
@@ -1,3 +1,4 @@
+import json
 from unittest import TestCase
 
 import pandas as pd
@@ -4068,3 +4069,41 @@ class HighChartsLineChartAnnotationTransformerTests(TestCase):
             },
             result,
         )
+
+
+class HighChartsTransformToJSONTests(TestCase):
+    maxDiff = None
+
+    def assert_json_matches_transform(self, widget, df, dimensions, references=()):
+        expected = widget.transform(df, dimensions, list(references))
+        result = widget.transform_to_json_bytes(df, dimensions, list(references))
+
+        self.assertIsInstance(result, bytes)
+        self.assertEqual(json.loads(json.dumps(expected)), json.loads(result))
+
+    def test_timeseries_dimx2_date_str_totals(self):
+        dimensions = [Rollup(day(mock_dataset.fields.timestamp)), Rollup(mock_dataset.fields.political_party)]
+        widget = HighCharts().axis(HighCharts.LineSeries(mock_dataset.fields.votes))
+        self.assert_json_matches_transform(widget, dimx2_date_str_totalsx2_df, dimensions)
+
+    def test_timeseries_with_reference(self):
+        dimensions = [day(mock_dataset.fields.timestamp), mock_dataset.fields.political_party]
+        references = [ElectionOverElection(mock_dataset.fields.timestamp)]
+        widget = HighCharts().axis(HighCharts.LineSeries(mock_dataset.fields.votes))
+        self.assert_json_matches_transform(widget, dimx2_date_str_ref_df, dimensions, references)
+
+    def test_category_dimx2_str_num(self):
+        dimensions = [mock_dataset.fields.political_party, mock_dataset.fields['candidate-id']]
+        widget = HighCharts().axis(
+            HighCharts.BarSeries(mock_dataset.fields.wins), HighCharts.BarSeries(mock_dataset.fields.votes)
+        )
+        self.assert_json_matches_transform(widget, dimx2_str_num_df, dimensions)
+
+    def test_pie_chart(self):
+        widget = HighCharts().axis(HighCharts.PieSeries(mock_dataset.fields.votes))
+        self.assert_json_matches_transform(widget, dimx1_str_df, [mock_dataset.fields.political_party])
+
+    def test_split_dimension(self):
+        dimensions = [day(mock_dataset.fields.timestamp), mock_dataset.fields.political_party]
+        widget = HighCharts(split_dimension=dimensions[1]).axis(HighCharts.LineSeries(mock_dataset.fields.votes))
+        self.assert_json_matches_transform(widget, dimx2_date_str_df, dimensions)
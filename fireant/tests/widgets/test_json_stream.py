@@ -0,0 +1,66 @@
+import json
+from unittest import TestCase
+
+import numpy as np
+
+from fireant.widgets.json_stream import (
+    EncodedJSON,
+    encode_json_value,
+    iter_json,
+    iter_json_chunks,
+)
+
+
+class EncodeJSONValueTests(TestCase):
+    def test_numpy_values_are_encoded_as_python_values(self):
+        self.assertEqual("1", encode_json_value(np.int64(1)))
+        self.assertEqual("1.5", encode_json_value(np.float64(1.5)))
+        self.assertEqual("true", encode_json_value(np.bool_(True)))
+
+    def test_encoded_json_is_returned_as_is(self):
+        self.assertEqual('{"a": 1}', encode_json_value(EncodedJSON('{"a": 1}')))
+
+    def test_unsupported_values_raise_type_error(self):
+        with self.assertRaises(TypeError):
+            encode_json_value(object())
+
+
+class IterJSONTests(TestCase):
+    def test_output_matches_json_dumps(self):
+        value = {"a": [1, 2.5, None, "b"], "c": {"d": (True, False)}, "e": "é"}
+
+        self.assertEqual(json.dumps(value), "".join(iter_json(value)))
+
+    def test_encoded_json_is_written_as_is(self):
+        value = {"data": [EncodedJSON('{"raw": 1}'), EncodedJSON('{"raw": 2}')]}
+
+        self.assertEqual('{"data": [{"raw": 1}, {"raw": 2}]}', "".join(iter_json(value)))
+
+    def test_iterators_are_consumed_while_writing(self):
+        consumed = []
+
+        def rows():
+            for i in range(3):
+                consumed.append(i)
+                yield EncodedJSON(str(i))
+
+        pieces = iter_json({"data": rows()})
+        next(pieces)
+        self.assertEqual([], consumed)
+
+        self.assertEqual('"data": [0, 1, 2]}', "".join(pieces))
+        self.assertEqual([0, 1, 2], consumed)
+
+
+class IterJSONChunksTests(TestCase):
+    def test_chunks_are_at_least_chunk_size_long(self):
+        value = [EncodedJSON(str(i)) for i in range(100)]
+
+        chunks = list(iter_json_chunks(value, chunk_size=50))
+
+        self.assertEqual(json.dumps(list(range(100))).encode(), b"".join(chunks))
+        self.assertGreater(len(chunks), 1)
+        self.assertTrue(all(len(chunk) >= 50 for chunk in chunks[:-1]))
+
+    def test_empty_value(self):
+        self.assertEqual([b"[]"], list(iter_json_chunks([])))
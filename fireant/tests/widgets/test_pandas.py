@@ -1,6 +1,8 @@
 import copy
+import tracemalloc
 from functools import partial
 from unittest import TestCase
+from unittest.mock import patch
 
 import numpy as np
 import pandas as pd
@@ -25,7 +27,10 @@ from fireant.tests.dataset.mocks import (
     test_database,
 )
 from fireant.utils import alias_selector as f
+from fireant.widgets.base import TransformContext
+from fireant.widgets.csv import CSV
 from fireant.widgets.pandas import Pandas
+from fireant.widgets.reacttable import ReactTable
 
 
 def format_float(x, is_raw=False):
@@ -730,3 +735,95 @@ class PandasTransformerSortTests(TestCase):
         self.assertEqual(['Locale'], list(result.index.names))
         self.assertEqual(['za', 'Totals'], result.index.values.tolist())
         self.assertEqual([['2', '1', '3', '2', '2', '4'], ['', '', '3', '', '', '4']], result.values.tolist())
+
+
+class PandasTransformerCopyTests(TestCase):
+    def test_transform_does_not_modify_the_input_data_frame(self):
+        df = dimx2_date_str_ref_df.copy()
+        dimensions = [mock_dataset.fields.timestamp, mock_dataset.fields.political_party]
+        references = [ElectionOverElection(mock_dataset.fields.timestamp)]
+
+        Pandas(mock_dataset.fields.votes, pivot=[mock_dataset.fields.political_party]).transform(
+            df, dimensions, references
+        )
+        Pandas(mock_dataset.fields.votes, hide=[mock_dataset.fields.political_party]).transform(
+            df, dimensions, references
+        )
+
+        pandas.testing.assert_frame_equal(dimx2_date_str_ref_df, df)
+
+    def test_transform_does_not_copy_the_input_data_frame(self):
+        df = dimx2_date_str_df.copy()
+
+        with patch.object(pd.DataFrame, 'copy', autospec=True, side_effect=pd.DataFrame.copy) as mock_copy:
+            Pandas(mock_dataset.fields.votes, mock_dataset.fields.wins).transform(
+                df, [mock_dataset.fields.timestamp, mock_dataset.fields.political_party], []
+            )
+
+        copied_frames = [call.args[0] for call in mock_copy.call_args_list if call.kwargs.get('deep', True)]
+        self.assertFalse(any(copied is df for copied in copied_frames))
+
+    def test_select_data_frame_columns_does_not_allocate_column_data(self):
+        df = pd.DataFrame({f('metric{}'.format(i)): np.arange(100000, dtype=float) for i in range(10)})
+        columns = [f('metric{}'.format(i)) for i in range(0, 10, 2)]
+
+        tracemalloc.start()
+        try:
+            result = Pandas.select_data_frame_columns(df, columns)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        self.assertEqual(columns, list(result.columns))
+        # The selected columns alone take up 4MB, which would have been allocated when copying them
+        self.assertLess(peak, df[columns].memory_usage(index=False).sum() / 10)
+        self.assertTrue(np.shares_memory(result[columns[0]].values, df[columns[0]].values))
+
+
+class PandasTransformerContextTests(TestCase):
+    dimensions = [mock_dataset.fields.timestamp, mock_dataset.fields.political_party]
+
+    def test_widgets_sharing_a_context_return_the_same_results(self):
+        context = TransformContext()
+        widgets = [
+            Pandas(mock_dataset.fields.votes, pivot=[mock_dataset.fields.political_party]),
+            CSV(mock_dataset.fields.votes, pivot=[mock_dataset.fields.political_party]),
+            Pandas(mock_dataset.fields.votes, mock_dataset.fields.wins),
+            ReactTable(mock_dataset.fields.votes, pivot=[mock_dataset.fields.political_party]),
+        ]
+
+        for widget in widgets:
+            with self.subTest(widget=widget):
+                expected = widget.transform(dimx2_date_str_df, self.dimensions, [])
+                result = widget.transform(dimx2_date_str_df, self.dimensions, [], transform_context=context)
+
+                if isinstance(expected, pd.DataFrame):
+                    pandas.testing.assert_frame_equal(expected, result)
+                else:
+                    self.assertEqual(expected, result)
+
+    def test_pivot_is_shared_between_widgets_with_the_same_pivot(self):
+        context = TransformContext()
+        widgets = [
+            Pandas(mock_dataset.fields.votes, pivot=[mock_dataset.fields.political_party]),
+            CSV(mock_dataset.fields.votes, pivot=[mock_dataset.fields.political_party]),
+        ]
+
+        with patch.object(Pandas, 'pivot_data_frame', autospec=True, side_effect=Pandas.pivot_data_frame) as mock_pivot:
+            for widget in widgets:
+                widget.transform(dimx2_date_str_df, self.dimensions, [], transform_context=context)
+
+        mock_pivot.assert_called_once()
+
+    def test_pivot_is_not_shared_between_widgets_with_different_pivots(self):
+        context = TransformContext()
+        widgets = [
+            Pandas(mock_dataset.fields.votes, pivot=[mock_dataset.fields.political_party]),
+            Pandas(mock_dataset.fields.votes, pivot=[mock_dataset.fields.political_party], transpose=True),
+        ]
+
+        with patch.object(Pandas, 'pivot_data_frame', autospec=True, side_effect=Pandas.pivot_data_frame) as mock_pivot:
+            for widget in widgets:
+                widget.transform(dimx2_date_str_df, self.dimensions, [], transform_context=context)
+
+        self.assertEqual(2, mock_pivot.call_count)
@@ -1,4 +1,6 @@
+import json
 from unittest import TestCase
+from unittest.mock import patch
 
 import pandas as pd
 from pypika import Table
@@ -31,6 +33,7 @@ from fireant.tests.dataset.mocks import (
     mock_dataset,
 )
 from fireant.widgets.base import ReferenceItem
+from fireant.widgets.json_stream import iter_json_chunks
 from fireant.widgets.reacttable import (
     FormattingConditionRule,
     FormattingField,
@@ -2549,3 +2552,175 @@ class ReactTableReferenceItemFormatTests(TestCase):
         ref_item = ReferenceItem(mock_dataset.fields.wins_with_style, ref)
 
         self.assert_object_dict(ref_item, exp_ref_item, self.ref_item_attrs)
+
+
+class ReactTableTransformToJSONTests(TestCase):
+    maxDiff = None
+
+    def assert_json_matches_transform(self, widget, df, dimensions, references=()):
+        expected = widget.transform(df, dimensions, list(references))
+        result = widget.transform_to_json_bytes(df, dimensions, list(references))
+
+        self.assertIsInstance(result, bytes)
+        self.assertEqual(json.loads(json.dumps(expected)), json.loads(result))
+
+    def test_dimx1_str(self):
+        widget = ReactTable(mock_dataset.fields.wins)
+        self.assert_json_matches_transform(widget, dimx1_str_df, [mock_dataset.fields.political_party])
+
+    def test_dimx2_date_str_totals_all(self):
+        dimensions = [Rollup(day(mock_dataset.fields.timestamp)), Rollup(mock_dataset.fields.political_party)]
+        widget = ReactTable(mock_dataset.fields.votes, mock_dataset.fields.wins)
+        self.assert_json_matches_transform(widget, dimx2_date_str_totalsx2_df, dimensions)
+
+    def test_dimx2_date_str_reference(self):
+        dimensions = [day(mock_dataset.fields.timestamp), mock_dataset.fields.political_party]
+        references = [ElectionOverElection(mock_dataset.fields.timestamp)]
+        widget = ReactTable(mock_dataset.fields.votes)
+        self.assert_json_matches_transform(widget, dimx2_date_str_ref_df, dimensions, references)
+
+    def test_dimx2_pivot_dim2(self):
+        dimensions = [day(mock_dataset.fields.timestamp), mock_dataset.fields.political_party]
+        widget = ReactTable(mock_dataset.fields.wins, mock_dataset.fields.votes, pivot=[dimensions[1]])
+        self.assert_json_matches_transform(widget, dimx2_date_str_df, dimensions)
+
+    def test_dimx2_pivot_both_dims_and_transpose(self):
+        political_party = Rollup(mock_dataset.fields.political_party)
+        dimensions = [Rollup(day(mock_dataset.fields.timestamp)), political_party]
+        widget = ReactTable(mock_dataset.fields.wins, mock_dataset.fields.votes, pivot=[political_party])
+        self.assert_json_matches_transform(widget, dimx2_date_str_totalsx2_df, dimensions)
+
+    def test_transpose(self):
+        widget = ReactTable(mock_dataset.fields.wins, transpose=True)
+        self.assert_json_matches_transform(widget, dimx1_str_df, [mock_dataset.fields.political_party])
+
+    def test_dimx2_hide_dim1(self):
+        dimensions = [day(mock_dataset.fields.timestamp), mock_dataset.fields.political_party]
+        widget = ReactTable(mock_dataset.fields.wins, hide=[dimensions[0]])
+        self.assert_json_matches_transform(widget, dimx2_date_str_df, dimensions)
+
+    def test_hyperlink_depending_on_another_dim(self):
+        dimensions = [mock_dataset.fields.political_party, mock_dataset.fields['candidate-name']]
+        widget = ReactTable(mock_dataset.fields.wins)
+        self.assert_json_matches_transform(widget, dimx2_str_str_df, dimensions)
+
+    def test_formatting_rules(self):
+        widget = ReactTable(
+            mock_dataset.fields.wins,
+            formatting_rules=[
+                FormattingConditionRule(
+                    FormattingField(mock_dataset.fields.wins), ComparisonOperator.gt, 3, 'EEEEEE', covers_row=True
+                )
+            ],
+        )
+        self.assert_json_matches_transform(widget, dimx1_str_df, [mock_dataset.fields.political_party])
+
+    def test_json_is_streamed_in_chunks(self):
+        dimensions = [day(mock_dataset.fields.timestamp), mock_dataset.fields.political_party]
+        widget = ReactTable(mock_dataset.fields.wins, mock_dataset.fields.votes)
+
+        with patch("fireant.widgets.reacttable.iter_json_chunks", wraps=iter_json_chunks) as mock_iter_json_chunks:
+            chunks = list(widget.transform_to_json_chunks(dimx2_date_str_df, dimensions, []))
+
+        mock_iter_json_chunks.assert_called_once()
+        self.assertEqual(widget.transform_to_json_bytes(dimx2_date_str_df, dimensions, []), b"".join(chunks))
+
+
+class ReactTableColumnarDataTests(TestCase):
+    maxDiff = None
+
+    def test_dimx1_str(self):
+        result = ReactTable(mock_dataset.fields.wins, columnar_data=True).transform(
+            dimx1_str_df, [mock_dataset.fields.political_party], []
+        )
+
+        self.assertEqual(
+            {
+                'columns': [
+                    {'Header': 'Party', 'accessor': '$political_party'},
+                    {'Header': 'Wins', 'accessor': '$wins', 'path_accessor': ['$wins']},
+                ],
+                'data': {
+                    'size': 3,
+                    'columns': [
+                        {
+                            'accessor': '$political_party',
+                            'path_accessor': ['$political_party'],
+                            'raw': ['Democrat', 'Independent', 'Republican'],
+                            'display': [None, None, None],
+                            'hyperlink': [
+                                'http://example.com/Democrat',
+                                'http://example.com/Independent',
+                                'http://example.com/Republican',
+                            ],
+                        },
+                        {
+                            'accessor': '$wins',
+                            'path_accessor': ['$wins'],
+                            'raw': [6, 0, 6],
+                            'display': [0, 1, 0],
+                        },
+                    ],
+                    'display_values': ['6', '0'],
+                },
+            },
+            result,
+        )
+
+    def test_dimx2_pivot_dim2_shares_display_values_between_columns(self):
+        dimensions = [day(mock_dataset.fields.timestamp), mock_dataset.fields.political_party]
+        result = ReactTable(mock_dataset.fields.wins, pivot=[dimensions[1]], columnar_data=True).transform(
+            dimx2_date_str_df, dimensions, []
+        )
+        data = result['data']
+
+        self.assertEqual(6, data['size'])
+        self.assertEqual(
+            [['$timestamp'], ['$wins', 'Democrat'], ['$wins', 'Independent'], ['$wins', 'Republican']],
+            [column['path_accessor'] for column in data['columns']],
+        )
+        self.assertEqual(len(data['display_values']), len(set(data['display_values'])))
+
+        democrat_wins = data['columns'][1]
+        self.assertEqual([2, 0, 0, 2, 2, 0], democrat_wins['raw'])
+        self.assertEqual(['2', '0', '0', '2', '2', '0'], [data['display_values'][i] for i in democrat_wins['display']])
+
+    def test_formatting_rules_add_colors(self):
+        result = ReactTable(
+            mock_dataset.fields.wins,
+            columnar_data=True,
+            formatting_rules=[
+                FormattingConditionRule(
+                    FormattingField(mock_dataset.fields.wins), ComparisonOperator.gt, 3, 'EEEEEE', covers_row=True
+                )
+            ],
+        ).transform(dimx1_str_df, [mock_dataset.fields.political_party], [])
+        party, wins = result['data']['columns']
+
+        self.assertEqual(['EEEEEE', None, 'EEEEEE'], party['color'])
+        self.assertEqual(['212121', None, '212121'], party['text_color'])
+        self.assertEqual(['EEEEEE', None, 'EEEEEE'], wins['color'])
+        self.assertEqual(['212121', None, '212121'], wins['text_color'])
+
+    def test_columnar_data_matches_row_data(self):
+        dimensions = [Rollup(day(mock_dataset.fields.timestamp)), Rollup(mock_dataset.fields.political_party)]
+        metrics = [mock_dataset.fields.votes, mock_dataset.fields.wins]
+        rows = ReactTable(*metrics).transform(dimx2_date_str_totalsx2_df, dimensions, [])['data']
+        data = ReactTable(*metrics, columnar_data=True).transform(dimx2_date_str_totalsx2_df, dimensions, [])['data']
+
+        for column in data['columns']:
+            with self.subTest(column['accessor']):
+                cells = [row[column['accessor']] for row in rows]
+                self.assertEqual([cell['raw'] for cell in cells], column['raw'])
+                self.assertEqual(
+                    [cell.get('display') for cell in cells],
+                    [None if i is None else data['display_values'][i] for i in column['display']],
+                )
+
+    def test_transform_to_json_bytes(self):
+        widget = ReactTable(mock_dataset.fields.wins, columnar_data=True)
+        dimensions = [mock_dataset.fields.political_party]
+
+        result = widget.transform_to_json_bytes(dimx1_str_df, dimensions, [])
+
+        self.assertEqual(widget.transform(dimx1_str_df, dimensions, []), json.loads(result))
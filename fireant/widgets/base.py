@@ -1,6 +1,9 @@
+import threading
+from collections import defaultdict
+
 import pandas as pd
 
-from typing import FrozenSet, List, Optional, Union
+from typing import Callable, FrozenSet, Iterator, List, Optional, Union
 
 from fireant.dataset.fields import Field
 from fireant.dataset.operations import Operation, _BaseOperation
@@ -63,6 +66,22 @@ class Widget:
 
         return hide_aliases
 
+    @staticmethod
+    def select_data_frame_columns(data_frame: pd.DataFrame, columns: List[str]) -> pd.DataFrame:
+        """
+        Selects columns from a data frame without copying the underlying data. The returned data frame holds views of
+        the selected columns, so columns can be replaced or dropped without affecting `data_frame`, but values must
+        not be written in place.
+
+        :param data_frame:
+            The data frame to select columns from.
+        :param columns:
+            A list of column keys to select, in the order in which they should appear.
+        :return:
+            A new data frame sharing its column data and index with `data_frame`.
+        """
+        return pd.DataFrame({column: data_frame[column] for column in columns}, index=data_frame.index, copy=False)
+
     @staticmethod
     def hide_data_frame_indexes(
         data_frame: pd.DataFrame,
@@ -85,6 +104,54 @@ class Widget:
         return "{}({})".format(self.__class__.__name__, ",".join(str(m) for m in self.items))
 
 
+class TransformContext:
+    """
+    A context shared by all widgets transforming the result set of the same query. Widgets use it to memoise
+    intermediate results, such as the selected metric columns or a pivoted data frame, so that other widgets doing the
+    same work on the same data frame can reuse them.
+
+    Results are keyed by the object they were derived from and a key describing the operation. Memoised results are
+    shared between widgets, so they must never be modified in place.
+    """
+
+    def __init__(self):
+        self._sources = {}
+        self._results = {}
+        self._locks = defaultdict(threading.Lock)
+        self._locks_lock = threading.Lock()
+
+    def memoize(self, source, key, func: Callable):
+        """
+        Returns the memoised result for the operation `key` applied to `source`, calling `func` to compute it the first
+        time it is requested. This is safe to call from multiple threads, in which case the result is computed by the
+        first thread requesting it while the others wait for it.
+
+        :param source:
+            The object the result is derived from, usually a data frame.
+        :param key:
+            A hashable value identifying the operation and its parameters.
+        :param func:
+            A function without arguments computing the result.
+        :return:
+            The memoised result.
+        """
+        cache_key = (id(source), key)
+
+        if cache_key in self._results:
+            return self._results[cache_key]
+
+        with self._locks_lock:
+            lock = self._locks[cache_key]
+
+        with lock:
+            if cache_key not in self._results:
+                # Hold on to the source, so its id can't be reused by another object while this context is alive
+                self._sources[id(source)] = source
+                self._results[cache_key] = func()
+
+        return self._results[cache_key]
+
+
 class TransformableWidget(Widget):
     # This attribute can be overridden in order to sort groups. Useful in cases like for charts where sorting
     # should be applied to the number of series rather than the number of data points.
@@ -96,6 +163,7 @@ class TransformableWidget(Widget):
         dimensions: List[Field],
         references: List[Reference],
         annotation_frame: Optional[pd.DataFrame] = None,
+        transform_context: Optional[TransformContext] = None,
     ) -> dict:
         """
         - Main entry point -
@@ -111,11 +179,34 @@ class TransformableWidget(Widget):
             A list of references that are being rendered.
         :param annotation_frame:
             A data frame containing the annotation data.
+        :param transform_context:
+            A context for sharing intermediate results with other widgets transforming the same data frame.
         :return:
             A dict meant to be dumped as JSON.
         """
         raise NotImplementedError()
 
+    def transform_to_json_chunks(self, *args, **kwargs) -> Iterator[bytes]:
+        """
+        Transforms the result set like `transform` does, but encodes the output as JSON directly and yields it in
+        UTF-8 encoded chunks. This takes the same arguments as `transform`. Only widgets whose output is meant to be
+        dumped as JSON support this.
+
+        :return:
+            An iterator of bytes which, concatenated, are the JSON encoded output of `transform`.
+        """
+        raise NotImplementedError()
+
+    def transform_to_json_bytes(self, *args, **kwargs) -> bytes:
+        """
+        Transforms the result set like `transform` does and returns the output encoded as JSON. This takes the same
+        arguments as `transform`.
+
+        :return:
+            The UTF-8 encoded JSON output of `transform`.
+        """
+        return b"".join(self.transform_to_json_chunks(*args, **kwargs))
+
 
 class ReferenceItem:
     def __init__(self, item: Union[Field, Operation], reference: Reference):
@@ -5,6 +5,7 @@ from typing import Iterable, List, Optional
 
 from fireant.dataset.fields import Field
 from fireant.dataset.references import Reference
+from .base import TransformContext
 from .pandas import Pandas
 
 
@@ -20,8 +21,11 @@ class CSV(Pandas):
         references: List[Reference],
         annotation_frame: Optional[pd.DataFrame] = None,
         use_raw_values: bool = None,
+        transform_context: Optional[TransformContext] = None,
     ):
-        result_df = super(CSV, self).transform(data_frame, dimensions, references, use_raw_values=True)
+        result_df = super(CSV, self).transform(
+            data_frame, dimensions, references, use_raw_values=True, transform_context=transform_context
+        )
         # Unset the column level names because they're a bit confusing in a csv file
         result_df.columns.names = [None] * len(result_df.columns.names)
         return result_df.to_csv(na_rep="", quoting=QUOTE_MINIMAL)
@@ -3,7 +3,8 @@ import itertools
 import pandas as pd
 import numpy as np
 
-from typing import Dict, List, Optional, Tuple
+from functools import partial
+from typing import Dict, Iterator, List, Optional, Set, Tuple
 from datetime import timedelta
 
 from fireant import (
@@ -20,11 +21,12 @@ from fireant.reference_helpers import (
     reference_suffix,
 )
 from fireant.utils import alias_selector
-from .base import HideField, TransformableWidget
+from .base import HideField, TransformContext, TransformableWidget
 from .chart_base import (
     ChartWidget,
     ContinuousAxisSeries,
 )
+from .json_stream import EncodedJSON, encode_json_value, iter_json_chunks
 
 DEFAULT_COLORS = (
     "#DDDF0D",
@@ -93,6 +95,7 @@ class HighCharts(ChartWidget, TransformableWidget):
         dimensions: List[Field],
         references: List[Reference],
         annotation_frame: Optional[pd.DataFrame] = None,
+        transform_context: Optional[TransformContext] = None,
     ):
         """
         - Main entry point -
@@ -109,19 +112,55 @@ class HighCharts(ChartWidget, TransformableWidget):
             A list of references that are being rendered.
         :param annotation_frame:
             A data frame containing annotation data.
+        :param transform_context:
+            A context for sharing intermediate results with other widgets transforming the same data frame.
         :return:
             A dict or a list of dicts meant to be dumped as JSON.
         """
-        result_df = data_frame.copy()
+        return self._render_charts(data_frame, dimensions, references, annotation_frame, transform_context)
 
+    def transform_to_json_chunks(
+        self,
+        data_frame: pd.DataFrame,
+        dimensions: List[Field],
+        references: List[Reference],
+        annotation_frame: Optional[pd.DataFrame] = None,
+        transform_context: Optional[TransformContext] = None,
+    ) -> Iterator[bytes]:
+        """
+        Transforms a data frame into the same format as #transform, but encodes it as JSON directly. The data points of
+        each series are encoded from the columns of the data frame, without building a dict or tuple for each point
+        first. This takes the same arguments as #transform.
+
+        :return:
+            An iterator of bytes which, concatenated, are the JSON encoded output of #transform.
+        """
+        charts = self._render_charts(
+            data_frame, dimensions, references, annotation_frame, transform_context, encode_data=True
+        )
+        return iter_json_chunks(charts)
+
+    def _render_charts(
+        self,
+        data_frame: pd.DataFrame,
+        dimensions: List[Field],
+        references: List[Reference],
+        annotation_frame: Optional[pd.DataFrame] = None,
+        transform_context: Optional[TransformContext] = None,
+        encode_data: bool = False,
+    ):
         hide_aliases = self.hide_aliases(dimensions)
-        self.hide_data_frame_indexes(result_df, hide_aliases)
 
-        dimension_map = {alias_selector(dimension.alias): dimension for dimension in dimensions}
+        if transform_context is None:
+            transform_context = TransformContext()
 
-        # Nan/None values in the index can break split dimension feature,
-        # because xs method cannot
-        result_df.rename(index={np.nan: formats.BLANK_VALUE}, inplace=True)
+        result_df = transform_context.memoize(
+            data_frame,
+            ("highcharts", frozenset(hide_aliases)),
+            partial(self._prepare_data_frame, data_frame, hide_aliases),
+        )
+
+        dimension_map = {alias_selector(dimension.alias): dimension for dimension in dimensions}
 
         render_group = []
         split_dimension = self.split_dimension
@@ -154,12 +193,24 @@ class HighCharts(ChartWidget, TransformableWidget):
                 annotation_frame=annotation_frame,
                 title_suffix=title_suffix,
                 num_charts=num_charts,
+                encode_data=encode_data,
             )
             for chart_df, title_suffix in render_group
         ]
 
         return charts[0] if num_charts == 1 else charts
 
+    def _prepare_data_frame(self, data_frame: pd.DataFrame, hide_aliases: Set[str]) -> pd.DataFrame:
+        # Columns are only ever dropped and the index replaced, so a shallow copy is enough to leave the data frame
+        # shared with other widgets untouched.
+        result_df = data_frame.copy(deep=False)
+        self.hide_data_frame_indexes(result_df, hide_aliases)
+
+        # Nan/None values in the index can break split dimension feature,
+        # because xs method cannot
+        result_df.rename(index={np.nan: formats.BLANK_VALUE}, inplace=True)
+        return result_df
+
     def _render_individual_chart(
         self,
         data_frame: pd.DataFrame,
@@ -168,6 +219,7 @@ class HighCharts(ChartWidget, TransformableWidget):
         annotation_frame: Optional[pd.DataFrame] = None,
         title_suffix: str = "",
         num_charts: int = 1,
+        encode_data: bool = False,
     ):
         result_df = data_frame
 
@@ -211,6 +263,7 @@ class HighCharts(ChartWidget, TransformableWidget):
                 dimensions,
                 references,
                 is_timeseries,
+                encode_data=encode_data,
             )
 
         categories = self._categories(result_df, dimension_map)
@@ -351,6 +404,7 @@ class HighCharts(ChartWidget, TransformableWidget):
         dimensions: List[Field],
         references: List[Reference],
         is_timeseries: bool = False,
+        encode_data: bool = False,
     ) -> List[dict]:
         """
         Renders the series configuration.
@@ -365,6 +419,8 @@ class HighCharts(ChartWidget, TransformableWidget):
         :param dimensions:
         :param references:
         :param is_timeseries:
+        :param encode_data:
+            Whether to encode the data points of the series as JSON.
         :return:
         """
 
@@ -394,6 +450,7 @@ class HighCharts(ChartWidget, TransformableWidget):
                     axis_idx,
                     axis_color,
                     next(colors),
+                    encode_data=encode_data,
                 )
 
         return hc_series
@@ -409,6 +466,7 @@ class HighCharts(ChartWidget, TransformableWidget):
         axis_idx: int,
         axis_color: str,
         series_color: str,
+        encode_data: bool = False,
     ):
         """
 
@@ -425,11 +483,18 @@ class HighCharts(ChartWidget, TransformableWidget):
         :param axis_idx:
         :param axis_color:
         :param series_color:
+        :param encode_data:
+            Whether to encode the data points as JSON.
         :return:
         """
         if is_timeseries:
             series_df = series_df.sort_index(level=0)
 
+        if encode_data:
+            render_data = self._encode_timeseries_data if is_timeseries else self._encode_category_data
+        else:
+            render_data = self._render_timeseries_data if is_timeseries else self._render_category_data
+
         results = []
         for reference, dash_style in zip([None] + references, itertools.cycle(DASH_STYLES)):
             field_alias = utils.alias_selector(reference_alias(series.metric, reference))
@@ -441,11 +506,7 @@ class HighCharts(ChartWidget, TransformableWidget):
             hc_series = {
                 "type": series.type,
                 "name": "{} ({})".format(metric_label, dimension_label) if dimension_label else metric_label,
-                "data": (
-                    self._render_timeseries_data(series_df, field_alias, series.metric)
-                    if is_timeseries
-                    else self._render_category_data(series_df, field_alias, series.metric)
-                ),
+                "data": render_data(series_df, field_alias, series.metric),
                 "tooltip": self._render_tooltip(series.metric, reference),
                 "yAxis": (
                     "{}_{}".format(axis_idx, reference.alias)
@@ -486,6 +547,40 @@ class HighCharts(ChartWidget, TransformableWidget):
 
         return series
 
+    @staticmethod
+    def _encode_category_data(group_df: pd.DataFrame, field_alias: str, metric: Field) -> List[EncodedJSON]:
+        """
+        Encodes the same data points as #_render_category_data as JSON, straight from the index and metric column.
+        """
+        is_mi = isinstance(group_df.index, pd.MultiIndex)
+        categories = group_df.index.levels[0] if is_mi else group_df.index
+        labels = group_df.index.get_level_values(0) if is_mi else group_df.index
+
+        positions = {}
+        for position, category in enumerate(categories):
+            positions.setdefault(category, position)
+
+        return [
+            EncodedJSON('{"x": %d, "y": %s}' % (positions[label], encode_json_value(formats.raw_value(y, metric))))
+            for label, y in zip(labels, group_df[field_alias].tolist())
+            # ignore nans in index
+            if not pd.isnull(label)
+        ]
+
+    @staticmethod
+    def _encode_timeseries_data(group_df: pd.DataFrame, metric_alias: str, metric: Field) -> List[EncodedJSON]:
+        """
+        Encodes the same data points as #_render_timeseries_data as JSON, straight from the index and metric column.
+        """
+        dates = group_df.index.get_level_values(0)
+
+        return [
+            EncodedJSON("[%d, %s]" % (formats.date_as_millis(date), encode_json_value(formats.raw_value(y, metric))))
+            for date, y in zip(dates, group_df[metric_alias].tolist())
+            # Ignore totals and empty values on the x-axis
+            if date not in TOTALS_MARKERS and not pd.isnull(date)
+        ]
+
     @staticmethod
     def _render_timeseries_data(group_df: pd.DataFrame, metric_alias: str, metric: Field) -> List[Tuple[int, int]]:
         series = []
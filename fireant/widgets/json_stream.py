@@ -0,0 +1,97 @@
+import json
+from typing import Iterator
+
+import numpy as np
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+
+class EncodedJSON(str):
+    """
+    A string containing a value that has already been encoded as JSON. It is written to the output as it is, which
+    allows widgets to encode large parts of their payload, like the rows of a table, straight from the data frame
+    instead of building Python objects for them first.
+    """
+
+
+def _default(value):
+    if isinstance(value, np.generic):
+        return value.item()
+
+    raise TypeError(f"Object of type {value.__class__.__name__} is not JSON serializable")
+
+
+_encoder = json.JSONEncoder(default=_default)
+
+
+def encode_json_value(value) -> str:
+    """
+    Encodes a single value as JSON. Numpy scalars are encoded as their corresponding Python values.
+
+    :param value:
+        The value to encode.
+    :return:
+        The JSON string for `value`.
+    """
+    if isinstance(value, EncodedJSON):
+        return value
+
+    return _encoder.encode(value)
+
+
+def iter_json(value) -> Iterator[str]:
+    """
+    Encodes a value as JSON piece by piece. Dicts, lists, tuples and iterators are encoded lazily, so an iterator in the
+    payload is only consumed while it is being written. Instances of `EncodedJSON` are written as they are.
+
+    :param value:
+        The value to encode. Dict keys must be strings.
+    :return:
+        An iterator of JSON strings which, concatenated, encode `value`.
+    """
+    if isinstance(value, str):
+        yield encode_json_value(value)
+
+    elif isinstance(value, dict):
+        yield "{"
+        for i, (key, item) in enumerate(value.items()):
+            yield "{}{}: ".format(", " if i else "", encode_json_value(key))
+            yield from iter_json(item)
+        yield "}"
+
+    elif isinstance(value, (list, tuple)) or hasattr(value, "__next__"):
+        yield "["
+        for i, item in enumerate(value):
+            if i:
+                yield ", "
+            yield from iter_json(item)
+        yield "]"
+
+    else:
+        yield encode_json_value(value)
+
+
+def iter_json_chunks(value, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[bytes]:
+    """
+    Encodes a value as JSON and yields the output in UTF-8 encoded chunks of about `chunk_size` characters, suitable
+    for writing to a buffer or streaming in a response.
+
+    :param value:
+        The value to encode. See `iter_json`.
+    :param chunk_size:
+        The minimum number of characters in each chunk, except the last one.
+    :return:
+        An iterator of bytes which, concatenated, encode `value`.
+    """
+    buffer, buffer_size = [], 0
+
+    for piece in iter_json(value):
+        buffer.append(piece)
+        buffer_size += len(piece)
+
+        if buffer_size >= chunk_size:
+            yield "".join(buffer).encode("utf-8")
+            buffer, buffer_size = [], 0
+
+    if buffer:
+        yield "".join(buffer).encode("utf-8")
@@ -2,13 +2,13 @@ import pandas as pd
 
 from collections import OrderedDict
 from functools import partial
-from typing import Iterable, List, Optional, Tuple, Union
+from typing import Iterable, List, Optional, Set, Tuple, Union
 
 from fireant import formats
 from fireant.dataset.fields import DataType, Field
 from fireant.dataset.references import Reference
 from fireant.utils import alias_selector, wrap_list
-from .base import ReferenceItem, TransformableWidget, HideField
+from .base import ReferenceItem, TransformableWidget, TransformContext, HideField
 from fireant.dataset.totals import DATE_TOTALS, NUMBER_TOTALS, TEXT_TOTALS
 from fireant.formats import TOTALS_LABEL, TOTALS_VALUE
 from fireant.reference_helpers import reference_alias
@@ -51,6 +51,7 @@ class Pandas(TransformableWidget):
         references: List[Reference],
         annotation_frame: Optional[pd.DataFrame] = None,
         use_raw_values: bool = False,
+        transform_context: Optional[TransformContext] = None,
     ):
         """
         WRITEME
@@ -62,9 +63,9 @@ class Pandas(TransformableWidget):
             A data frame containing the annotation data.
         :param use_raw_values:
             Don't add prefix or postfix to values.
+        :param transform_context:
+            A context for sharing intermediate results with other widgets transforming the same data frame.
         """
-        result_df = data_frame.copy()
-
         dimension_map = {alias_selector(dimension.alias): dimension for dimension in dimensions}
         dimension_aliases = dimension_map.keys()
         metric_map = OrderedDict(
@@ -92,49 +93,76 @@ class Pandas(TransformableWidget):
             ),
         }
 
-        if isinstance(result_df.index, pd.MultiIndex):
-            result_df = result_df.reorder_levels(dimension_aliases)
-
-        result_df = result_df[metric_aliases]
-
         hide_aliases = self.hide_aliases(dimensions)
 
-        if dimensions:
-            result_df.index.names = [
-                alias_selector(dimension.alias) for dimension in dimensions if dimension.alias not in hide_aliases
-            ]
-
-        self.hide_data_frame_indexes(result_df, hide_aliases)
+        if transform_context is None:
+            transform_context = TransformContext()
 
-        result_df.columns.name = 'Metrics'
+        result_df = transform_context.memoize(
+            data_frame,
+            ("pandas", tuple(metric_aliases), tuple(dimension_aliases), frozenset(hide_aliases)),
+            partial(self._prepare_data_frame, data_frame, dimensions, list(metric_aliases), hide_aliases),
+        )
 
         pivot_dimensions = [
             alias_selector(dimension.alias) for dimension in self.pivot if dimension.alias not in hide_aliases
         ]
-        result_df, _, _ = self.pivot_data_frame(result_df, pivot_dimensions, self.transpose)
+        result_df, _, _ = self.memoized_pivot_data_frame(transform_context, result_df, pivot_dimensions)
 
         metrics = [metric for metric_alias, metric in metric_map.items() if metric_alias not in hide_aliases]
-        result_df = self.add_formatting(dimensions, metrics, result_df, use_raw_values).fillna(
-            value=formats.BLANK_VALUE
-        )
+        result_df = self.add_formatting(
+            dimensions, metrics, result_df, use_raw_values, transform_context=transform_context
+        ).fillna(value=formats.BLANK_VALUE)
         return self.transform_df_schema(result_df, field_map)
 
+    def _prepare_data_frame(
+        self, data_frame: pd.DataFrame, dimensions: List[Field], metric_aliases: List[str], hide_aliases: Set[str]
+    ) -> pd.DataFrame:
+        # The input data frame can be shared with other widgets, so select views of the metric columns instead of
+        # copying it and only ever replace (never mutate) the index.
+        result_df = self.select_data_frame_columns(data_frame, metric_aliases)
+
+        if isinstance(result_df.index, pd.MultiIndex):
+            result_df.index = result_df.index.reorder_levels([alias_selector(d.alias) for d in dimensions])
+
+        if dimensions:
+            result_df.index = result_df.index.set_names(
+                [alias_selector(dimension.alias) for dimension in dimensions if dimension.alias not in hide_aliases]
+            )
+
+        self.hide_data_frame_indexes(result_df, hide_aliases)
+
+        result_df.columns.name = 'Metrics'
+        return result_df
+
     def transform_df_schema(self, data_frame: pd.DataFrame, field_map: dict) -> pd.DataFrame:
-        data_frame.index.names = self._transform_index_values(data_frame.index.names, field_map)
-        data_frame.columns.names = self._transform_index_values(data_frame.columns.names, field_map)
         data_frame.index = self._build_index(data_frame.index, field_map)
         data_frame.columns = self._build_index(data_frame.columns, field_map)
         return data_frame
 
     @staticmethod
     def _build_index(idx: Union[pd.Index, pd.MultiIndex], field_map: dict) -> Union[pd.Index, pd.MultiIndex]:
+        names = Pandas._transform_index_values(idx.names, field_map)
+
         if isinstance(idx, pd.MultiIndex):
-            return pd.MultiIndex.from_tuples(
-                [Pandas._transform_index_values(level, field_map) for level in idx.tolist()], names=idx.names
+            # Only the distinct values of each level need to be mapped, the codes can be reused as they are. If the
+            # mapping merges two values of a level into the same label, the level values are no longer unique and the
+            # index has to be rebuilt from the mapped values of each row instead.
+            levels = [Pandas._map_index_values(level, field_map) for level in idx.levels]
+
+            if all(level.is_unique for level in levels):
+                return idx.set_levels(levels, verify_integrity=False).set_names(names)
+
+            return pd.MultiIndex.from_arrays(
+                [Pandas._map_index_values(idx.get_level_values(i), field_map) for i in range(idx.nlevels)],
+                names=names,
             )
 
-        new_idx = Pandas._transform_index_values(idx.tolist(), field_map)
-        return pd.Index(new_idx, name=idx.name)
+        return Pandas._map_index_values(idx, field_map).rename(names[0])
+
+    @staticmethod
+    def _map_index_values(idx: pd.Index, field_map: dict) -> pd.Index:
+        return idx.map(lambda item: field_map[item].label if item in field_map else item)
 
     @staticmethod
     def _transform_index_values(idx: List[str], field_map: dict) -> List[str]:
@@ -197,6 +225,22 @@ class Pandas(TransformableWidget):
 
         return self.sort_data_frame(data_frame), is_pivoted, is_transposed
 
+    def memoized_pivot_data_frame(
+        self, transform_context: TransformContext, data_frame: pd.DataFrame, pivot_dimensions: List[str]
+    ) -> Tuple[pd.DataFrame, bool, bool]:
+        """
+        Pivots the data frame like `pivot_data_frame` does, but shares the result with any other widget pivoting and
+        sorting the same data frame in the same way.
+        """
+        sort = tuple(wrap_list(self.sort)) if self.sort is not None else None
+        ascending = tuple(self.ascending) if isinstance(self.ascending, list) else self.ascending
+
+        return transform_context.memoize(
+            data_frame,
+            ("pivot", tuple(pivot_dimensions), self.transpose, sort, ascending),
+            partial(self.pivot_data_frame, data_frame, pivot_dimensions, self.transpose),
+        )
+
     def sort_data_frame(self, data_frame: pd.DataFrame):
         if not self.sort or len(data_frame) == 1:
             # If there are no sort arguments or the data frame is a single row, then no need to sort
@@ -229,9 +273,16 @@ class Pandas(TransformableWidget):
         return data_frame_sorted
 
     def add_formatting(
-        self, dimensions: List[Field], items: List[Field], pivot_df: pd.DataFrame, use_raw_values: bool
+        self,
+        dimensions: List[Field],
+        items: List[Field],
+        pivot_df: pd.DataFrame,
+        use_raw_values: bool,
+        transform_context: Optional[TransformContext] = None,
     ) -> pd.DataFrame:
-        format_df = pivot_df.copy()
+        # A shallow copy is enough here since columns are only ever replaced with their formatted values. The only
+        # case where values are written in place converts the data frame to object dtype first, which copies it.
+        format_df = pivot_df.copy(deep=False)
 
         def _get_field_display(item):
             return partial(
@@ -257,9 +308,15 @@ class Pandas(TransformableWidget):
             format_df = format_df.map(field_display)
             return format_df
 
+        if transform_context is None:
+            transform_context = TransformContext()
+
         for item in items:
             key = alias_selector(item.alias)
-            field_display = _get_field_display(item)
-            format_df[key] = format_df[key].map(field_display)
+            format_df[key] = transform_context.memoize(
+                pivot_df,
+                ("display", key, use_raw_values),
+                partial(pivot_df[key].map, _get_field_display(item)),
+            )
 
         return format_df
@@ -1,4 +1,5 @@
 import colorsys
+import itertools
 import re
 
 import numpy as np
@@ -6,7 +7,7 @@ import pandas as pd
 
 from collections import OrderedDict, defaultdict
 from functools import partial
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional
 
 from fireant.dataset.fields import (
     DataType,
@@ -37,7 +38,8 @@ from fireant.utils import (
     setdeepattr,
     wrap_list,
 )
-from .base import ReferenceItem, HideField
+from .base import ReferenceItem, HideField, TransformContext
+from .json_stream import EncodedJSON, encode_json_value, iter_json_chunks
 from .pandas import F_METRICS_DIMENSION_ALIAS, METRICS_DIMENSION_ALIAS, Pandas, TotalsItem
 
 _display_value = partial(display_value, nan_value="", null_value="")
@@ -249,6 +251,7 @@ class ReactTable(Pandas):
         ascending: Optional[bool] = None,
         max_columns: Optional[int] = None,
         formatting_rules=(),
+        columnar_data: bool = False,
     ):
         super(ReactTable, self).__init__(
             metric,
@@ -260,6 +263,7 @@ class ReactTable(Pandas):
             ascending=ascending,
             max_columns=max_columns,
         )
+        self.columnar_data = columnar_data
         self.formatting_rules_map = defaultdict(list)
         self.min_max_map = {}
         for formatting_rule in formatting_rules:
@@ -334,8 +338,8 @@ class ReactTable(Pandas):
         :param dimensions:
         :return:
         """
-        data_frame = data_frame.copy()
-        data_frame.columns.name = F_METRICS_DIMENSION_ALIAS
+        data_frame = data_frame.copy(deep=False)
+        data_frame.columns = data_frame.columns.rename(F_METRICS_DIMENSION_ALIAS)
         return data_frame
 
     @staticmethod
@@ -538,7 +542,11 @@ class ReactTable(Pandas):
 
     @staticmethod
     def _get_row_value_accessor(series, fields, key):
-        index_names = series.index.names or []
+        return ReactTable._get_value_accessor(series.index.names, fields, key)
+
+    @staticmethod
+    def _get_value_accessor(index_names, fields, key):
+        index_names = index_names or []
 
         accessor_fields = [fields[field_alias] for field_alias in index_names if field_alias is not None]
         accessor = [safe_value(value) for value, field in zip(key, accessor_fields)] or key
@@ -635,29 +643,29 @@ class ReactTable(Pandas):
         :param is_pivoted:
             Whether the table is pivoted or not.
         """
-        index_names = data_frame.index.names
-
-        def _get_field_label(alias):
-            if alias not in field_map:
-                return alias
-
-            field = field_map[alias]
-            return getattr(field, "label", field.alias)
-
-        # If the metric column was dropped due to only having a single metric, add it back here so the
-        # formatting can be applied.
-        if hasattr(data_frame, "name"):
-            metric_alias = data_frame.name
-            data_frame = pd.concat(
-                [data_frame],
-                keys=[metric_alias],
-                names=[F_METRICS_DIMENSION_ALIAS],
-                axis=1,
+        return list(
+            self.iter_data_rows(
+                data_frame, field_map, hide_aliases, dimension_hyperlink_templates, is_transposed, is_pivoted
             )
+        )
+
+    def iter_data_rows(
+        self,
+        data_frame: pd.DataFrame,
+        field_map: Dict[str, Field],
+        hide_aliases: List[str],
+        dimension_hyperlink_templates: Dict[str, str],
+        is_transposed: bool,
+        is_pivoted: bool,
+    ) -> Iterator[dict]:
+        """
+        Builds the rows returned by #transform_data one at a time. This takes the same arguments as #transform_data.
+        """
+        index_names = data_frame.index.names
+        data_frame = self._restore_metrics_level(data_frame)
 
         self.calculate_min_max(data_frame, is_transposed)
 
-        rows = []
         for index, series in data_frame.iterrows():
             row_values, row_colors = self.transform_row_values(
                 series, field_map, is_transposed, is_pivoted, hide_aliases
@@ -666,19 +674,374 @@ class ReactTable(Pandas):
             index = wrap_list(index)
             # Get a list of values from the index. These can be metrics or dimensions so it checks in the item map if
             # there is a display value for the value
-            index_values = [_get_field_label(value) for value in index] if is_transposed else index
+            index_values = [self._get_field_label(value, field_map) for value in index] if is_transposed else index
             index_display_values = OrderedDict(zip(index_names, index_values))
             row_index = self.transform_row_index(
                 index_display_values, field_map, dimension_hyperlink_templates, hide_aliases, row_colors
             )
-            rows.append(
-                {
-                    **row_index,
-                    **row_values,
-                }
+            yield {
+                **row_index,
+                **row_values,
+            }
+
+    @staticmethod
+    def _get_field_label(alias, field_map: Dict[str, Field]):
+        if alias not in field_map:
+            return alias
+
+        field = field_map[alias]
+        return getattr(field, "label", field.alias)
+
+    @staticmethod
+    def _restore_metrics_level(data_frame: pd.DataFrame) -> pd.DataFrame:
+        # If the metric column was dropped due to only having a single metric, add it back here so the
+        # formatting can be applied.
+        if not hasattr(data_frame, "name"):
+            return data_frame
+
+        metric_alias = data_frame.name
+        return pd.concat(
+            [data_frame],
+            keys=[metric_alias],
+            names=[F_METRICS_DIMENSION_ALIAS],
+            axis=1,
+        )
+
+    def encode_data(
+        self,
+        data_frame: pd.DataFrame,
+        field_map: Dict[str, Field],
+        hide_aliases: List[str],
+        dimension_hyperlink_templates: Dict[str, str],
+        is_transposed: bool,
+        is_pivoted: bool,
+    ) -> Iterator[EncodedJSON]:
+        """
+        Encodes the rows returned by #transform_data as JSON, one row at a time. This takes the same arguments as
+        #transform_data.
+
+        The cells are encoded column by column straight from the data frame and each row is then put together from a
+        template built once from the column accessors, so no dicts are created for the rows and cells. Formatting rules
+        can color a whole row depending on its values, so tables with formatting rules fall back to encoding the rows
+        built by #iter_data_rows.
+        """
+        if any(self.formatting_rules_map.values()):
+            rows = self.iter_data_rows(
+                data_frame, field_map, hide_aliases, dimension_hyperlink_templates, is_transposed, is_pivoted
+            )
+            return (EncodedJSON(encode_json_value(row)) for row in rows)
+
+        index_names = data_frame.index.names
+        data_frame = self._restore_metrics_level(data_frame)
+
+        # Map the accessor path of each value column to the position of its cells in the row template
+        value_tree, value_cells = OrderedDict(), []
+        for accessor, column_values, fields in self._iter_value_columns(
+            data_frame, field_map, hide_aliases, is_transposed
+        ):
+            setdeepattr(value_tree, accessor, len(value_cells))
+            value_cells.append([self._encode_value_cell(value, field) for value, field in zip(column_values, fields)])
+
+        index_positions = self._get_index_positions(index_names, field_map, hide_aliases, value_tree)
+        index_cells = self._encode_index_cells(
+            data_frame.index, index_positions, field_map, dimension_hyperlink_templates, is_transposed
+        )
+
+        row_template = self._make_row_template([safe_value(index_names[i]) for i in index_positions], value_tree)
+
+        rows = zip(*index_cells, *value_cells) if index_cells or value_cells else itertools.repeat((), len(data_frame))
+        return (EncodedJSON(row_template.format(*cells)) for cells in rows)
+
+    def _iter_value_columns(
+        self, data_frame: pd.DataFrame, field_map: Dict[str, Field], hide_aliases: List[str], is_transposed: bool
+    ):
+        """
+        Yields the accessor path, the values and the fields of the values for each column of the data frame that is not
+        hidden. The data frame must have its metrics column level restored.
+        """
+        # Iterating over rows upcasts all values to a common dtype, so do the same here to get the same values.
+        values = data_frame.to_numpy()
+
+        row_fields = [field_map[wrap_list(index)[0]] for index in data_frame.index] if is_transposed else None
+
+        for i, key in enumerate(data_frame.columns):
+            if key in hide_aliases:
+                continue
+
+            key = wrap_list(key)
+            accessor = self._get_value_accessor(data_frame.columns.names, field_map, key)
+            fields = row_fields or itertools.repeat(field_map[key[0]])
+
+            yield accessor, pd.Series(values[:, i], copy=False).tolist(), fields
+
+    @staticmethod
+    def _get_index_positions(
+        index_names, field_map: Dict[str, Field], hide_aliases: List[str], value_keys
+    ) -> List[int]:
+        # Values take precedence over index values with the same key, the same way they do in #transform_data
+        return [
+            i
+            for i, key in enumerate(index_names)
+            if key is not None and key in field_map and key not in hide_aliases and key not in value_keys
+        ]
+
+    def _get_index_levels(self, index: pd.Index, field_map: Dict[str, Field], is_transposed: bool) -> List[list]:
+        levels = [index.get_level_values(i) for i in range(index.nlevels)]
+        if is_transposed:
+            levels = [[self._get_field_label(value, field_map) for value in level] for level in levels]
+
+        return levels
+
+    @staticmethod
+    def _format_hyperlink(hyperlink_template: str, display, index_values: dict) -> Optional[str]:
+        if display == TOTALS_LABEL:
+            return None
+
+        try:
+            return hyperlink_template.format(**index_values)
+        except KeyError:
+            return None
+
+    def transform_data_columns(
+        self,
+        data_frame: pd.DataFrame,
+        field_map: Dict[str, Field],
+        hide_aliases: List[str],
+        dimension_hyperlink_templates: Dict[str, str],
+        is_transposed: bool,
+        is_pivoted: bool,
+    ) -> dict:
+        """
+        Builds the same data as #transform_data in a columnar format. Instead of a dict per row, with a dict per cell,
+        there is a dict per column containing a list of each cell attribute. Display values are stored once in a list
+        shared by all columns and the columns refer to them by their position in that list. This takes the same
+        arguments as #transform_data.
+
+        :return:
+            A dict with the following structure. Columns only have `hyperlink`, `color` and `text_color` lists if at
+            least one of their cells has that attribute, with `null` for the cells that don't.
+
+        .. code-block:: jsx
+
+            data = {
+              size: 2,
+              columns: [{
+                accessor: 'a.0',
+                path_accessor: ['a', '0'],
+                raw: [1, 2],
+                display: [0, 1],
+              }],
+              display_values: ['1', '2'],
+            }
+        """
+        if any(self.formatting_rules_map.values()):
+            # Formatting rules can color a whole row depending on its values, so build the rows to get the colors
+            columns = self._transform_rows_to_columns(
+                data_frame, field_map, hide_aliases, dimension_hyperlink_templates, is_transposed, is_pivoted
+            )
+        else:
+            columns = self._transform_columns(
+                data_frame, field_map, hide_aliases, dimension_hyperlink_templates, is_transposed
+            )
+
+        display_values = {}
+        for column in columns:
+            column["display"] = [
+                None if display is None else display_values.setdefault(display, len(display_values))
+                for display in column["display"]
+            ]
+
+        return {"size": len(data_frame), "columns": columns, "display_values": list(display_values)}
+
+    def _transform_columns(
+        self,
+        data_frame: pd.DataFrame,
+        field_map: Dict[str, Field],
+        hide_aliases: List[str],
+        dimension_hyperlink_templates: Dict[str, str],
+        is_transposed: bool,
+    ) -> List[dict]:
+        index_names = data_frame.index.names
+        data_frame = self._restore_metrics_level(data_frame)
+
+        value_columns = OrderedDict()
+        for accessor, column_values, fields in self._iter_value_columns(
+            data_frame, field_map, hide_aliases, is_transposed
+        ):
+            raw, display = [], []
+            for value, field in zip(column_values, fields):
+                raw.append(raw_value(value, field))
+                display.append(_display_value(value, field, date_as=return_none))
+
+            value_columns[tuple(accessor)] = self._make_data_column(accessor, raw=raw, display=display)
+
+        index_positions = self._get_index_positions(
+            index_names, field_map, hide_aliases, {accessor[0] for accessor in value_columns}
+        )
+        levels = self._get_index_levels(data_frame.index, field_map, is_transposed)
+
+        index_columns = []
+        for i in index_positions:
+            key = index_names[i]
+            field = field_map[key]
+
+            raw = [raw_value(value, field) for value in levels[i]]
+            display = [_display_value(value, field) for value in levels[i]]
+            column = self._make_data_column([safe_value(key)], raw=raw, display=display)
+
+            hyperlink_template = dimension_hyperlink_templates.get(key)
+            if hyperlink_template is not None:
+                hyperlinks = [
+                    self._format_hyperlink(hyperlink_template, display, dict(zip(index_names, index_values)))
+                    for display, index_values in zip(column["display"], zip(*levels))
+                ]
+                if any(hyperlink is not None for hyperlink in hyperlinks):
+                    column["hyperlink"] = hyperlinks
+
+            index_columns.append(column)
+
+        return index_columns + list(value_columns.values())
+
+    def _transform_rows_to_columns(
+        self,
+        data_frame: pd.DataFrame,
+        field_map: Dict[str, Field],
+        hide_aliases: List[str],
+        dimension_hyperlink_templates: Dict[str, str],
+        is_transposed: bool,
+        is_pivoted: bool,
+    ) -> List[dict]:
+        rows = list(
+            self.iter_data_rows(
+                data_frame, field_map, hide_aliases, dimension_hyperlink_templates, is_transposed, is_pivoted
+            )
+        )
+
+        index_names = data_frame.index.names
+        value_accessors = OrderedDict(
+            (tuple(accessor), accessor)
+            for accessor, _, _ in self._iter_value_columns(
+                self._restore_metrics_level(data_frame), field_map, hide_aliases, is_transposed
             )
+        )
+        index_positions = self._get_index_positions(
+            index_names, field_map, hide_aliases, {accessor[0] for accessor in value_accessors}
+        )
+        accessors = [[safe_value(index_names[i])] for i in index_positions] + list(value_accessors.values())
+
+        columns = []
+        for accessor in accessors:
+            cells = [getdeepattr(row, accessor) for row in rows]
+            attributes = {
+                attribute: [cell.get(attribute) for cell in cells]
+                for attribute in ("hyperlink", "color", "text_color")
+                if any(attribute in cell for cell in cells)
+            }
+            columns.append(
+                self._make_data_column(
+                    accessor,
+                    raw=[cell[RAW_VALUE] for cell in cells],
+                    display=[cell.get("display") for cell in cells],
+                    **attributes,
+                )
+            )
+
+        return columns
+
+    @staticmethod
+    def _make_data_column(accessor: List[str], **attributes) -> dict:
+        return {
+            "accessor": ".".join(str(value) for value in accessor),
+            "path_accessor": list(accessor),
+            **attributes,
+        }
+
+    @staticmethod
+    def _encode_value_cell(value, field: Field) -> str:
+        raw = encode_json_value(raw_value(value, field))
+        display = _display_value(value, field, date_as=return_none)
+
+        if display is None:
+            return '{"raw": %s}' % raw
+
+        return '{"raw": %s, "display": %s}' % (raw, encode_json_value(display))
 
-        return rows
+    def _encode_index_cells(
+        self,
+        index: pd.Index,
+        index_positions: List[int],
+        field_map: Dict[str, Field],
+        dimension_hyperlink_templates: Dict[str, str],
+        is_transposed: bool,
+    ) -> List[List[str]]:
+        """
+        Encodes the cells of the index levels at `index_positions` for every row. The cells of a level only depend on
+        the level value, unless the level has a hyperlink template, so each distinct value is only encoded once.
+        """
+        levels = self._get_index_levels(index, field_map, is_transposed)
+
+        index_cells = []
+        for i in index_positions:
+            key = index.names[i]
+            field = field_map[key]
+            hyperlink_template = dimension_hyperlink_templates.get(key)
+
+            if hyperlink_template is None:
+                encoded = {}
+                for value in levels[i]:
+                    if value not in encoded:
+                        encoded[value] = self._encode_index_cell(value, field)
+                cells = [encoded[value] for value in levels[i]]
+
+            else:
+                cells = [
+                    self._encode_index_cell(
+                        index_values[i], field, hyperlink_template, dict(zip(index.names, index_values))
+                    )
+                    for index_values in zip(*levels)
+                ]
+
+            index_cells.append(cells)
+
+        return index_cells
+
+    @staticmethod
+    def _encode_index_cell(value, field: Field, hyperlink_template: Optional[str] = None, index_values=None) -> str:
+        cell = '{"raw": %s' % encode_json_value(raw_value(value, field))
+
+        display = _display_value(value, field)
+        if display is not None:
+            cell += ', "display": %s' % encode_json_value(display)
+
+        if hyperlink_template is not None:
+            hyperlink = ReactTable._format_hyperlink(hyperlink_template, display, index_values)
+            if hyperlink is not None:
+                cell += ', "hyperlink": %s' % encode_json_value(hyperlink)
+
+        return cell + "}"
+
+    @staticmethod
+    def _make_row_template(index_keys: List[str], value_tree: dict) -> str:
+        """
+        Builds a format string encoding a row as JSON from the encoded cells of the row, the index cells first followed
+        by the value cells. The values are nested according to their accessor paths in `value_tree`, which maps the
+        paths to the positions of the value cells.
+        """
+        n_index_keys = len(index_keys)
+
+        def _escape(key) -> str:
+            return encode_json_value(str(key)).replace("{", "{{").replace("}", "}}")
+
+        def _make_object(items) -> str:
+            return "{{" + ", ".join("{}: {}".format(_escape(key), value) for key, value in items) + "}}"
+
+        def _make_values(tree) -> list:
+            return [
+                (key, _make_object(_make_values(value)) if isinstance(value, dict) else "{%d}" % (n_index_keys + value))
+                for key, value in tree.items()
+            ]
+
+        return _make_object([(key, "{%d}" % i) for i, key in enumerate(index_keys)] + _make_values(value_tree))
 
     def transform(
         self,
@@ -687,6 +1050,7 @@ class ReactTable(Pandas):
         references: List[Reference],
         annotation_frame: Optional[pd.DataFrame] = None,
         use_raw_values: bool = False,
+        transform_context: Optional[TransformContext] = None,
     ) -> dict:
         """
         Transforms a data frame into a format for ReactTable. This is an object containing attributes `columns` and
@@ -702,12 +1066,22 @@ class ReactTable(Pandas):
             A data frame containing the annotation data.
         :param use_raw_values:
             Don't add prefix or postfix to values.
+        :param transform_context:
+            A context for sharing intermediate results with other widgets transforming the same data frame.
         :return:
             An dict containing attributes `columns` and `data` which align with the props in ReactTable with the same
             names.
         """
-        result_df = data_frame.copy()
+        return self._transform(data_frame, dimensions, references, transform_context)
 
+    def _transform(
+        self,
+        data_frame: pd.DataFrame,
+        dimensions: List[Field],
+        references: List[Reference],
+        transform_context: Optional[TransformContext] = None,
+        encode_data: bool = False,
+    ) -> dict:
         dimension_map = {alias_selector(dimension.alias): dimension for dimension in dimensions}
 
         metric_map = OrderedDict(
@@ -743,12 +1117,25 @@ class ReactTable(Pandas):
             if alias_selector(dimension.alias) not in hide_aliases
         ]
 
-        result_df = self.format_data_frame(result_df[metric_aliases])
-        result_df, is_pivoted, is_transposed = self.pivot_data_frame(result_df, pivot_dimensions, self.transpose)
+        if transform_context is None:
+            transform_context = TransformContext()
+
+        result_df = transform_context.memoize(
+            data_frame,
+            ("reacttable", tuple(metric_aliases)),
+            lambda: self.format_data_frame(self.select_data_frame_columns(data_frame, metric_aliases)),
+        )
+        result_df, is_pivoted, is_transposed = self.memoized_pivot_data_frame(
+            transform_context, result_df, pivot_dimensions
+        )
         dimension_columns = self.transform_index_column_headers(result_df, field_map, hide_aliases)
         metric_columns = self.transform_data_column_headers(result_df, field_map, hide_aliases)
 
-        data = self.transform_data(
+        if self.columnar_data:
+            transform_data = self.transform_data_columns
+        else:
+            transform_data = self.encode_data if encode_data else self.transform_data
+        data = transform_data(
             result_df,
             field_map,
             hide_aliases=hide_aliases,
@@ -758,3 +1145,23 @@ class ReactTable(Pandas):
         )
 
         return {"columns": dimension_columns + metric_columns, "data": data}
+
+    def transform_to_json_chunks(
+        self,
+        data_frame: pd.DataFrame,
+        dimensions: List[Field],
+        references: List[Reference],
+        annotation_frame: Optional[pd.DataFrame] = None,
+        use_raw_values: bool = False,
+        transform_context: Optional[TransformContext] = None,
+    ) -> Iterator[bytes]:
+        """
+        Transforms a data frame into the same format as #transform, but encodes it as JSON directly. The rows are
+        encoded from the columns of the data frame while the output is being consumed, without building a dict for
+        each row first. This takes the same arguments as #transform.
+
+        :return:
+            An iterator of bytes which, concatenated, are the JSON encoded output of #transform.
+        """
+        payload = self._transform(data_frame, dimensions, references, transform_context, encode_data=True)
+        return iter_json_chunks(payload)